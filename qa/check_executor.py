@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Runs the checks of one QA run in schedule order (run_qa.py)
+Worker pool with --jobs N; --fail-fast and --budget skip units that no longer need to run
+"""
+
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from check_metrics import CheckMetrics
+
+Outcome = Tuple[Optional[bool], str, Optional[Dict], Dict]
+
+
+def skipped_outcome(reason: str) -> Outcome:
+    return None, f"Skipped: {reason}", None, CheckMetrics().as_dict()
+
+
+class CheckExecutor:
+    def __init__(self, runner, entries: List[Tuple[str, Dict]], order: List[int],
+                 units: Dict[int, Tuple[List[int], List[int]]], over_budget: Set[int],
+                 costs: List[float], deadline: Optional[float]):
+        self.runner = runner
+        self.entries = entries
+        self.units = units
+        self.deadline = deadline
+        self.red_decided_by: Optional[str] = None
+        # perf_counter() time of the first check result
+        self.first_result_at: Optional[float] = None
+        self._index_of = {id(check): index for index, (_, check) in enumerate(entries)}
+        self._outcomes: Dict[int, Outcome] = {}
+        for index in over_budget:
+            self._outcomes[index] = skipped_outcome(
+                f"does not fit the {runner.budget:g}s budget (estimated {costs[index] / 1000:.1f}s)")
+            self._stream(index, self._outcomes[index])
+        self._remaining = iter(order)
+        self._futures = {}
+        self._pool = None
+        if runner.jobs > 1:
+            self._submit_all(order)
+
+    def __enter__(self) -> 'CheckExecutor':
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._pool:
+            # also waits for the streaming callbacks of the last checks
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _submit_all(self, order: List[int]):
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(max_workers=self.runner.jobs)
+        for index in order:
+            if index in self._futures:
+                continue
+            members, sources = self.units.get(index, ([index], [0]))
+            future = self._pool.submit(self.run_unit, [self.entries[m][1] for m in members], sources)
+            for position, member in enumerate(members):
+                self._futures[member] = (future, position)
+            if self.runner._stream:
+                # stream in completion order, not in the file order used for printing
+                future.add_done_callback(lambda f, members=members: self._stream_unit(members, f))
+
+    def outcome(self, check: Dict) -> Outcome:
+        """(passed, message, details, metrics) of a check, running the schedule up to it if needed"""
+        index = self._index_of[id(check)]
+        if index in self._outcomes:
+            return self._outcomes[index]
+        if self._pool:
+            future, position = self._futures[index]
+            return future.result()[position]
+        while index not in self._outcomes:
+            next_index = next(self._remaining)
+            if next_index in self._outcomes:
+                continue
+            members, sources = self.units.get(next_index, ([next_index], [0]))
+            unit_outcomes = self.run_unit([self.entries[m][1] for m in members], sources)
+            for member, outcome in zip(members, unit_outcomes):
+                self._outcomes[member] = outcome
+                self._stream(member, outcome)
+        return self._outcomes[index]
+
+    def run_unit(self, checks: List[Dict], sources: List[int]) -> List[Outcome]:
+        """Run one unit of the plan; checks[i] reuses the result of checks[sources[i]]"""
+        if self.red_decided_by is not None:
+            return [skipped_outcome(f"outcome already RED after {self.red_decided_by} failed (--fail-fast)")] * len(checks)
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return [skipped_outcome(f"time budget of {self.runner.budget:g}s exhausted")] * len(checks)
+
+        distinct = sorted(set(sources))
+        if len(distinct) == 1:
+            executed = {distinct[0]: self.runner._run_check_measured(checks[distinct[0]])}
+        else:
+            executed = dict(zip(distinct, self._run_batch([checks[i] for i in distinct])))
+        if self.first_result_at is None:
+            self.first_result_at = time.perf_counter()
+
+        outcomes = []
+        for position, check in enumerate(checks):
+            outcome = executed[sources[position]]
+            if sources[position] != position:
+                # a duplicate reports no cost of its own
+                outcome = outcome[:3] + (CheckMetrics().as_dict(),)
+            if self.runner.fail_fast and not outcome[0] and check.get('severity', 'medium') == 'critical':
+                self.red_decided_by = self.red_decided_by or check['id']
+            outcomes.append(outcome)
+        return outcomes
+
+    def _run_batch(self, checks: List[Dict]) -> List[Outcome]:
+        """Run a batch of the plan; its whole cost is charged to the first check"""
+        from check_plan import batch_kind
+
+        runner = self.runner
+        with CheckMetrics() as metrics:
+            keys = [runner.cache.key_for(check) if runner.cache is not None else None for check in checks]
+            outcomes = [runner.cache.get(key) if key is not None else None for key in keys]
+            pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+            if pending:
+                if batch_kind(checks[pending[0]]) == 'element':
+                    results = [result + (None,) for result in
+                               runner.check_element_batch([checks[i].get('target', '') for i in pending])]
+                else:
+                    results = runner.check_e2e_batch([checks[i] for i in pending])
+                for i, (passed, message, details) in zip(pending, results):
+                    outcomes[i] = (passed, message, details)
+                    if keys[i] is not None:
+                        runner.cache.put(keys[i], passed, message, details)
+
+        charged = [metrics.as_dict()] + [CheckMetrics().as_dict() for _ in checks[1:]]
+        return [outcome + (metrics_entry,) for outcome, metrics_entry in zip(outcomes, charged)]
+
+    def _stream(self, index: int, outcome: Outcome):
+        if self.runner._stream:
+            category_name, check = self.entries[index]
+            self.runner._stream.check(category_name, self.runner._make_result(check, *outcome))
+
+    def _stream_unit(self, members: List[int], future):
+        """Write the checks of a finished unit to the NDJSON stream (worker pool callback)"""
+        if not future.cancelled() and future.exception() is None:
+            for member, outcome in zip(members, future.result()):
+                self._stream(member, outcome)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Per-check resource metrics for the QA runner
+CheckMetrics measures wall time, thread CPU time, bytes read and the subprocesses of one check
+run_subprocess() runs a child with bounded output, resource slots, timeout and memory limits
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import subprocess
+
+_local = threading.local()
+
+# Bytes of stdout and of stderr kept per child; earlier output is dropped as it arrives
+OUTPUT_LIMIT = 64 * 1024
+_READ_CHUNK = 64 * 1024
+
+# Children of each resource class allowed to run at once
+RESOURCE_LIMITS = {'browser': 1, 'node': os.cpu_count() or 1, 'python': os.cpu_count() or 1}
+_slots: Dict[str, threading.BoundedSemaphore] = {}
+_slots_lock = threading.Lock()
+
+# Seconds to wait for the output pipes after the child exits
+_PIPE_GRACE_S = 1.0
+
+# Children of run_subprocess() that have not been reaped yet
+_running: set = set()
+
+
+def _thread_io_path() -> str:
+    return f'/proc/self/task/{threading.get_native_id()}/io'
+
+
+def _read_thread_io() -> Optional[tuple]:
+    """Return (rchar, bytes consumed by this read) or None if unsupported"""
+    try:
+        with open(_thread_io_path(), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    for line in data.splitlines():
+        if line.startswith(b'rchar:'):
+            return int(line.split()[1]), len(data)
+    return None
+
+
+def _maxrss_kb(rusage) -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    if sys.platform == 'darwin':
+        return rusage.ru_maxrss // 1024
+    return rusage.ru_maxrss
+
+
+class CheckMetrics:
+    """Context manager measuring the check run on the current thread"""
+
+    def __init__(self):
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+        self.bytes_read: Optional[int] = None
+        self.subprocesses: List[Dict] = []
+        self._previous = None
+
+    def __enter__(self) -> 'CheckMetrics':
+        self._previous = getattr(_local, 'active', None)
+        _local.active = self
+        self._io_start = _read_thread_io()
+        self._cpu_start = time.thread_time()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_ms = (time.perf_counter() - self._wall_start) * 1000
+        self.cpu_ms = (time.thread_time() - self._cpu_start) * 1000
+        io_end = _read_thread_io()
+        if self._io_start is not None and io_end is not None:
+            # the first /proc read is itself counted in the second sample
+            self.bytes_read = max(0, io_end[0] - self._io_start[0] - self._io_start[1])
+        _local.active = self._previous
+        return False
+
+    def as_dict(self) -> Dict:
+        metrics = {
+            'wallMs': round(self.wall_ms, 3),
+            'cpuMs': round(self.cpu_ms, 3),
+            'bytesRead': self.bytes_read,
+        }
+        if self.subprocesses:
+            metrics['subprocesses'] = self.subprocesses
+        return metrics
+
+
+def _record_subprocess(entry: Dict):
+    active = getattr(_local, 'active', None)
+    if active is not None:
+        active.subprocesses.append(entry)
+
+
+def _reap(proc: 'subprocess.Popen', usage: Dict):
+    """Wait for the child with os.wait4() to keep its resource usage (waiter thread)"""
+    if not hasattr(os, 'wait4'):
+        proc.wait()
+        return
+    try:
+        _, status, rusage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        # already reaped by Popen.poll() (Popen.send_signal() polls before signalling)
+        proc.wait()
+        return
+    # Popen did not see the exit status, so it is set here
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    usage['rusage'] = rusage
+
+
+class OutputTail:
+    """Ring buffer keeping the last `limit` bytes written to a stream"""
+
+    def __init__(self, limit: int = OUTPUT_LIMIT):
+        self.limit = max(1, limit)
+        self.total = 0
+        self._buffer = bytearray(self.limit)
+        self._pos = 0
+        self._full = False
+
+    def feed(self, chunk: bytes):
+        self.total += len(chunk)
+        if len(chunk) >= self.limit:
+            self._buffer[:] = chunk[-self.limit:]
+            self._pos, self._full = 0, True
+            return
+        end = self._pos + len(chunk)
+        if end <= self.limit:
+            self._buffer[self._pos:end] = chunk
+        else:
+            split = self.limit - self._pos
+            self._buffer[self._pos:] = chunk[:split]
+            self._buffer[:end - self.limit] = chunk[split:]
+        self._full = self._full or end >= self.limit
+        self._pos = end % self.limit
+
+    def read_from(self, pipe):
+        """Feed from a pipe until EOF (reader thread)"""
+        while True:
+            chunk = pipe.read(_READ_CHUNK)
+            if not chunk:
+                return
+            self.feed(chunk)
+
+    def tail(self) -> bytes:
+        if not self._full:
+            return bytes(self._buffer[:self._pos])
+        return bytes(self._buffer[self._pos:] + self._buffer[:self._pos])
+
+    def text(self) -> str:
+        """The retained tail as text (UTF-8, universal newlines)"""
+        data = self.tail()
+        start = 0
+        if self.total > len(data):
+            # a truncated tail may begin inside a multi-byte character
+            while start < min(3, len(data)) and data[start] & 0xC0 == 0x80:
+                start += 1
+        text = data[start:].decode('utf-8', errors='replace')
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def configure_limits(limits: Dict[str, int]):
+    """Set the number of concurrent children per resource class"""
+    with _slots_lock:
+        for resource, limit in limits.items():
+            limit = max(1, int(limit))
+            if RESOURCE_LIMITS.get(resource) != limit:
+                RESOURCE_LIMITS[resource] = limit
+                # children holding a slot release it to the old semaphore
+                _slots.pop(resource, None)
+
+
+def _slot(resource: Optional[str]):
+    if resource is None:
+        return contextlib.nullcontext()
+    with _slots_lock:
+        if resource not in _slots:
+            _slots[resource] = threading.BoundedSemaphore(RESOURCE_LIMITS.setdefault(resource, 1))
+        return _slots[resource]
+
+
+@contextlib.contextmanager
+def check_limits(timeout: Optional[float] = None, memory_mb: Optional[int] = None):
+    """Apply a check's "timeout" and "memoryLimitMb" to the children it starts"""
+    previous = getattr(_local, 'limits', None)
+    _local.limits = (timeout, memory_mb)
+    try:
+        yield
+    finally:
+        _local.limits = previous
+
+
+def check_timeout(default: Optional[float]) -> Optional[float]:
+    """The running check's "timeout" if it sets one, else default"""
+    limits = getattr(_local, 'limits', None)
+    return limits[0] if limits and limits[0] is not None else default
+
+
+def _check_memory_mb(default: Optional[int]) -> Optional[int]:
+    limits = getattr(_local, 'limits', None)
+    return limits[1] if limits and limits[1] is not None else default
+
+
+def _group_kwargs() -> Dict:
+    """Popen arguments that start the child in its own process group"""
+    if os.name == 'nt':
+        import subprocess
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def kill_tree(proc: 'subprocess.Popen'):
+    """Kill a child started by run_subprocess() and everything it started"""
+    if os.name == 'nt':
+        import subprocess
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        import signal
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    proc.kill()
+
+
+def kill_running():
+    """Kill the process trees of all running children (they run in their own process groups)"""
+    for proc in list(_running):
+        kill_tree(proc)
+
+
+# Exec shim that caps RLIMIT_DATA and then becomes the real child (same pid);
+# it replaces a preexec_fn, which is not safe to run in a threaded parent
+_MEMORY_SHIM = (
+    "import os, resource, sys\n"
+    "limit = int(sys.argv[1])\n"
+    "try:\n"
+    "    resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))\n"
+    "except (OSError, ValueError):\n"
+    "    pass\n"
+    "os.execvp(sys.argv[2], sys.argv[2:])\n"
+)
+
+
+def _memory_wrapper(args: List[str], memory_mb: Optional[int],
+                    env: Optional[Dict[str, str]] = None) -> List[str]:
+    """args prefixed with the exec shim that caps the child's RLIMIT_DATA (POSIX)"""
+    # RLIMIT_AS would also count the address space V8 and Chromium reserve up front
+    if not memory_mb or os.name != 'posix':
+        return list(args)
+    import shutil
+    args = [os.fspath(arg) for arg in args]
+    program = args[0]
+    if os.sep not in program:
+        program = shutil.which(program, path=(env if env is not None else os.environ).get('PATH'))
+        if program is None:
+            raise FileNotFoundError(2, 'No such file or directory', args[0])
+    limit = int(memory_mb) * 1024 * 1024
+    return [sys.executable, '-c', _MEMORY_SHIM, str(limit), program, *args[1:]]
+
+
+def run_subprocess(args: List[str], timeout: float = None, cwd=None, text: bool = True,
+                   resource: Optional[str] = None, output_limit: int = OUTPUT_LIMIT,
+                   memory_mb: Optional[int] = None, env: Optional[Dict[str, str]] = None) -> 'subprocess.CompletedProcess':
+    """subprocess.run(args, capture_output=True) with bounded output, resource slots and the check's limits"""
+    import subprocess
+
+    timeout = check_timeout(timeout)
+    memory_mb = _check_memory_mb(memory_mb)
+    with _slot(resource):
+        start = time.perf_counter()
+        proc = subprocess.Popen(_memory_wrapper(args, memory_mb, env), stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd, env=env,
+                                bufsize=0, **_group_kwargs())
+        _running.add(proc)
+        tails = (OutputTail(output_limit), OutputTail(output_limit))
+        usage: Dict = {}
+        timed_out = False
+        waiter = threading.Thread(target=_reap, args=(proc, usage), daemon=True)
+        waiter.start()
+        try:
+            readers = [threading.Thread(target=tail.read_from, args=(pipe,), daemon=True)
+                       for tail, pipe in zip(tails, (proc.stdout, proc.stderr))]
+            for reader in readers:
+                reader.start()
+            waiter.join(timeout)
+            if waiter.is_alive():
+                timed_out = True
+                kill_tree(proc)
+                waiter.join()
+            for reader in readers:
+                reader.join(_PIPE_GRACE_S)
+            if any(reader.is_alive() for reader in readers):
+                # descendants that outlive the child still hold the pipes
+                kill_tree(proc)
+                for reader in readers:
+                    reader.join()
+        except BaseException:
+            kill_tree(proc)
+            waiter.join()
+            raise
+        finally:
+            _running.discard(proc)
+            proc.stdout.close()
+            proc.stderr.close()
+            entry = {
+                'command': ' '.join(str(arg) for arg in args[:3]),
+                'wallMs': round((time.perf_counter() - start) * 1000, 3),
+                'exitCode': proc.returncode,
+                'outputBytes': tails[0].total + tails[1].total,
+            }
+            if resource is not None:
+                entry['resource'] = resource
+            if timed_out:
+                entry['timedOut'] = True
+            rusage = usage.get('rusage')
+            if rusage is not None:
+                entry['cpuMs'] = round((rusage.ru_utime + rusage.ru_stime) * 1000, 3)
+                entry['maxRssKb'] = _maxrss_kb(rusage)
+            _record_subprocess(entry)
+
+    stdout, stderr = (tail.text() for tail in tails) if text else (tail.tail() for tail in tails)
+    if timed_out:
+        raise subprocess.TimeoutExpired(args, timeout, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Execution plan compiled from qa/requirements.json
+Duplicate checks run once; element and E2E checks run in batches (qa/e2e_batch.py)
+Cached in qa/.cache/plan.json under the SHA-256 of requirements.json
+
+Usage: python qa/run_qa.py --explain
+"""
+
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+PLAN_VERSION = 2
+
+DEFAULT_PLAN_FILE = os.path.join('qa', '.cache', 'plan.json')
+
+# Fields that describe a check without changing what it does
+LABEL_FIELDS = ('id', 'name', 'severity', 'description', 'note', 'remediationSteps')
+
+# Batch kind -> how QARunner answers it (check_element_batch(), check_e2e_batch())
+BATCH_KINDS = {
+    'element': 'one lookup pass over the HTML index',
+    'e2e': 'one Playwright run',
+}
+
+
+def check_identity(check: Dict) -> str:
+    """Canonical form of what a check does, without its labels"""
+    return json.dumps({k: v for k, v in check.items() if k not in LABEL_FIELDS}, sort_keys=True)
+
+
+def batch_kind(check: Dict) -> Optional[str]:
+    """The batch a check can join: 'element', 'e2e' or None"""
+    target = check.get('target', '')
+    if (check['type'] == 'element_exists' and 'testIds' not in check and bool(target)
+            and not any(ch in target for ch in '#.[')):
+        return 'element'
+    if (check['type'] == 'playwright_test' and bool(target)) or check.get('e2e'):
+        return 'e2e'
+    return None
+
+
+def plan_entries(requirements: Dict) -> List[Tuple[str, Dict]]:
+    """(category, check) in the order the runner numbers them"""
+    return [(category, check) for category, data in requirements.get('requirements', {}).items()
+            if 'checks' in data for check in data['checks']]
+
+
+def compile_plan(requirements: Dict, requirements_hash: str = None) -> Dict:
+    """Compile requirements into a JSON-serialisable plan"""
+    from result_cache import check_inputs
+
+    entries = plan_entries(requirements)
+    first: Dict[str, int] = {}
+    duplicates: Dict[str, int] = {}
+    inputs: Dict[str, List[int]] = {}
+    batches: Dict[str, List[int]] = {kind: [] for kind in BATCH_KINDS}
+    for index, (_, check) in enumerate(entries):
+        canonical = first.setdefault(check_identity(check), index)
+        if canonical != index:
+            duplicates[str(index)] = canonical
+            continue
+        kind = batch_kind(check)
+        if kind is not None:
+            batches[kind].append(index)
+        for spec in check_inputs(check) or []:
+            inputs.setdefault(spec, []).append(index)
+
+    return {
+        'version': PLAN_VERSION,
+        'requirementsHash': requirements_hash,
+        'checks': len(entries),
+        'duplicates': duplicates,
+        'batches': [{'kind': kind, 'checks': members} for kind, members in batches.items() if len(members) > 1],
+        'inputs': {spec: members for spec, members in inputs.items() if len(members) > 1},
+    }
+
+
+def load_plan(requirements_file: str, plan_file: str, requirements: Dict = None) -> Tuple[Dict, bool]:
+    """Return (plan, whether it came from the cache)"""
+    with open(requirements_file, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        with open(plan_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') == PLAN_VERSION and cached.get('requirementsHash') == digest:
+            return cached, True
+    except (OSError, ValueError):
+        pass
+
+    plan = compile_plan(requirements if requirements is not None else json.loads(data), digest)
+    try:
+        os.makedirs(os.path.dirname(plan_file), exist_ok=True)
+        tmp_file = f"{plan_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, separators=(',', ':'))
+        os.replace(tmp_file, plan_file)
+    except OSError:
+        pass
+    return plan, False
+
+
+def explain(plan: Dict, requirements: Dict, cached: Optional[bool] = None) -> str:
+    """Human-readable description of a plan (--explain)"""
+    entries = plan_entries(requirements)
+
+    def label(index: int) -> str:
+        return f"{entries[index][1]['id']} ({entries[index][0]})"
+
+    batched = sum(len(batch['checks']) for batch in plan['batches'])
+    units = plan['checks'] - len(plan['duplicates']) - batched + len(plan['batches'])
+    source = '' if cached is None else (' (cached)' if cached else ' (compiled)')
+    lines = [f"Execution plan for {plan['checks']} checks{source}: {units} units of work",
+             f"  requirements.json sha256 {plan['requirementsHash']}"]
+
+    lines.append(f"\nDuplicates ({len(plan['duplicates'])}): run once, result reused")
+    for index, canonical in sorted(plan['duplicates'].items(), key=lambda item: int(item[0])):
+        lines.append(f"  {label(int(index))} = {label(canonical)}")
+
+    for batch in plan['batches']:
+        lines.append(f"\nBatch '{batch['kind']}' ({len(batch['checks'])} checks, {BATCH_KINDS[batch['kind']]})")
+        lines.append('  ' + ', '.join(entries[index][1]['id'] for index in batch['checks']))
+
+    lines.append(f"\nShared inputs ({len(plan['inputs'])}): checks reading each")
+    for spec, members in sorted(plan['inputs'].items(), key=lambda item: -len(item[1])):
+        lines.append(f"  {len(members):4d} checks  {spec}")
+    return '\n'.join(lines)
+
+
+def plan_batches(plan: Dict, plan_index: Dict[int, int], entries: List[Tuple[str, Dict]],
+                 batchable: Callable[[Dict], bool], excluded: Set[int] = frozenset()) -> List[List[int]]:
+    """The plan's batches in terms of a run's entry indices (two or more members each)"""
+    local = {plan_index[id(check)]: index for index, (_, check) in enumerate(entries)}
+    batches = []
+    for batch in plan['batches']:
+        members = [local[g] for g in batch['checks'] if g in local and local[g] not in excluded
+                   and batchable(entries[local[g]][1])]
+        if len(members) > 1:
+            batches.append(members)
+    return batches
+
+
+def plan_units(plan: Dict, plan_index: Dict[int, int], entries: List[Tuple[str, Dict]],
+               batchable: Callable[[Dict], bool], excluded: Set[int]) -> Dict[int, Tuple[List[int], List[int]]]:
+    """Map entries sharing a unit of work to (members, sources); member i reuses members[sources[i]]"""
+    local = {plan_index[id(check)]: index for index, (_, check) in enumerate(entries)}
+    root = {}
+    for members in plan_batches(plan, plan_index, entries, batchable, excluded):
+        root.update((member, members[0]) for member in members)
+    canonical_of = {}
+    for duplicate, canonical in plan['duplicates'].items():
+        i, j = local.get(int(duplicate)), local.get(canonical)
+        if i is None or j is None or i in excluded or j in excluded:
+            continue
+        if batchable(entries[i][1]):
+            canonical_of[i] = j
+            root[i] = root.get(j, j)
+            root.setdefault(j, j)
+
+    groups: Dict[int, List[int]] = {}
+    for member, unit_root in sorted(root.items()):
+        groups.setdefault(unit_root, []).append(member)
+    units = {}
+    for members in groups.values():
+        sources = [members.index(canonical_of.get(member, member)) for member in members]
+        units.update((member, (members, sources)) for member in members)
+    return units
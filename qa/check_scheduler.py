@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Execution order and sharding for the QA runner's checks
+Critical checks first, then the cheapest by run history (qa/run_history.py) or a static estimate
+plan() skips checks past a time budget; shard() balances estimated cost across CI runners
+"""
+
+import heapq
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+SEVERITY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# Estimated wall time (ms) per check type when there is no history
+DEFAULT_COST_MS = {
+    'playwright_test': 30000.0,
+    'pytest_run': 8000.0,
+    'site_build_check': 1500.0,
+    'js_syntax_check': 400.0,
+    'secret_scan': 300.0,
+    'perf_budget': 300.0,
+    'workflow_branch_check': 20.0,
+    'workflow_environment_check': 20.0,
+    'css_class_check': 10.0,
+    'documentation_check': 5.0,
+}
+FALLBACK_COST_MS = 2.0
+
+# Key of a check in the history: (category, check id)
+CheckKey = Tuple[str, str]
+
+
+def type_costs(entries: List[Tuple[str, Dict]], durations: Dict[CheckKey, float]) -> Dict[str, float]:
+    """Mean historical wall time per check type"""
+    totals: Dict[str, List[float]] = {}
+    for category, check in entries:
+        duration = durations.get((category, check['id']))
+        if duration is not None:
+            totals.setdefault(check['type'], []).append(duration)
+    return {check_type: sum(values) / len(values) for check_type, values in totals.items()}
+
+
+def estimate_cost(category: str, check: Dict, durations: Dict[CheckKey, float],
+                  by_type: Dict[str, float]) -> float:
+    """Expected wall time of one check in milliseconds"""
+    duration = durations.get((category, check['id']))
+    if duration is not None:
+        return duration
+    return by_type.get(check['type'], DEFAULT_COST_MS.get(check['type'], FALLBACK_COST_MS))
+
+
+def batch_costs(costs: List[float], batches: Sequence[Sequence[int]]) -> List[float]:
+    """Costs with each batch charged once, to its most expensive member"""
+    costs = list(costs)
+    for members in batches:
+        costliest = max(members, key=lambda i: (costs[i], -i))
+        for index in members:
+            if index != costliest:
+                costs[index] = 0.0
+    return costs
+
+
+def plan(entries: List[Tuple[str, Dict]], durations: Optional[Dict[CheckKey, float]] = None,
+         budget_s: Optional[float] = None, workers: int = 1,
+         batches: Sequence[Sequence[int]] = ()) -> Tuple[List[int], Set[int], List[float]]:
+    """Order entries for execution; return (order, entries over the budget, estimated ms per entry)"""
+    durations = durations or {}
+    by_type = type_costs(entries, durations)
+    costs = batch_costs([estimate_cost(category, check, durations, by_type) for category, check in entries],
+                        batches)
+    order = sorted(range(len(entries)), key=lambda i: (
+        SEVERITY_RANK.get(entries[i][1].get('severity', 'medium'), 2), costs[i], i))
+
+    over_budget: Set[int] = set()
+    if budget_s is not None:
+        budget_ms = budget_s * 1000
+        free_at = [0.0] * max(1, workers)
+        for index in order:
+            start = free_at[0]
+            if start + costs[index] > budget_ms:
+                over_budget.add(index)
+                continue
+            heapq.heapreplace(free_at, start + costs[index])
+        # a batch runs whole or not at all
+        for members in batches:
+            if over_budget.intersection(members):
+                over_budget.update(members)
+        order = [index for index in order if index not in over_budget]
+    return order, over_budget, costs
+
+
+def shard(entries: List[Tuple[str, Dict]], count: int, durations: Optional[Dict[CheckKey, float]] = None,
+          group_of: Callable[[Dict], Optional[str]] = lambda check: None,
+          batches: Sequence[Sequence[int]] = ()) -> Tuple[List[int], List[float]]:
+    """Assign entries to `count` shards; return (shard per entry, estimated ms per shard)"""
+    durations = durations or {}
+    by_type = type_costs(entries, durations)
+    costs = batch_costs([estimate_cost(category, check, durations, by_type) for category, check in entries],
+                        batches)
+    batch_of = {index: members[0] for members in batches for index in members}
+    units: Dict[Tuple, List[int]] = {}
+    for index, (_, check) in enumerate(entries):
+        group = group_of(check)
+        if group is not None:
+            unit = ('group', group)
+        elif index in batch_of:
+            unit = ('batch', batch_of[index])
+        else:
+            unit = ('check', index)
+        units.setdefault(unit, []).append(index)
+
+    assignment = [0] * len(entries)
+    loads = [(0.0, number) for number in range(count)]
+    for members in sorted(units.values(), key=lambda m: (-sum(costs[i] for i in m), m[0])):
+        load, number = heapq.heappop(loads)
+        for index in members:
+            assignment[index] = number
+        heapq.heappush(loads, (load + sum(costs[i] for i in members), number))
+    return assignment, [load for load, _ in sorted(loads, key=lambda item: item[1])]
+
+
+def select_shard(categories: List[Tuple[str, Dict]], index: int, count: int,
+                 durations: Optional[Dict[CheckKey, float]], group_of: Callable[[Dict], Optional[str]],
+                 batches_of: Callable[[List[Tuple[str, Dict]]], Sequence[Sequence[int]]]
+                 ) -> Tuple[List[Tuple[str, Dict]], Dict]:
+    """Keep only the checks of shard `index` (1-based) of `count`; return them and the shard's info"""
+    entries = [(category_name, check) for category_name, category_data in categories
+               for check in category_data['checks']]
+    assignment, loads = shard(entries, count, durations, group_of, batches_of(entries))
+    mine = {id(check) for (_, check), number in zip(entries, assignment) if number == index - 1}
+    selected = []
+    for category_name, category_data in categories:
+        checks = [check for check in category_data['checks'] if id(check) in mine]
+        if checks:
+            selected.append((category_name, dict(category_data, checks=checks)))
+    return selected, {'index': index, 'count': count, 'checks': len(mine),
+                      'estimatedMs': round(loads[index - 1], 1)}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Precomputed payload for the QA dashboards (src/frontend/qa-dashboard.js, app-main.js)
+A small summary for the first paint and one shard per category, loaded when it is opened
+Every file gets precompressed .gz (and .br with the optional brotli package) siblings
+
+Usage: python qa/dashboard_payload.py [report.json] [output_dir]
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+PAYLOAD_VERSION = 2
+
+# Copied next to index.html by deploy-pages.yml (fetched as qa/dashboard/...)
+DEFAULT_OUTPUT_DIR = os.path.join('qa', 'dashboard')
+
+SUMMARY_FILE = 'summary.json'
+
+# Failing check IDs listed in the summary; the rest are in the shards
+FAILING_LIMIT = 10
+
+SEVERITY_ORDER = ('critical', 'high', 'medium', 'low')
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _status(result: Dict) -> str:
+    if result.get('skipped'):
+        return 'SKIP'
+    return 'PASS' if result['passed'] else 'FAIL'
+
+
+def overall_status(report: Dict) -> str:
+    """GREEN/AMBER/RED, as QARunner.get_overall_status() computes it"""
+    failed = [r for category in report['checks'].values() for r in category if _status(r) == 'FAIL']
+    if any(r.get('severity') == 'critical' for r in failed):
+        return 'RED'
+    return 'AMBER' if failed else 'GREEN'
+
+
+def shard_name(category: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_-]', '_', category) + '.json'
+
+
+def build_payload(report: Dict, status: Optional[str] = None) -> Tuple[Dict, Dict[str, Dict]]:
+    """Return (summary document, {shard file name: shard document})"""
+    categories = {}
+    severities: Dict[str, Dict[str, int]] = {}
+    failing: List[Tuple[int, str]] = []
+    shards = {}
+    for category, results in report['checks'].items():
+        counts = {'passed': 0, 'failed': 0, 'skipped': 0}
+        checks = []
+        for result in results:
+            status_code = _status(result)
+            key = {'PASS': 'passed', 'FAIL': 'failed', 'SKIP': 'skipped'}[status_code]
+            counts[key] += 1
+            severity = result.get('severity', 'medium')
+            severities.setdefault(severity, {'passed': 0, 'failed': 0, 'skipped': 0})[key] += 1
+            if status_code == 'FAIL':
+                rank = SEVERITY_ORDER.index(severity) if severity in SEVERITY_ORDER else len(SEVERITY_ORDER)
+                failing.append((rank, result['id']))
+            entry = {'id': result['id'], 'name': result['name'], 'severity': severity,
+                     'status': status_code, 'message': result.get('message', '')}
+            if isinstance(result.get('details'), str) and result['details']:
+                entry['details'] = result['details']
+            checks.append(entry)
+        name = shard_name(category)
+        categories[category] = [counts['passed'], counts['failed'], counts['skipped'], name]
+        shards[name] = {'version': PAYLOAD_VERSION, 'category': category, 'checks': checks}
+
+    summary = {
+        'version': PAYLOAD_VERSION,
+        'timestamp': report.get('timestamp'),
+        'overallStatus': status or overall_status(report),
+        'strictMode': report.get('strictMode', False),
+        'summary': report['summary'],
+        'severity': severities,
+        'categories': categories,
+        'failing': [check_id for _, check_id in sorted(failing, key=lambda item: item[0])[:FAILING_LIMIT]],
+    }
+    return summary, shards
+
+
+def _write_if_changed(path: str, data: bytes) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _write_document(path: str, document: Dict, brotli) -> bool:
+    """Write path plus its .gz (and .br) siblings; return whether it changed"""
+    data = json.dumps(document, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if not _write_if_changed(path, data) and os.path.exists(path + '.gz'):
+        return False
+    _write_if_changed(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_if_changed(path + '.br', brotli.compress(data, quality=11))
+    return True
+
+
+def write_payload(report: Dict, output_dir: str, status: Optional[str] = None) -> Dict:
+    """Write summary.json and the category shards; return the summary"""
+    summary, shards = build_payload(report, status)
+    os.makedirs(output_dir, exist_ok=True)
+    brotli = _brotli()
+    for name, shard in shards.items():
+        _write_document(os.path.join(output_dir, name), shard, brotli)
+    _write_document(os.path.join(output_dir, SUMMARY_FILE), summary, brotli)
+
+    keep = set(shards) | {SUMMARY_FILE}
+    for entry in os.listdir(output_dir):
+        base = re.sub(r'\.(gz|br)$', '', entry)
+        if base.endswith('.json') and base not in keep:
+            os.remove(os.path.join(output_dir, entry))
+    return summary
+
+
+def main(argv: List[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    report_file = argv[0] if argv else os.path.join(repo_root, 'qa', 'last-run-report.json')
+    output_dir = argv[1] if len(argv) > 1 else os.path.join(repo_root, DEFAULT_OUTPUT_DIR)
+    with open(report_file, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    summary = write_payload(report, output_dir)
+    size = os.path.getsize(os.path.join(output_dir, SUMMARY_FILE))
+    print(f"Dashboard payload written to {output_dir}: {len(summary['categories'])} shards, "
+          f"summary {size} bytes ({summary['overallStatus']})")
+
+
+if __name__ == '__main__':
+    main()
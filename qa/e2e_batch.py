@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Batched Playwright runs for the QA runner
+All E2E checks of a run share one `npx playwright test` invocation and one static server
+Results come from Playwright's JSON reporter, matched to checks by spec file and test title
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+E2E_CONFIG = 'tests/e2e/playwright.config.js'
+FRONTEND_DIR = os.path.join('src', 'frontend')
+
+# Seconds the batch's tests may run: the longest "timeout" of its checks, or this
+SPEC_TIMEOUT = 120
+
+# Seconds added for npx, the config and the browser to start
+STARTUP_TIMEOUT = 30
+
+# (repo-relative spec file, test title or None for all its tests)
+Selection = Tuple[str, Optional[str]]
+
+
+# Output of an npx run that found no Playwright to start (the package is not installed)
+NOT_INSTALLED = re.compile(r"could not determine executable to run|Cannot find module '@playwright/test'"
+                           r"|Please install @playwright/test")
+
+
+class PlaywrightUnavailable(Exception):
+    """npx or the Playwright package is not installed"""
+
+
+def selections(check: Dict) -> List[Selection]:
+    """The Playwright tests a check covers"""
+    if check['type'] == 'playwright_test':
+        return [(check.get('target', ''), None)]
+    chosen = []
+    for entry in check.get('e2e') or []:
+        if isinstance(entry, str):
+            chosen.append((entry, None))
+        else:
+            chosen.append((entry['spec'], entry.get('test')))
+    return chosen
+
+
+class StaticServer:
+    """Serve a directory on a free localhost port from a background thread"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.url = None
+        self._server = None
+
+    def __enter__(self) -> 'StaticServer':
+        import functools
+        from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+        class QuietHandler(SimpleHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        handler = functools.partial(QuietHandler, directory=self.directory)
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}'
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+
+def run_playwright(repo_root: str, spec_files: List[str], timeout: float,
+                   site_dir: str = None) -> Tuple[int, Optional[Dict], str]:
+    """Run the spec files in one Playwright invocation; return (exit code, JSON report or None, output)"""
+    from check_metrics import run_subprocess
+
+    with StaticServer(site_dir or os.path.join(repo_root, FRONTEND_DIR)) as server, \
+            tempfile.TemporaryDirectory(prefix='qa-e2e-') as tmp:
+        report_file = os.path.join(tmp, 'report.json')
+        env = dict(os.environ, PIT_E2E_BASE_URL=server.url, PLAYWRIGHT_JSON_OUTPUT_NAME=report_file)
+        try:
+            result = run_subprocess(
+                ['npx', 'playwright', 'test', *spec_files, f'--config={E2E_CONFIG}', '--reporter=json',
+                 f'--global-timeout={int(timeout * 1000)}'],
+                cwd=repo_root, timeout=timeout + STARTUP_TIMEOUT, resource='browser', env=env)
+        except FileNotFoundError:
+            raise PlaywrightUnavailable()
+        try:
+            with open(report_file, 'r', encoding='utf-8') as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            report = None
+    output = result.stdout + result.stderr
+    if report is None and result.returncode != 0:
+        missing = NOT_INSTALLED.search(output)
+        if missing:
+            raise PlaywrightUnavailable(missing.group(0))
+    return result.returncode, report, output[-500:]
+
+
+def _plain(message: str) -> str:
+    """First line of a Playwright error message, without terminal colours"""
+    lines = re.sub(r'\x1b\[[0-9;]*m', '', message).strip().splitlines()
+    return lines[0] if lines else ''
+
+
+def report_tests(report: Dict, repo_root: str) -> List[Dict]:
+    """Flatten a JSON report into one entry per test"""
+    root_dir = report.get('config', {}).get('rootDir', '')
+    tests = []
+
+    def visit(suite: Dict, path: List[str]):
+        titles = path + [suite['title']] if suite.get('title') and suite.get('title') != suite.get('file') else path
+        for spec in suite.get('specs', []):
+            for test in spec.get('tests', []):
+                results = test.get('results', [])
+                errors = [_plain(result['error'].get('message', '')) for result in results if result.get('error')]
+                tests.append({
+                    'file': os.path.relpath(os.path.join(root_dir, spec['file']), repo_root).replace(os.sep, '/'),
+                    'title': spec['title'],
+                    'fullTitle': ' › '.join(titles + [spec['title']]),
+                    'project': test.get('projectName', ''),
+                    'status': test.get('status', 'skipped'),
+                    'durationMs': sum(result.get('duration', 0) for result in results),
+                    'error': errors[0] if errors else None,
+                })
+        for child in suite.get('suites', []):
+            visit(child, titles)
+
+    for suite in report.get('suites', []):
+        visit(suite, [])
+    return tests
+
+
+def match(tests: List[Dict], selection: Selection) -> List[Dict]:
+    """The report entries a selection refers to"""
+    spec, title = selection
+    spec_file = os.path.normcase(os.path.normpath(spec))
+    return [test for test in tests if os.path.normcase(os.path.normpath(test['file'])) == spec_file
+            and (title is None or title in (test['title'], test['fullTitle']))]
+
+
+def outcome(check: Dict, tests: List[Dict], report: Dict) -> Tuple[bool, str, Optional[Dict]]:
+    """Result of one check from the report's tests (see report_tests())"""
+    label = check.get('target') or ', '.join(spec for spec, _ in selections(check))
+    missing = [(spec, title) for spec, title in selections(check) if title is not None
+               and not match(tests, (spec, title))]
+    if missing:
+        return False, '; '.join(f"no test titled '{title}' in {spec}" for spec, title in missing), None
+    matched = {id(test): test for selection in selections(check) for test in match(tests, selection)}
+    tests = list(matched.values())
+    if not tests:
+        errors = [_plain(error.get('message', '')) for error in report.get('errors', [])]
+        errors = [error for error in errors if error and 'No tests found' not in error]
+        if errors:
+            return False, f"Playwright run failed: {errors[0]}", None
+        return True, f"E2E tests not run (no tests found, manual testing required): {label}", None
+    details = {'playwright': {'tests': tests}}
+    failed = [test for test in tests if test['status'] == 'unexpected']
+    if failed:
+        lines = [f"Playwright tests failed: {len(failed)} of {len(tests)} in {label}"]
+        lines.extend(f"  {test['fullTitle']}: {test['error'] or 'failed'}" for test in failed)
+        return False, '\n'.join(lines), details
+    flaky = sum(1 for test in tests if test['status'] == 'flaky')
+    message = f"Playwright tests passed: {label} ({len(tests)} tests"
+    return True, message + (f", {flaky} flaky)" if flaky else ")"), details
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+File change detection for the QA runner's watch mode (--watch)
+Linux inotify through ctypes, falling back to polling os.scandir() snapshots
+"""
+
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, Set, Tuple
+
+# Directory names never watched (tool output, caches, dependencies)
+IGNORED_DIRS = {'.git', '__pycache__', '.pytest_cache', 'node_modules', '.cache'}
+
+# Marker returned when events were lost and everything must be re-checked
+ALL_PATHS = '*'
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class WatcherUnavailable(Exception):
+    """Raised when a watcher backend cannot be used on this host"""
+
+
+def _walk_dirs(root: str, ignored: Set[str]) -> Iterable[str]:
+    """Yield root and every directory below it that is not ignored"""
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        yield path
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and entry.name not in IGNORED_DIRS:
+                        if _relative(root, entry.path) not in ignored:
+                            stack.append(entry.path)
+        except OSError:
+            continue
+
+
+def _relative(root: str, path: str) -> str:
+    rel = os.path.relpath(path, root)
+    return '' if rel == '.' else rel.replace(os.sep, '/')
+
+
+class _Watcher:
+    """Shared debounce logic: collect changes until the tree is quiet"""
+
+    def __init__(self, root: str, ignored: Iterable[str] = ()):
+        self.root = os.path.abspath(root)
+        self.ignored = set(ignored)
+
+    def _is_ignored(self, rel_path: str) -> bool:
+        if rel_path in self.ignored:
+            return True
+        parts = rel_path.split('/')
+        return any(part in IGNORED_DIRS for part in parts) or any(
+            '/'.join(parts[:i]) in self.ignored for i in range(1, len(parts)))
+
+    def _poll(self, timeout: float) -> Set[str]:
+        raise NotImplementedError
+
+    def changes(self, timeout: float = None, debounce: float = 0.05, max_wait: float = 0.5) -> Set[str]:
+        """Block until something changes; return the changed paths (or {ALL_PATHS})"""
+        changed = self._poll(timeout)
+        if not changed:
+            return set()
+        deadline = time.monotonic() + max_wait
+        while time.monotonic() < deadline:
+            more = self._poll(debounce)
+            if not more:
+                break
+            changed |= more
+        return {ALL_PATHS} if ALL_PATHS in changed else changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(_Watcher):
+    """Recursive inotify watch of the repository (Linux)"""
+
+    def __init__(self, root: str, ignored: Iterable[str] = ()):
+        super().__init__(root, ignored)
+        libc_name = ctypes.util.find_library('c')
+        if not hasattr(os, 'O_NONBLOCK') or not libc_name:
+            raise WatcherUnavailable('inotify requires Linux')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise WatcherUnavailable('libc has no inotify support')
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise WatcherUnavailable(os.strerror(ctypes.get_errno()))
+        self._dirs: Dict[int, str] = {}
+        try:
+            for path in _walk_dirs(self.root, self.ignored):
+                self._add_watch(path)
+        except WatcherUnavailable:
+            self.close()
+            raise
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            if errno == 28:  # ENOSPC: fs.inotify.max_user_watches reached
+                raise WatcherUnavailable('inotify watch limit reached')
+            return
+        self._dirs[wd] = _relative(self.root, path)
+
+    def _poll(self, timeout: float) -> Set[str]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self._fd, 256 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                changed.add(ALL_PATHS)
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            base = self._dirs.get(wd)
+            if base is None:
+                continue
+            rel_path = f'{base}/{name}' if base and name else (name or base)
+            if self._is_ignored(rel_path):
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # new directory: watch it and report the files already inside
+                for path in _walk_dirs(os.path.join(self.root, rel_path), self.ignored):
+                    self._add_watch(path)
+                    changed.update(f'{_relative(self.root, path)}/{entry}'
+                                   for entry in os.listdir(path))
+            changed.add(rel_path)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(_Watcher):
+    """Portable fallback: compare (mtime, size) snapshots of the tree"""
+
+    def __init__(self, root: str, ignored: Iterable[str] = (), interval: float = 0.5):
+        super().__init__(root, ignored)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for dir_path in _walk_dirs(self.root, self.ignored):
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        if entry.is_file(follow_symlinks=False):
+                            rel_path = _relative(self.root, entry.path)
+                            if not self._is_ignored(rel_path):
+                                stat = entry.stat(follow_symlinks=False)
+                                snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def _poll(self, timeout: float) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            previous, self._snapshot = self._snapshot, current
+            changed = {path for path in previous.keys() | current.keys()
+                       if previous.get(path) != current.get(path)}
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+
+
+def create_watcher(root: str, ignored: Iterable[str] = (), polling: bool = False,
+                   interval: float = 0.5) -> _Watcher:
+    """Return an inotify watcher where possible, else a polling watcher"""
+    if not polling:
+        try:
+            return InotifyWatcher(root, ignored)
+        except (WatcherUnavailable, OSError, AttributeError):
+            pass
+    return PollingWatcher(root, ignored, interval)
+
+
+@lru_cache(maxsize=1024)
+def _glob_regex(spec: str) -> 're.Pattern[str]':
+    """Translate a recursive glob ('**' spans directories, '*' does not)"""
+    parts = []
+    i = 0
+    while i < len(spec):
+        if spec.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif spec.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif spec[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif spec[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        else:
+            parts.append(re.escape(spec[i]))
+            i += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+
+def path_matches(spec: str, rel_path: str) -> bool:
+    """True if a change to rel_path can affect a check input spec"""
+    if spec.endswith('/'):
+        # directory listing: the directory itself or its direct entries
+        directory = spec.rstrip('/')
+        return rel_path == directory or os.path.dirname(rel_path) == directory
+    if '*' in spec or '?' in spec:
+        return _glob_regex(spec).match(rel_path) is not None
+    return rel_path == spec.strip('/') or rel_path.startswith(spec.rstrip('/') + '/')
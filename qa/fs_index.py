@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+In-memory snapshot of the repository tree for the QA runner
+Existence, emptiness and glob checks are dictionary lookups instead of stat calls
+Ignored directories are not descended into; invalidate() refreshes changed paths
+"""
+
+import fnmatch
+import glob as _glob
+import os
+import posixpath
+import sys
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Directory names (any depth) or repo-relative paths that are not indexed
+DEFAULT_IGNORES = ('.git', 'node_modules', 'projects/_clipboard')
+
+# Marker for "everything changed" (same as file_watcher.ALL_PATHS)
+ALL_PATHS = '*'
+
+# Misses are confirmed on disk where file names are case-insensitive
+_CASE_INSENSITIVE = sys.platform in ('win32', 'darwin')
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f'{rel_dir}/{name}' if rel_dir else name
+
+
+def _has_magic(part: str) -> bool:
+    return any(c in part for c in '*?[')
+
+
+class FsIndex:
+    """Directory listings of a repository, read once and refreshed lazily"""
+
+    def __init__(self, root: str, ignores: Iterable[str] = DEFAULT_IGNORES):
+        self.root = os.path.abspath(root)
+        self.ignores: Set[str] = set(ignores)
+        self._lock = threading.Lock()
+        self._dirs: Optional[Dict[str, Dict[str, bool]]] = None
+        # directories listed but not descended into (ignored or symlinked)
+        self._opaque: Set[str] = set()
+        self._stale: Set[str] = set()
+        self.scans = 0
+
+    def configure(self, ignores: Iterable[str]):
+        """Change the ignored directories (drops the snapshot if they differ)"""
+        ignores = set(ignores)
+        if ignores != self.ignores:
+            with self._lock:
+                self.ignores = ignores
+                self._dirs = None
+
+    def invalidate(self, paths: Iterable[str] = (ALL_PATHS,)):
+        """Mark changed repo-relative paths stale; ALL_PATHS drops the snapshot"""
+        with self._lock:
+            if self._dirs is None:
+                return
+            for path in paths:
+                if path == ALL_PATHS:
+                    self._dirs = None
+                    self._stale.clear()
+                    return
+                path = path.strip('/')
+                self._stale.add(posixpath.dirname(path))
+                if path in self._dirs:
+                    self._stale.add(path)
+
+    # -- snapshot -------------------------------------------------------
+
+    def _ensure(self):
+        if self._dirs is not None and not self._stale:
+            return
+        with self._lock:
+            if self._dirs is None:
+                dirs: Dict[str, Dict[str, bool]] = {}
+                self._opaque = set()
+                self._scan(dirs, '')
+                self._dirs = dirs
+            # readers wait on the lock until every stale directory is re-read
+            while self._stale:
+                for rel_dir in list(self._stale):
+                    if not self._is_opaque(rel_dir):
+                        self._refresh(rel_dir)
+                    self._stale.discard(rel_dir)
+
+    def _refresh(self, rel_dir: str):
+        # a directory that is new to its parent is picked up by re-reading the parent
+        while rel_dir and not (rel_dir in self._dirs
+                               and self._dirs.get(posixpath.dirname(rel_dir), {}).get(posixpath.basename(rel_dir))):
+            rel_dir = posixpath.dirname(rel_dir)
+        self._scan(self._dirs, rel_dir)
+
+    def _scan(self, dirs: Dict[str, Dict[str, bool]], rel_dir: str):
+        """Read one directory, and every directory below it that is not indexed yet"""
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            children = {}
+            try:
+                with os.scandir(os.path.join(self.root, current)) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        children[entry.name] = is_dir
+                        child = _join(current, entry.name)
+                        if not is_dir:
+                            continue
+                        if entry.name in self.ignores or child in self.ignores or entry.is_symlink():
+                            self._opaque.add(child)
+                        elif child not in dirs:
+                            stack.append(child)
+            except OSError:
+                self._drop(dirs, current)
+                if current:
+                    self._stale.add(posixpath.dirname(current))
+                continue
+            self.scans += 1
+            for name, was_dir in dirs.get(current, {}).items():
+                if was_dir and not children.get(name):
+                    self._drop(dirs, _join(current, name))
+            dirs[current] = children
+
+    def _drop(self, dirs: Dict[str, Dict[str, bool]], rel_dir: str):
+        prefix = rel_dir + '/'
+        for key in [key for key in dirs if key == rel_dir or key.startswith(prefix)]:
+            del dirs[key]
+        self._opaque = {key for key in self._opaque if key != rel_dir and not key.startswith(prefix)}
+
+    def _is_opaque(self, rel_path: str) -> bool:
+        """True if rel_path is, or is inside, a directory that is not indexed"""
+        parts = rel_path.split('/')
+        return any('/'.join(parts[:i]) in self._opaque for i in range(1, len(parts) + 1))
+
+    def _relative(self, target: str) -> Optional[str]:
+        """Repo-relative '/' path of target, or None outside the repository"""
+        path = str(target)
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.root)
+        path = posixpath.normpath(path.replace('\\', '/'))
+        if path == '.':
+            return ''
+        if path == '..' or path.startswith('../') or path.startswith('/'):
+            return None
+        return path
+
+    # -- lookups --------------------------------------------------------
+
+    def kind(self, target: str) -> Optional[str]:
+        """'dir', 'file' or None when target does not exist"""
+        self._ensure()
+        rel = self._relative(target)
+        if rel == '':
+            return 'dir'
+        if rel is not None and not self._is_opaque(posixpath.dirname(rel)):
+            is_dir = self._dirs.get(posixpath.dirname(rel), {}).get(posixpath.basename(rel))
+            if is_dir is not None:
+                return 'dir' if is_dir else 'file'
+            if not _CASE_INSENSITIVE:
+                return None
+        path = os.path.join(self.root, target)
+        if os.path.isdir(path):
+            return 'dir'
+        return 'file' if os.path.exists(path) else None
+
+    def listdir(self, target: str) -> Optional[List[str]]:
+        """Sorted entry names of a directory, or None if it is not a directory"""
+        self._ensure()
+        rel = self._relative(target)
+        if rel is not None and not self._is_opaque(rel):
+            children = self._dirs.get(rel)
+            if children is not None:
+                return sorted(children)
+            if not _CASE_INSENSITIVE:
+                return None
+        try:
+            return sorted(os.listdir(os.path.join(self.root, target)))
+        except OSError:
+            return None
+
+    def glob(self, pattern: str) -> List[str]:
+        """Sorted absolute paths matching a recursive glob, like glob.glob(recursive=True)"""
+        self._ensure()
+        parts = pattern.replace('\\', '/').strip('/').split('/')
+        literal = 0
+        while literal < len(parts) and not _has_magic(parts[literal]):
+            literal += 1
+        base = self._relative('/'.join(parts[:literal]) or '.')
+        if literal == len(parts):
+            return [os.path.join(self.root, pattern)] if self.kind(pattern) else []
+        if base is None or self._is_opaque(base) or (_CASE_INSENSITIVE and base not in self._dirs):
+            return sorted(_glob.glob(os.path.join(self.root, pattern), recursive=True))
+
+        matches: Dict[str, None] = {}
+        self._match(base, parts[literal:], matches)
+        return [os.path.join(self.root, *rel.split('/')) for rel in sorted(matches)]
+
+    def _match(self, rel_dir: str, parts: List[str], matches: Dict[str, None]):
+        children = self._dirs.get(rel_dir)
+        if children is None:
+            return
+        part, rest = parts[0], parts[1:]
+        if part == '**':
+            # zero or more directories; hidden ones are skipped, as glob does
+            if rest:
+                self._match(rel_dir, rest, matches)
+            else:
+                matches[rel_dir] = None
+            for name, is_dir in children.items():
+                child = _join(rel_dir, name)
+                if name.startswith('.'):
+                    continue
+                if not rest:
+                    matches[child] = None
+                if is_dir and child not in self._opaque:
+                    self._match(child, parts, matches)
+            return
+        if _has_magic(part):
+            names = [name for name in children
+                     if fnmatch.fnmatch(name, part) and (part.startswith('.') or not name.startswith('.'))]
+        else:
+            names = [part] if part in children else []
+        for name in names:
+            child = _join(rel_dir, name)
+            if not rest:
+                matches[child] = None
+            elif children[name] and child not in self._opaque:
+                self._match(child, rest, matches)
+
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """os.walk(top) from the snapshot (ignored directories are left out)"""
+        self._ensure()
+        rel = self._relative(top)
+        if rel is None or self._is_opaque(rel) or rel not in self._dirs:
+            yield from os.walk(top)
+            return
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            children = self._dirs.get(current)
+            if children is None:
+                continue
+            dir_names = sorted(name for name, is_dir in children.items()
+                               if is_dir and _join(current, name) not in self._opaque)
+            file_names = sorted(name for name, is_dir in children.items() if not is_dir)
+            yield os.path.join(self.root, *current.split('/')) if current else self.root, dir_names, file_names
+            # the caller may prune dir_names, as with os.walk
+            stack.extend(_join(current, name) for name in reversed(dir_names))
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+HTML index for the QA runner and the pytest suite
+Answers test-ID, id, class and tag lookups for src/frontend/index.html from dictionaries
+"""
+
+import codecs
+import hashlib
+import os
+import re
+import threading
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# Elements that never have a closing tag
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr',
+}
+
+# Elements whose content is raw text, not markup or visible text
+RAW_TEXT_ELEMENTS = {'script', 'style'}
+
+CHUNK_SIZE = 64 * 1024
+
+# Simple selector grammar: tag? then any of #id, .class, [attr], [attr=value]
+_SELECTOR_PART = re.compile(
+    r"#(?P<id>[\w\-]+)"
+    r"|\.(?P<cls>[\w\-]+)"
+    r"|\[(?P<attr>[\w\-:]+)(?:\s*=\s*(?:'(?P<sq>[^']*)'|\"(?P<dq>[^\"]*)\"|(?P<bare>[^\]\s]+)))?\]"
+)
+_TAG_PREFIX = re.compile(r"^[a-zA-Z][\w\-]*")
+
+# Test IDs written into markup strings inside inline scripts (rendered at runtime)
+_SCRIPT_TESTID = re.compile(r'data-testid="([^"$]+)"')
+
+
+class _IndexParser(HTMLParser):
+    """Streaming parser that records every element into an HtmlIndex"""
+
+    def __init__(self, index: 'HtmlIndex'):
+        super().__init__(convert_charrefs=True)
+        self.index = index
+        self.stack: List[Tuple[str, dict]] = []
+        self.raw_tag: Optional[str] = None
+        self.raw_attrs: Dict[str, str] = {}
+        self.raw_line = 0
+        self.raw_parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        element = self.index._add_element(tag, attrs, self.getpos()[0],
+                                          self.stack[-1][1] if self.stack else None)
+        if tag in RAW_TEXT_ELEMENTS:
+            self.raw_tag = tag
+            self.raw_attrs = element['attrs']
+            self.raw_line = self.getpos()[0]
+            self.raw_parts = []
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, element))
+
+    def handle_startendtag(self, tag, attrs):
+        self.index._add_element(tag, attrs, self.getpos()[0],
+                                self.stack[-1][1] if self.stack else None)
+
+    def handle_endtag(self, tag):
+        if tag == self.raw_tag:
+            self.index._add_raw_block(tag, self.raw_attrs, self.raw_line, ''.join(self.raw_parts))
+            self.raw_tag = None
+        # Pop up to the matching open tag; ignore stray closing tags
+        for pos in range(len(self.stack) - 1, -1, -1):
+            if self.stack[pos][0] == tag:
+                del self.stack[pos:]
+                return
+
+    def handle_data(self, data):
+        if self.raw_tag:
+            self.raw_parts.append(data)
+            return
+        if data.strip():
+            for _, element in self.stack:
+                element['_text'].append(data)
+
+
+class HtmlIndex:
+    """In-memory index of the elements of one HTML document"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self.sha256 = ''
+        self.elements: List[dict] = []
+        self.by_testid: Dict[str, dict] = {}
+        self.by_id: Dict[str, dict] = {}
+        self.by_class: Dict[str, List[dict]] = {}
+        self.by_tag: Dict[str, List[dict]] = {}
+        self.script_testids: Dict[str, int] = {}
+        self.inline_styles: List[dict] = []
+        self.scripts: List[dict] = []
+        self.styles: List[dict] = []
+
+    # -- building -------------------------------------------------------
+
+    def _add_element(self, tag: str, attrs: List[Tuple[str, Optional[str]]], line: int,
+                     parent: Optional[dict]) -> dict:
+        attr_map = {name: (value if value is not None else '') for name, value in attrs}
+        element = {
+            'tag': tag,
+            'attrs': attr_map,
+            'classes': attr_map.get('class', '').split(),
+            'testid': attr_map.get('data-testid'),
+            'id': attr_map.get('id'),
+            'inline_style': 'style' in attr_map,
+            'line': line,
+            'parent': parent,
+            'text': '',
+            '_text': [],
+        }
+        self.elements.append(element)
+        if element['testid'] is not None:
+            self.by_testid.setdefault(element['testid'], element)
+        if element['id'] is not None:
+            self.by_id.setdefault(element['id'], element)
+        for cls in element['classes']:
+            self.by_class.setdefault(cls, []).append(element)
+        self.by_tag.setdefault(tag, []).append(element)
+        if element['inline_style']:
+            self.inline_styles.append(element)
+        return element
+
+    def _add_raw_block(self, tag: str, attrs: Dict[str, str], line: int, content: str):
+        block = {'attrs': attrs, 'line': line, 'content': content}
+        if tag == 'script':
+            if 'src' not in attrs:
+                self.scripts.append(block)
+            last_pos = 0
+            for match in _SCRIPT_TESTID.finditer(content):
+                line += content.count('\n', last_pos, match.start())
+                last_pos = match.start()
+                self.script_testids.setdefault(match.group(1), line)
+        else:
+            self.styles.append(block)
+
+    def _finish(self):
+        for element in self.elements:
+            element['text'] = ' '.join(' '.join(element.pop('_text')).split())
+
+    # -- queries --------------------------------------------------------
+
+    def has_testid(self, test_id: str) -> bool:
+        """Return True if data-testid="test_id" is in the markup or a script template"""
+        return test_id in self.by_testid or test_id in self.script_testids
+
+    def get_testid(self, test_id: str) -> Optional[dict]:
+        """Return the first element carrying the given data-testid"""
+        return self.by_testid.get(test_id)
+
+    def select(self, selector: str) -> List[dict]:
+        """Return the elements matching a simple compound selector (tag, #id, .class, [attr], [attr='value'])"""
+        selector = selector.strip()
+        tag_match = _TAG_PREFIX.match(selector)
+        tag = tag_match.group(0).lower() if tag_match else None
+        rest = selector[tag_match.end():] if tag_match else selector
+
+        ids, classes, attrs = [], [], []
+        pos = 0
+        while pos < len(rest):
+            part = _SELECTOR_PART.match(rest, pos)
+            if not part:
+                raise ValueError(f"Unsupported selector: {selector}")
+            if part.group('id'):
+                ids.append(part.group('id'))
+            elif part.group('cls'):
+                classes.append(part.group('cls'))
+            else:
+                value = next((v for v in (part.group('sq'), part.group('dq'), part.group('bare'))
+                              if v is not None), None)
+                attrs.append((part.group('attr'), value))
+            pos = part.end()
+
+        # Pick the narrowest dictionary to start from, then filter
+        if ids:
+            seed = self.by_id.get(ids[0]) or self.by_testid.get(ids[0])
+            candidates = [seed] if seed else []
+        elif attrs and attrs[0][0] == 'data-testid' and attrs[0][1] is not None:
+            seed = self.by_testid.get(attrs[0][1])
+            candidates = [seed] if seed else []
+        elif classes:
+            candidates = self.by_class.get(classes[0], [])
+        elif tag:
+            candidates = self.by_tag.get(tag, [])
+        else:
+            candidates = self.elements
+
+        def matches(element: dict) -> bool:
+            if tag and element['tag'] != tag:
+                return False
+            if any(element['id'] != i and element['testid'] != i for i in ids):
+                return False
+            if any(c not in element['classes'] for c in classes):
+                return False
+            for name, value in attrs:
+                if name not in element['attrs']:
+                    return False
+                if value is not None and element['attrs'][name] != value:
+                    return False
+            return True
+
+        return [element for element in candidates if matches(element)]
+
+    def descendants(self, ancestor: dict, tag: str) -> List[dict]:
+        """Return elements of the given tag nested inside ancestor"""
+        found = []
+        for element in self.by_tag.get(tag, []):
+            parent = element['parent']
+            while parent is not None and parent is not ancestor:
+                parent = parent['parent']
+            if parent is ancestor:
+                found.append(element)
+        return found
+
+    def stylesheets(self) -> List[str]:
+        """Return hrefs of linked stylesheets"""
+        return [link['attrs'].get('href', '') for link in self.by_tag.get('link', [])
+                if 'stylesheet' in link['attrs'].get('rel', '').lower().split()]
+
+
+def build_html_index(path: str) -> HtmlIndex:
+    """Parse an HTML file in one streaming pass"""
+    index = HtmlIndex(path)
+    parser = _IndexParser(index)
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    index.sha256 = digest.hexdigest()
+    index._finish()
+    return index
+
+
+_cache: Dict[str, Tuple[Tuple[int, int], HtmlIndex]] = {}
+_cache_lock = threading.Lock()
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_html_index(path: str) -> HtmlIndex:
+    """Return the cached index for path, re-parsing only if the file changed"""
+    path = os.path.abspath(str(path))
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        if cached and cached[1].sha256 == _file_digest(path):
+            _cache[path] = (signature, cached[1])
+            return cached[1]
+        index = build_html_index(path)
+        _cache[path] = (signature, index)
+        return index
+
+
+def clear_cache():
+    """Drop all cached indexes"""
+    with _cache_lock:
+        _cache.clear()
+
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+
+
+def parse_css_rules(css: str) -> Dict[str, Dict[str, str]]:
+    """Map each simple selector to its merged declarations (last one wins)"""
+    rules: Dict[str, Dict[str, str]] = {}
+    for selectors, body in _CSS_RULE.findall(_CSS_COMMENT.sub('', css)):
+        declarations = {}
+        for declaration in body.split(';'):
+            if ':' in declaration:
+                name, value = declaration.split(':', 1)
+                declarations[name.strip().lower()] = value.strip()
+        for selector in selectors.split(','):
+            rules.setdefault(selector.strip(), {}).update(declarations)
+    return rules
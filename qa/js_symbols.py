@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Symbol index of the frontend JavaScript for the QA runner and the pytest suite
+Records functions, variables, window assignments and inline handler calls per name
+Symbols per source are cached in qa/.cache/js-symbols.json under the source's SHA-256
+"""
+
+import bisect
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_FILE = os.path.join('qa', '.cache', 'js-symbols.json')
+
+# Sources kept in the on-disk cache, shared by all page directories (least recently used dropped first)
+MAX_CACHED_SOURCES = 512
+
+# Comments and string literals (template literals span lines)
+_TOKEN = re.compile(
+    r"//[^\n]*"
+    r"|/\*.*?\*/"
+    r"|\"(?:\\.|[^\"\\\n])*\""
+    r"|'(?:\\.|[^'\\\n])*'"
+    r"|`(?:\\.|[^`\\])*`",
+    re.DOTALL)
+
+_NAME = r"[A-Za-z_$][\w$]*"
+_FUNCTION_DECL = re.compile(rf"\b(?:async\s+)?function\s*\*?\s*({_NAME})\s*\(")
+_BINDING = re.compile(rf"\b(var|let|const)\s+({_NAME})\s*(=\s*)?")
+_WINDOW_ASSIGN = re.compile(rf"\bwindow(?:\.({_NAME})|\[\s*['\"]({_NAME})['\"]\s*\])\s*=(?![=>])\s*")
+_FUNCTION_VALUE = re.compile(rf"(?:async\s+)?(?:function\b|\(\s*(?:{_NAME}\s*(?:,\s*{_NAME}\s*)*)?\)\s*=>|{_NAME}\s*=>)")
+_OBJECT_VALUE = re.compile(r"[{\[]|new\b")
+
+# Inline event handler attributes, in markup or in markup strings
+_HANDLER_ATTR = re.compile(r"(?<![\w.])(on[a-z]+)\s*=\s*\\?([\"'])(.*?)\\?\2")
+# A call in handler code: `name(` or `window.name(`, not a method call
+_HANDLER_CALL = re.compile(rf"(?<![\w$.])(?:window\.)?({_NAME})\s*\(")
+
+# Names a handler can call without the page defining them
+BROWSER_GLOBALS = {
+    'alert', 'confirm', 'prompt', 'console', 'document', 'window', 'location', 'history',
+    'setTimeout', 'setInterval', 'clearTimeout', 'clearInterval', 'fetch', 'event',
+    'parseInt', 'parseFloat', 'encodeURIComponent', 'decodeURIComponent', 'JSON', 'Object',
+    'Array', 'String', 'Number', 'Boolean', 'Date', 'Math', 'localStorage', 'sessionStorage',
+    'navigator', 'print', 'open', 'close', 'focus', 'blur', 'this',
+}
+_KEYWORDS = {'if', 'for', 'while', 'switch', 'return', 'function', 'typeof', 'new', 'catch', 'void', 'delete'}
+
+
+def _blank(text: str) -> str:
+    """Same-length text of spaces, keeping line breaks"""
+    return re.sub(r"[^\n]", ' ', text)
+
+
+def _strip(code: str) -> Tuple[str, str]:
+    """(code without comments, code without comments and string contents)"""
+    without_comments, without_strings = [], []
+    last = 0
+    for match in _TOKEN.finditer(code):
+        token = match.group(0)
+        without_comments.append(code[last:match.start()])
+        without_strings.append(code[last:match.start()])
+        if token[0] == '/':
+            without_comments.append(_blank(token))
+            without_strings.append(_blank(token))
+        else:
+            without_comments.append(token)
+            without_strings.append(token[0] + _blank(token[1:-1]) + token[-1])
+        last = match.end()
+    without_comments.append(code[last:])
+    without_strings.append(code[last:])
+    return ''.join(without_comments), ''.join(without_strings)
+
+
+def _value_kind(code: str, pos: int) -> str:
+    """'function', 'object' or 'value' for the expression starting at pos"""
+    if _FUNCTION_VALUE.match(code, pos):
+        return 'function'
+    if _OBJECT_VALUE.match(code, pos):
+        return 'object'
+    return 'value'
+
+
+def scan_source(code: str, first_line: int = 1) -> Dict[str, Dict[str, List]]:
+    """Symbols of one script: {kind: {name: [[line, ...], ...]}}"""
+    text, code = _strip(code)
+    newlines = [match.start() for match in re.finditer('\n', code)]
+
+    def line_of(pos: int) -> int:
+        return first_line + bisect.bisect_left(newlines, pos)
+
+    # brace depth at every declaration decides whether it is global
+    depth_marks: List[Tuple[int, int]] = []
+    depth = 0
+    for match in re.finditer(r"[{}]", code):
+        depth += 1 if match.group(0) == '{' else -1
+        depth_marks.append((match.start(), depth))
+    positions = [pos for pos, _ in depth_marks]
+
+    def is_global(pos: int) -> bool:
+        i = bisect.bisect_left(positions, pos) - 1
+        return i < 0 or depth_marks[i][1] <= 0
+
+    symbols: Dict[str, Dict[str, List]] = {'functions': {}, 'variables': {}, 'window': {}, 'handlers': {}}
+    for match in _FUNCTION_DECL.finditer(code):
+        top = is_global(match.start())
+        symbols['functions'].setdefault(match.group(1), []).append([line_of(match.start()), top, top])
+    for match in _BINDING.finditer(code):
+        kind = _value_kind(code, match.end()) if match.group(3) else 'value'
+        top = is_global(match.start())
+        entry = [line_of(match.start()), top, top and match.group(1) == 'var']
+        if kind == 'function':
+            symbols['functions'].setdefault(match.group(2), []).append(entry)
+        symbols['variables'].setdefault(match.group(2), []).append(entry + [kind])
+    # window['name'] needs the string; matches that start inside a string are dropped
+    for match in _WINDOW_ASSIGN.finditer(text):
+        if code[match.start()] != 'w':
+            continue
+        name = match.group(1) or match.group(2)
+        symbols['window'].setdefault(name, []).append([line_of(match.start()), _value_kind(code, match.end())])
+    for match in _HANDLER_ATTR.finditer(text):
+        _add_handler_calls(symbols['handlers'], match.group(3), match.group(1), line_of(match.start()))
+    return symbols
+
+
+def _add_handler_calls(handlers: Dict[str, List], handler_code: str, attribute: str, line: int):
+    for call in _HANDLER_CALL.finditer(handler_code):
+        if call.group(1) not in _KEYWORDS:
+            handlers.setdefault(call.group(1), []).append([line, attribute])
+
+
+def scan_markup(html_index) -> Dict[str, Dict[str, List]]:
+    """Handler attribute calls in the elements of an HtmlIndex"""
+    handlers: Dict[str, List] = {}
+    for element in html_index.elements:
+        for attribute, value in element['attrs'].items():
+            if attribute.startswith('on') and value:
+                _add_handler_calls(handlers, value, attribute, element['line'])
+    return {'functions': {}, 'variables': {}, 'window': {}, 'handlers': handlers}
+
+
+class SymbolIndex:
+    """Merged symbols of all scripts of a page; entries carry their source path"""
+
+    def __init__(self):
+        self.sources: Dict[str, str] = {}
+        self.functions: Dict[str, List[Dict]] = {}
+        self.variables: Dict[str, List[Dict]] = {}
+        self.window: Dict[str, List[Dict]] = {}
+        self.handlers: Dict[str, List[Dict]] = {}
+
+    def _add(self, source: str, symbols: Dict[str, Dict[str, List]]):
+        for name, entries in symbols['functions'].items():
+            self.functions.setdefault(name, []).extend(
+                {'source': source, 'line': line, 'global': top, 'window': on_window}
+                for line, top, on_window in entries)
+        for name, entries in symbols['variables'].items():
+            self.variables.setdefault(name, []).extend(
+                {'source': source, 'line': line, 'global': top, 'window': on_window, 'kind': kind}
+                for line, top, on_window, kind in entries)
+        for name, entries in symbols['window'].items():
+            self.window.setdefault(name, []).extend(
+                {'source': source, 'line': line, 'kind': kind} for line, kind in entries)
+        for name, entries in symbols['handlers'].items():
+            self.handlers.setdefault(name, []).extend(
+                {'source': source, 'line': line, 'attribute': attribute} for line, attribute in entries)
+
+    def defines(self, name: str) -> bool:
+        """True if any script declares or assigns name (at any scope)"""
+        return name in self.functions or name in self.variables or name in self.window
+
+    def window_kind(self, name: str) -> Optional[str]:
+        """Kind of window.name: 'function', 'object', 'value' or None if never set"""
+        kinds = [entry['kind'] for entry in self.window.get(name, [])]
+        kinds.extend(entry['kind'] for entry in self.variables.get(name, []) if entry['window'])
+        if any(entry['window'] for entry in self.functions.get(name, [])):
+            kinds.append('function')
+        for kind in ('function', 'object', 'value'):
+            if kind in kinds:
+                return kind
+        return None
+
+    def is_global(self, name: str) -> bool:
+        """True if name can be called from a handler attribute"""
+        return (name in self.window or name in BROWSER_GLOBALS
+                or any(entry['global'] for entry in self.functions.get(name, []) + self.variables.get(name, [])))
+
+    def undefined_handlers(self) -> List[Dict]:
+        """Handler attribute calls whose target is never defined globally"""
+        return [dict(entry, name=name) for name, entries in sorted(self.handlers.items())
+                if not self.is_global(name) for entry in entries]
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _page_sources(directory: str) -> List[Tuple[str, str]]:
+    """(path, kind) of the JS files and the index.html of a directory"""
+    sources = [(path, 'js') for path in sorted(glob.glob(os.path.join(directory, '*.js')))]
+    html_file = os.path.join(directory, 'index.html')
+    if os.path.isfile(html_file):
+        sources.append((html_file, 'html'))
+    return sources
+
+
+def _read_cache(cache_file: str) -> Dict[str, Dict]:
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == CACHE_VERSION:
+            return data.get('sources', {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _write_cache(cache_file: str, entries: Dict[str, Dict]):
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'sources': entries}, f, separators=(',', ':'))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+
+
+def _scan_html(path: str) -> Dict[str, Dict[str, List]]:
+    """Symbols of the classic inline scripts and the handler attributes of a page"""
+    from html_index import load_html_index
+
+    index = load_html_index(path)
+    symbols = scan_markup(index)
+    for block in index.scripts:
+        if block['attrs'].get('type', '').strip().lower() not in ('', 'text/javascript', 'application/javascript'):
+            continue
+        for kind, names in scan_source(block['content'], block['line']).items():
+            for name, entries in names.items():
+                symbols[kind].setdefault(name, []).extend(entries)
+    return symbols
+
+
+def build_symbol_index(directory: str, cache_file: Optional[str] = None) -> SymbolIndex:
+    """Index the scripts of a page directory, reusing cached symbols of unchanged sources"""
+    cached = _read_cache(cache_file) if cache_file else {}
+    used: Dict[str, Dict] = {}
+    index = SymbolIndex()
+    for path, kind in _page_sources(directory):
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = _digest(data)
+        symbols = cached.get(digest)
+        if symbols is None:
+            if kind == 'js':
+                symbols = scan_source(data.decode('utf-8', errors='replace'))
+            else:
+                symbols = _scan_html(path)
+        used[digest] = symbols
+        index.sources[os.path.relpath(path, directory).replace(os.sep, '/')] = digest
+        index._add(os.path.relpath(path, directory).replace(os.sep, '/'), symbols)
+    if cache_file and not used.keys() <= cached.keys():
+        # keep the other directories' sources; the ones just used move to the end
+        merged = {digest: symbols for digest, symbols in cached.items() if digest not in used}
+        merged.update(used)
+        _write_cache(cache_file, dict(list(merged.items())[-MAX_CACHED_SOURCES:]))
+    return index
+
+
+_cache: Dict[str, Tuple[Tuple, SymbolIndex]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_symbol_index(directory: str, cache_file: Optional[str] = None) -> SymbolIndex:
+    """Return the cached index of a page directory, rebuilding it when a source changed"""
+    directory = os.path.abspath(str(directory))
+    signature = []
+    for path, _ in _page_sources(directory):
+        stat = os.stat(path)
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    signature = tuple(signature)
+    with _cache_lock:
+        cached = _cache.get(directory)
+        if cached and cached[0] == signature:
+            return cached[1]
+        index = build_symbol_index(directory, cache_file)
+        _cache[directory] = (signature, index)
+        return index
+
+
+def clear_cache():
+    """Drop all cached indexes (the on-disk cache is kept)"""
+    with _cache_lock:
+        _cache.clear()
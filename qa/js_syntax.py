@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Batched JavaScript syntax validation through one long-lived Node process
+All files of a js_syntax_check go to qa/js_syntax_worker.js in a single request
+"""
+
+import atexit
+import itertools
+import json
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / 'js_syntax_worker.js'
+
+# Upper bound for one batch; generous because it covers every file at once
+DEFAULT_TIMEOUT = 30
+
+
+class NodeUnavailable(Exception):
+    """Raised when Node.js cannot be started"""
+
+
+class NodeSyntaxWorker:
+    """Client for a persistent js_syntax_worker.js process"""
+
+    def __init__(self, node: str = 'node'):
+        self.node = node
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _ensure_started(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return
+        try:
+            self._proc = subprocess.Popen(
+                [self.node, str(WORKER_SCRIPT)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+                bufsize=1,
+            )
+        except (FileNotFoundError, PermissionError) as e:
+            raise NodeUnavailable(str(e))
+
+    def check(self, files: List[str], sources: List[Dict] = None,
+              timeout: float = DEFAULT_TIMEOUT) -> List[Dict]:
+        """Return one diagnostic dict per file/source: name, ok, line, error"""
+        with self._lock:
+            self._ensure_started()
+            proc = self._proc
+            request_id = next(self._ids)
+            request = {'id': request_id, 'files': files, 'sources': sources or []}
+            # A watchdog kills a hung worker; readline() then returns ''
+            watchdog = threading.Timer(timeout, proc.kill)
+            watchdog.start()
+            try:
+                proc.stdin.write(json.dumps(request) + '\n')
+                proc.stdin.flush()
+                line = proc.stdout.readline()
+            except (BrokenPipeError, OSError):
+                line = ''
+            finally:
+                watchdog.cancel()
+
+            if not line:
+                self._proc = None
+                raise TimeoutError(f"Node syntax worker did not answer within {timeout}s")
+            response = json.loads(line)
+            if response.get('id') != request_id:
+                self.close()
+                raise RuntimeError(f"Node syntax worker protocol error: {response.get('error', line[:200])}")
+            return response['results']
+
+    def close(self):
+        """Stop the worker process"""
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+
+
+_worker: Optional[NodeSyntaxWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> NodeSyntaxWorker:
+    """Return the process-wide worker"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = NodeSyntaxWorker()
+            atexit.register(_worker.close)
+        return _worker
+
+
+def inline_scripts(index) -> List[Dict]:
+    """Return the classic inline <script> blocks of an HtmlIndex as worker sources"""
+    sources = []
+    for number, block in enumerate(index.scripts, start=1):
+        script_type = block['attrs'].get('type', '').strip().lower()
+        if script_type not in ('', 'text/javascript', 'application/javascript'):
+            continue
+        sources.append({
+            'name': f"{index.path}#script-{number}",
+            'code': block['content'],
+            'line': block['line'],
+        })
+    return sources
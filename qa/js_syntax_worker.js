@@ -0,0 +1,67 @@
+#!/usr/bin/env node
+// Long-lived JavaScript syntax checker for the QA runner (qa/js_syntax.py).
+//
+// Reads one JSON request per line on stdin:
+//   {"id": 1, "files": ["/abs/a.js"], "sources": [{"name": "index.html#script-1", "code": "...", "line": 120}]}
+// and writes one JSON response per line on stdout:
+//   {"id": 1, "results": [{"name": "/abs/a.js", "ok": false, "line": 3, "error": "SyntaxError: ..."}]}
+//
+// Files are compiled the way `node --check` treats CommonJS modules; inline
+// sources are compiled as classic scripts. Nothing is executed.
+'use strict';
+
+const fs = require('fs');
+const vm = require('vm');
+const readline = require('readline');
+
+const CJS_PARAMS = ['exports', 'require', 'module', '__filename', '__dirname'];
+
+function errorLine(err, name) {
+  // V8 puts "<filename>:<line>" on the first line of a SyntaxError stack
+  const first = String(err.stack || '').split('\n')[0];
+  if (first.startsWith(name + ':')) {
+    const line = parseInt(first.slice(name.length + 1), 10);
+    if (!Number.isNaN(line)) return line;
+  }
+  return null;
+}
+
+function checkFile(file) {
+  let code;
+  try {
+    code = fs.readFileSync(file, 'utf8');
+  } catch (err) {
+    return { name: file, ok: false, line: null, error: `Cannot read file: ${err.message}` };
+  }
+  if (code.startsWith('#!')) code = '//' + code.slice(2);
+  try {
+    vm.compileFunction(code, CJS_PARAMS, { filename: file });
+    return { name: file, ok: true };
+  } catch (err) {
+    return { name: file, ok: false, line: errorLine(err, file), error: `${err.name}: ${err.message}` };
+  }
+}
+
+function checkSource(source) {
+  try {
+    new vm.Script(source.code, { filename: source.name, lineOffset: (source.line || 1) - 1 });
+    return { name: source.name, ok: true };
+  } catch (err) {
+    return { name: source.name, ok: false, line: errorLine(err, source.name), error: `${err.name}: ${err.message}` };
+  }
+}
+
+const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+rl.on('line', (line) => {
+  if (!line.trim()) return;
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (err) {
+    process.stdout.write(JSON.stringify({ id: null, error: `Bad request: ${err.message}` }) + '\n');
+    return;
+  }
+  const results = (request.files || []).map(checkFile)
+    .concat((request.sources || []).map(checkSource));
+  process.stdout.write(JSON.stringify({ id: request.id, results }) + '\n');
+});
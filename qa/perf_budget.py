@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Payload size budgets for the perf_budget check type
+Measures a page's first-load files raw, gzip and brotli against budgets and a baseline
+
+Usage:
+    python3 qa/perf_budget.py                    # sizes and growth of every perf_budget page
+    python3 qa/perf_budget.py --update-baseline  # record the current sizes as the baseline
+"""
+
+import gzip
+import json
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+METRICS = ('raw', 'gzip', 'brotli')
+
+# zlib's default level, what servers use when compressing on the fly
+GZIP_LEVEL = 6
+
+# brotli's default quality, what precompressed assets are built with
+BROTLI_QUALITY = 11
+
+BASELINE_VERSION = 1
+
+DEFAULT_BASELINE = os.path.join('qa', 'perf-baseline.json')
+
+# Growth below this many bytes is noise, whatever the percentage
+GROWTH_FLOOR_BYTES = 512
+
+# Sizes of measured files, keyed by path, reused while the mtime/size signature holds
+_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Optional[int]]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _brotli():
+    """The brotli module, or None when it is not installed"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def measure(data: bytes) -> Dict[str, Optional[int]]:
+    """Raw, gzip and brotli sizes of data (brotli is None without the brotli package)"""
+    brotli = _brotli()
+    return {
+        'raw': len(data),
+        'gzip': len(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)),
+        'brotli': len(brotli.compress(data, quality=BROTLI_QUALITY)) if brotli else None,
+    }
+
+
+def measure_file(path: str) -> Dict[str, Optional[int]]:
+    """Sizes of a file, compressed again only when it changed"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+    with open(path, 'rb') as f:
+        sizes = measure(f.read())
+    with _cache_lock:
+        _cache[path] = (signature, sizes)
+    return sizes
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _is_local(url: str) -> bool:
+    return bool(url) and not url.startswith(('http:', 'https:', '//', 'data:'))
+
+
+def first_load_files(page: str) -> List[str]:
+    """The page and the local scripts and stylesheets it links, relative to the page"""
+    from html_index import load_html_index
+
+    index = load_html_index(page)
+    linked = [element['attrs'].get('src', '') for element in index.by_tag.get('script', [])]
+    linked.extend(index.stylesheets())
+    files = [os.path.basename(page)]
+    for url in linked:
+        name = os.path.normpath(url.split('?', 1)[0].split('#', 1)[0]).replace(os.sep, '/')
+        if _is_local(url) and name not in files:
+            files.append(name)
+    return files
+
+
+def measure_page(page: str) -> Dict:
+    """Sizes of every first-load file of a page and their total"""
+    directory = os.path.dirname(os.path.abspath(page))
+    files = {}
+    missing = []
+    for name in first_load_files(page):
+        try:
+            files[name] = measure_file(os.path.join(directory, name))
+        except OSError:
+            missing.append(name)
+    total = {}
+    for metric in METRICS:
+        values = [sizes[metric] for sizes in files.values()]
+        total[metric] = None if None in values else sum(values)
+    return {'files': files, 'total': total, 'missing': missing}
+
+
+def over_budget(sizes: Dict, budgets: Dict[str, Dict[str, int]]) -> Tuple[List[str], List[str]]:
+    """Return (budgets exceeded, budgets that could not be measured)"""
+    exceeded = []
+    unmeasured = []
+    for name, limits in budgets.items():
+        measured = sizes['total'] if name == 'total' else sizes['files'].get(name)
+        for metric, limit in limits.items():
+            value = measured.get(metric) if measured else None
+            if value is None:
+                unmeasured.append(f"{name} {metric}")
+            elif value > limit:
+                exceeded.append(f"{name} {metric}: {value} bytes (budget {limit}, {value - limit:+d})")
+    return exceeded, unmeasured
+
+
+def growth(sizes: Dict, baseline: Dict, max_growth: float) -> List[str]:
+    """Describe every size that grew by more than max_growth since the baseline"""
+    grown = []
+    entries = [('total', sizes['total'], baseline.get('total', {}))]
+    entries.extend((name, measured, baseline.get('files', {}).get(name, {}))
+                   for name, measured in sizes['files'].items())
+    for name, measured, recorded in entries:
+        for metric in METRICS:
+            old, new = recorded.get(metric), measured.get(metric)
+            if not old or new is None:
+                continue
+            if new > old * (1 + max_growth) and new - old > GROWTH_FLOOR_BYTES:
+                grown.append(f"{name} {metric}: {old} -> {new} bytes ({(new - old) / old:+.1%})")
+    return grown
+
+
+def load_baseline(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == BASELINE_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {'version': BASELINE_VERSION, 'pages': {}}
+
+
+def save_baseline(path: str, baseline: Dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def budget_checks(requirements: Dict) -> List[Dict]:
+    """The perf_budget checks of requirements.json"""
+    return [check for data in requirements.get('requirements', {}).values()
+            for check in data.get('checks', []) if check['type'] == 'perf_budget']
+
+
+def _kb(value: Optional[int]) -> str:
+    return '-' if value is None else f"{value / 1024:.1f} KB"
+
+
+def parse_args(argv: List[str] = None) -> 'argparse.Namespace':
+    """Parse command line options"""
+    import argparse
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='Report first-load payload sizes of the perf_budget pages')
+    parser.add_argument('--repo-root', default=repo_root, help='Repository root')
+    parser.add_argument('--update-baseline', action='store_true', help='Record the current sizes as the baseline')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    with open(os.path.join(args.repo_root, 'qa', 'requirements.json'), 'r', encoding='utf-8') as f:
+        checks = budget_checks(json.load(f))
+    if not checks:
+        print('No perf_budget checks in qa/requirements.json')
+        return 0
+
+    updated = {}
+    for check in checks:
+        baseline_file = os.path.join(args.repo_root, check.get('baseline', DEFAULT_BASELINE))
+        baseline = updated.get(baseline_file) or load_baseline(baseline_file)
+        recorded = baseline['pages'].get(check['target'], {})
+        sizes = measure_page(os.path.join(args.repo_root, check['target']))
+        print(f"{check['id']}: {check['target']}")
+        for name, measured in list(sizes['files'].items()) + [('total', sizes['total'])]:
+            old = (recorded.get('total') if name == 'total' else recorded.get('files', {}).get(name)) or {}
+            delta = f"  ({measured['gzip'] - old['gzip']:+d} gzip bytes)" if old.get('gzip') else ''
+            print(f"  {name:28s} {_kb(measured['raw']):>10s} raw {_kb(measured['gzip']):>10s} gzip "
+                  f"{_kb(measured['brotli']):>10s} brotli{delta}")
+        for name in sizes['missing']:
+            print(f"  {name:28s} missing")
+        if args.update_baseline:
+            baseline['pages'][check['target']] = {'files': sizes['files'], 'total': sizes['total']}
+            updated[baseline_file] = baseline
+
+    for baseline_file, baseline in updated.items():
+        save_baseline(baseline_file, baseline)
+        print(f"\nBaseline updated: {baseline_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+In-process pytest execution with structured per-test results
+run_pytest() calls pytest.main() with a result-collecting plugin
+`--serve` runs it as a worker process for the QA runner
+"""
+
+import atexit
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+WORKER_SCRIPT = os.path.abspath(__file__)
+
+DEFAULT_TIMEOUT = 60
+
+
+class ResultCollector:
+    """pytest plugin that records one entry per test item"""
+
+    def __init__(self):
+        self.tests: Dict[str, Dict] = {}
+        self.collection_errors: List[Dict] = []
+
+    def pytest_runtest_logreport(self, report):
+        entry = self.tests.setdefault(report.nodeid, {
+            'nodeid': report.nodeid,
+            'outcome': 'passed',
+            'duration': 0.0,
+            'location': f"{report.location[0]}:{report.location[1] + 1}",
+            'message': '',
+        })
+        entry['duration'] = round(entry['duration'] + report.duration, 6)
+        if report.failed:
+            entry['outcome'] = 'failed' if report.when == 'call' else 'error'
+            entry.update(self._failure_info(report))
+        elif report.skipped and entry['outcome'] == 'passed':
+            entry['outcome'] = 'skipped'
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            error = {'nodeid': report.nodeid, 'outcome': 'error', 'duration': 0.0,
+                     'location': report.nodeid, 'message': ''}
+            error.update(self._failure_info(report))
+            self.collection_errors.append(error)
+
+    @staticmethod
+    def _failure_info(report) -> Dict:
+        crash = getattr(report.longrepr, 'reprcrash', None)
+        if crash is not None:
+            return {'location': f"{os.path.relpath(crash.path)}:{crash.lineno}",
+                    'message': crash.message.splitlines()[0] if crash.message else ''}
+        text = str(report.longrepr or '').strip().splitlines()
+        return {'message': text[-1] if text else ''}
+
+
+def _is_test_module(module_file: str) -> bool:
+    name = os.path.basename(module_file)
+    return name == 'conftest.py' or (name.endswith('.py') and (name.startswith('test_') or name.endswith('_test.py')))
+
+
+def _purge_modules(rootdir: str):
+    """Forget modules imported from the repository (qa/*.py, scripts/...), and test modules of earlier runs"""
+    root = os.path.abspath(rootdir) + os.sep
+    # a virtualenv inside the repository holds pytest itself
+    environments = tuple({os.path.abspath(prefix) + os.sep for prefix in (sys.prefix, sys.base_prefix)})
+    for name, module in list(sys.modules.items()):
+        if name in ('__main__', __name__):
+            continue
+        module_file = getattr(module, '__file__', None) or ''
+        if module_file.startswith(environments):
+            continue
+        if module_file.startswith(root) or _is_test_module(module_file):
+            del sys.modules[name]
+
+
+def run_pytest(target: str, rootdir: str) -> Dict:
+    """Run pytest on target in this process and return a structured summary"""
+    import pytest
+
+    test_path = target if os.path.isabs(target) else os.path.join(rootdir, target)
+    _purge_modules(rootdir)
+
+    collector = ResultCollector()
+    saved_path = list(sys.path)
+    saved_cwd = os.getcwd()
+    start = time.perf_counter()
+    try:
+        os.chdir(rootdir)
+        exit_code = int(pytest.main(
+            [test_path, f'--rootdir={rootdir}', '-p', 'no:terminal', '-p', 'no:cacheprovider'],
+            plugins=[collector],
+        ))
+    finally:
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+    duration = time.perf_counter() - start
+
+    tests = list(collector.tests.values()) + collector.collection_errors
+    counts = {outcome: sum(1 for t in tests if t['outcome'] == outcome)
+              for outcome in ('passed', 'failed', 'error', 'skipped')}
+    return {'exit_code': exit_code, 'duration': round(duration, 6), 'counts': counts, 'tests': tests}
+
+
+class PytestWorker:
+    """Client for a `pytest_runner.py --serve` process"""
+
+    def __init__(self, python: str = sys.executable):
+        self.python = python
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _ensure_started(self):
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                [self.python, WORKER_SCRIPT, '--serve'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+                bufsize=1,
+            )
+
+    def run(self, target: str, rootdir: str, timeout: float = DEFAULT_TIMEOUT) -> Dict:
+        with self._lock:
+            self._ensure_started()
+            proc = self._proc
+            request_id = next(self._ids)
+            watchdog = threading.Timer(timeout, proc.kill)
+            watchdog.start()
+            try:
+                proc.stdin.write(json.dumps({'id': request_id, 'target': target, 'rootdir': rootdir}) + '\n')
+                proc.stdin.flush()
+                line = proc.stdout.readline()
+            except (BrokenPipeError, OSError):
+                line = ''
+            finally:
+                watchdog.cancel()
+            if not line:
+                self._proc = None
+                raise TimeoutError(f"pytest worker did not answer within {timeout}s")
+            response = json.loads(line)
+            if 'error' in response:
+                raise RuntimeError(response['error'])
+            return response['result']
+
+    def close(self):
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+
+
+_worker: Optional[PytestWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> PytestWorker:
+    """Return the process-wide pytest worker"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = PytestWorker()
+            atexit.register(_worker.close)
+        return _worker
+
+
+def serve():
+    """Worker loop: one JSON request per stdin line, one JSON response per stdout line"""
+    # Keep the protocol channel private; anything tests print goes to stderr
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    import pytest  # noqa: F401 - warm the import once
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        try:
+            response = {'id': request['id'], 'result': run_pytest(request['target'], request['rootdir'])}
+        except Exception as e:
+            response = {'id': request.get('id'), 'error': f"{type(e).__name__}: {e}"}
+        protocol.write(json.dumps(response) + '\n')
+        protocol.flush()
+
+
+if __name__ == '__main__':
+    if '--serve' in sys.argv:
+        serve()
+    else:
+        print(json.dumps(run_pytest(sys.argv[1] if len(sys.argv) > 1 else 'tests', os.getcwd()), indent=2))
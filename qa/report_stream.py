@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Streaming and compact report output for the QA runner
+ResultStream writes a run as NDJSON (--stream); write_compact_report() writes gzip JSON (--compact)
+"""
+
+import gzip
+import json
+import os
+import threading
+from typing import Dict
+
+
+def _dumps(record: Dict) -> str:
+    return json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+
+
+class ResultStream:
+    """Append-only NDJSON writer shared by the runner's worker threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8', newline='\n')
+
+    def _write(self, line: str):
+        self._file.write(line + '\n')
+        self._file.flush()
+
+    def start(self, timestamp: str, strict_mode: bool, total: int):
+        with self._lock:
+            self._write(_dumps({'type': 'start', 'timestamp': timestamp,
+                                'strictMode': strict_mode, 'total': total}))
+
+    def check(self, category: str, result: Dict):
+        """Write one check result; `seq` counts results in arrival order"""
+        with self._lock:
+            self.count += 1
+            self._write(_dumps(dict({'type': 'check', 'seq': self.count, 'category': category}, **result)))
+
+    def finish(self, summary: Dict, status: str):
+        with self._lock:
+            self._write(_dumps({'type': 'summary', 'status': status, 'summary': summary}))
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def write_compact_report(report: Dict, path: str) -> int:
+    """Write report as minified gzip JSON (reproducible bytes); return the size"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0, compresslevel=9) as gz:
+            gz.write(_dumps(report).encode('utf-8'))
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Content-addressed result cache for the QA runner (--incremental)
+A check's key hashes its definition and the content of every file it reads
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path('qa') / '.cache'
+
+HTML_FILE = 'src/frontend/index.html'
+
+# Check types answered from index.html (and the stylesheets it links)
+HTML_CHECK_TYPES = {
+    'element_exists', 'element_not_exists', 'element_text_check',
+    'element_attribute_check', 'table_structure_check', 'testid_check',
+}
+
+# Check types that only depend on their definition (constant results),
+# unless the check names its Playwright tests with "e2e"
+E2E_COVERED_TYPES = {
+    'route_smoke', 'wiring_runtime', 'state_persistence', 'admin_gating',
+    'responsive_check', 'access_control', 'route_check', 'static_analysis',
+}
+
+# Directory names never treated as inputs (tool output, caches)
+IGNORED_DIRS = {'.git', '__pycache__', '.pytest_cache', 'node_modules', '.cache'}
+
+# Reports written by the QA scripts themselves, never read by a check
+OUTPUT_FILES = {'qa/last-run-report.json', 'qa/last-result.json', 'qa/deployment-check-results.json'}
+
+# External tools whose availability changes results
+TOOLS = ('node', 'npx', 'python3')
+
+# What a Playwright run reads besides its spec files: helpers and config under
+# tests/e2e, the npm manifests, and the locally installed Playwright version
+PLAYWRIGHT_INPUTS = ['tests/e2e/**/*', 'package.json', 'package-lock.json',
+                     'node_modules/@playwright/test/package.json', 'src/frontend/**/*']
+
+# Stand-in results of checks that could not run (or not to the end); never
+# stored, so the check runs for real once its tool or the network works
+UNCACHED_MESSAGES = ('Playwright not available', 'E2E tests require manual browser testing',
+                     'Playwright run did not complete', 'Playwright test timeout')
+
+
+def check_inputs(check: Dict) -> Optional[List[str]]:
+    """Return the repo-relative files/globs a check reads (None if unknown: never cached)"""
+    check_type = check['type']
+    target = check.get('target', '')
+
+    if check_type in ('file_exists', 'json_valid', 'documentation_check',
+                      'workflow_branch_check', 'workflow_environment_check'):
+        return [target]
+    if check_type in ('directory_exists', 'directory_not_empty'):
+        return [target.rstrip('/') + '/']
+    if check_type == 'js_syntax_check':
+        return [target] + list(check.get('inlineScripts', []))
+    if check_type == 'secret_scan':
+        return [target.rstrip('/') + '/**/*']
+    if check_type == 'pytest_run':
+        # Tests read the frontend, the QA data and E2E specs, and import the
+        # QA modules and scripts
+        return [target.rstrip('/') + '/**/*.py', 'pytest.ini', 'src/frontend/**/*', 'qa/*.py',
+                'qa/*.json', 'qa/*.js', 'scripts/**/*.py', 'tests/e2e/**/*']
+    if check_type == 'playwright_test':
+        return [target] + PLAYWRIGHT_INPUTS
+    if check_type == 'javascript_check':
+        return ['src/frontend/*.js', HTML_FILE]
+    if check_type == 'window_function_check':
+        directory = (target or 'src/frontend/').rstrip('/')
+        return [f'{directory}/*.js', f'{directory}/index.html']
+    if check_type == 'perf_budget':
+        directory = os.path.dirname(target)
+        return [target, f'{directory}/*.js', f'{directory}/*.css',
+                check.get('baseline', 'qa/perf-baseline.json')]
+    if check_type == 'site_build_check':
+        return [(target or 'src/frontend').rstrip('/') + '/**/*']
+    if check.get('e2e'):
+        specs = [entry if isinstance(entry, str) else entry['spec'] for entry in check['e2e']]
+        return specs + PLAYWRIGHT_INPUTS
+    if check_type in HTML_CHECK_TYPES:
+        return [HTML_FILE]
+    if check_type == 'css_class_check':
+        return [HTML_FILE, 'src/frontend/*.css']
+    if check_type in E2E_COVERED_TYPES:
+        return []
+    return None
+
+
+class ResultCache:
+    """Persistent map of cache key -> check result, stored under qa/.cache"""
+
+    def __init__(self, repo_root: str, cache_dir: str = None, fs_index=None):
+        self.repo_root = Path(repo_root)
+        # qa/fs_index.FsIndex answering listings and globs, if the runner has one
+        self.fs_index = fs_index
+        self.cache_dir = Path(cache_dir) if cache_dir else self.repo_root / DEFAULT_CACHE_DIR
+        self.cache_file = self.cache_dir / 'results.json'
+        self._lock = threading.Lock()
+        self._file_hashes: Dict[str, List] = {}
+        self._results: Dict[str, Dict] = {}
+        self._used: Dict[str, Dict] = {}
+        self._runner_fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Load the cache file; an unreadable or outdated cache is ignored"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self._file_hashes = data.get('files', {})
+                self._results = data.get('results', {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        """Persist the hashes and the results used by this run"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                'version': CACHE_VERSION,
+                'files': self._file_hashes,
+                'results': self._used,
+            }
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_file, self.cache_file)
+
+    def clear(self):
+        """Delete the cache directory (explicit invalidation)"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        with self._lock:
+            self._file_hashes.clear()
+            self._results.clear()
+            self._used.clear()
+
+    # -- hashing --------------------------------------------------------
+
+    def file_digest(self, rel_path: str) -> str:
+        """Hash a file, reusing the stored hash when mtime and size are unchanged"""
+        path = self.repo_root / rel_path
+        try:
+            stat = path.stat()
+        except OSError:
+            return 'missing'
+        if not path.is_file():
+            return 'dir'
+        with self._lock:
+            memo = self._file_hashes.get(rel_path)
+        if memo and memo[0] == stat.st_mtime_ns and memo[1] == stat.st_size:
+            return memo[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self._file_hashes[rel_path] = [stat.st_mtime_ns, stat.st_size, value]
+        return value
+
+    def _expand(self, spec: str) -> List[Tuple[str, str]]:
+        """Resolve one input spec into (name, digest) pairs"""
+        if spec.endswith('/'):
+            names = self._listdir(spec)
+            if names is None:
+                return [(spec, 'missing')]
+            return [(spec, json.dumps(names))]
+        if '*' in spec:
+            rel_paths = []
+            for match in self._glob(spec):
+                rel = os.path.relpath(match, self.repo_root).replace(os.sep, '/')
+                if rel in OUTPUT_FILES or any(part in IGNORED_DIRS for part in rel.split('/')):
+                    continue
+                if self._is_file(match, rel):
+                    rel_paths.append(rel)
+            return [(rel, self.file_digest(rel)) for rel in sorted(rel_paths)] or [(spec, 'empty')]
+        return [(spec, self.file_digest(spec))]
+
+    def _listdir(self, spec: str) -> Optional[List[str]]:
+        if self.fs_index is not None:
+            return self.fs_index.listdir(spec)
+        dir_path = self.repo_root / spec
+        return sorted(os.listdir(dir_path)) if dir_path.is_dir() else None
+
+    def _glob(self, spec: str) -> List[str]:
+        if self.fs_index is not None:
+            return self.fs_index.glob(spec)
+        return glob.glob(str(self.repo_root / spec), recursive=True)
+
+    def _is_file(self, path: str, rel: str) -> bool:
+        if self.fs_index is not None:
+            return self.fs_index.kind(rel) == 'file'
+        return os.path.isfile(path)
+
+    def runner_fingerprint(self) -> str:
+        """Hash of the QA runner's own code and tool availability"""
+        if self._runner_fingerprint is None:
+            parts = [self._expand('qa/*.py'), self._expand('qa/*.js'),
+                     [shutil.which(tool) for tool in TOOLS]]
+            self._runner_fingerprint = hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+        return self._runner_fingerprint
+
+    def key_for(self, check: Dict) -> Optional[str]:
+        """Return the cache key of a check, or None if it is not cacheable"""
+        inputs = check_inputs(check)
+        if inputs is None:
+            return None
+        resolved = [pair for spec in inputs for pair in self._expand(spec)]
+        payload = json.dumps({
+            'check': check,
+            'inputs': resolved,
+            'runner': self.runner_fingerprint(),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    # -- results --------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Tuple[bool, str, Optional[Dict]]]:
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used[key] = entry
+            return entry['passed'], entry['message'], entry.get('details')
+
+    def put(self, key: str, passed: bool, message: str, details: Dict = None):
+        """Store a result, unless it only stands in for a check that could not run"""
+        if message.startswith(UNCACHED_MESSAGES):
+            return
+        with self._lock:
+            entry = {'passed': passed, 'message': message}
+            if details:
+                entry['details'] = details
+            self._results[key] = entry
+            self._used[key] = entry
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+SQLite history of QA runs (qa/.cache/history.sqlite)
+Every full run appends one row to `runs` and one row per check to `results`
+
+Usage:
+    python3 qa/run_history.py slowest [--runs 20] [--limit 10]
+    python3 qa/run_history.py flipped [--runs 20]
+    python3 qa/run_history.py failure-rate [--runs 50]
+    python3 qa/run_history.py compact
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_DB = os.path.join('qa', '.cache', 'history.sqlite')
+
+# Runs kept by the retention policy
+DEFAULT_KEEP_RUNS = 500
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    strict_mode INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    skipped INTEGER NOT NULL,
+    wall_ms REAL
+);
+CREATE TABLE IF NOT EXISTS checks (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    check_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (category, check_id)
+);
+CREATE TABLE IF NOT EXISTS results (
+    check_key INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    wall_ms REAL,
+    cpu_ms REAL,
+    message TEXT,
+    PRIMARY KEY (check_key, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_run ON results (run_id, check_key);
+"""
+
+
+def result_status(result: Dict) -> str:
+    if result.get('skipped'):
+        return 'SKIP'
+    return 'PASS' if result['passed'] else 'FAIL'
+
+
+class RunHistory:
+    """Append-only store of QA runs with trend queries"""
+
+    def __init__(self, db_path: str, keep_runs: int = DEFAULT_KEEP_RUNS):
+        self.db_path = str(db_path)
+        self.keep_runs = keep_runs
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        # auto_vacuum only takes effect before the first table is created
+        self.conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            with self.conn:
+                self.conn.executescript(SCHEMA)
+                self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self):
+        self.conn.execute('PRAGMA optimize')
+        self.conn.close()
+
+    def __enter__(self) -> 'RunHistory':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    # -- writing ------------------------------------------------------------
+
+    def record_run(self, results: Dict, status: str, wall_ms: Optional[float] = None) -> int:
+        """Append a run (QARunner.results) in one transaction; return its id"""
+        summary = results['summary']
+        rows = [(category, result) for category, category_results in results['checks'].items()
+                for result in category_results]
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO runs (started_at, status, strict_mode, total, passed, failed, skipped, wall_ms) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (results['timestamp'], status, int(bool(results.get('strictMode'))), summary['total'],
+                 summary['passed'], summary['failed'], summary.get('skipped', 0), wall_ms))
+            run_id = cursor.lastrowid
+            keys = self._check_keys([(category, r['id'], r['name']) for category, r in rows])
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO results (check_key, run_id, status, severity, wall_ms, cpu_ms, message) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(keys[(category, r['id'])], run_id, result_status(r), r.get('severity', 'medium'),
+                  (r.get('metrics') or {}).get('wallMs'), (r.get('metrics') or {}).get('cpuMs'),
+                  None if r['passed'] else r.get('message'))
+                 for category, r in rows])
+            pruned = self._prune(run_id)
+        if pruned:
+            self.conn.execute('PRAGMA incremental_vacuum')
+        return run_id
+
+    def _check_keys(self, checks: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str], int]:
+        self.conn.executemany(
+            'INSERT INTO checks (category, check_id, name) VALUES (?, ?, ?) '
+            'ON CONFLICT (category, check_id) DO UPDATE SET name = excluded.name WHERE name != excluded.name',
+            checks)
+        return {(category, check_id): key for key, category, check_id
+                in self.conn.execute('SELECT id, category, check_id FROM checks')}
+
+    def _prune(self, latest_run: int) -> int:
+        """Delete runs beyond the retention limit; return how many went"""
+        oldest_kept = latest_run - self.keep_runs + 1
+        if self.conn.execute('SELECT 1 FROM runs WHERE id < ? LIMIT 1', (oldest_kept,)).fetchone() is None:
+            return 0
+        self.conn.execute('DELETE FROM results WHERE run_id < ?', (oldest_kept,))
+        return self.conn.execute('DELETE FROM runs WHERE id < ?', (oldest_kept,)).rowcount
+
+    def compact(self):
+        """Drop checks without results and rebuild the file"""
+        with self.conn:
+            self.conn.execute('DELETE FROM checks WHERE id NOT IN (SELECT DISTINCT check_key FROM results)')
+        self.conn.execute('VACUUM')
+
+    # -- queries ------------------------------------------------------------
+
+    def _first_run(self, runs: int) -> int:
+        """Id of the oldest of the last `runs` runs"""
+        row = self.conn.execute('SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?',
+                                (max(runs, 1) - 1,)).fetchone()
+        return row[0] if row else 0
+
+    def run_count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def slowest(self, runs: int = 20, limit: int = 10) -> List[Dict]:
+        """Checks with the highest mean wall time over the last `runs` runs"""
+        rows = self.conn.execute(
+            'SELECT c.category, c.check_id, c.name, COUNT(*), AVG(r.wall_ms), MAX(r.wall_ms) '
+            'FROM results r JOIN checks c ON c.id = r.check_key '
+            'WHERE r.run_id >= ? AND r.wall_ms IS NOT NULL '
+            'GROUP BY r.check_key ORDER BY AVG(r.wall_ms) DESC LIMIT ?',
+            (self._first_run(runs), limit))
+        return [{'category': category, 'id': check_id, 'name': name, 'runs': count,
+                 'meanMs': round(mean, 3), 'maxMs': round(maximum, 3)}
+                for category, check_id, name, count, mean, maximum in rows]
+
+    def flipped(self, runs: int = 20, limit: int = 50) -> List[Dict]:
+        """Checks whose status changed between consecutive runs (flaky or regressed)"""
+        rows = self.conn.execute(
+            'WITH ordered AS ('
+            '  SELECT check_key, run_id, status, '
+            '         LAG(status) OVER (PARTITION BY check_key ORDER BY run_id) AS previous '
+            '  FROM results WHERE run_id >= ?'
+            ') '
+            'SELECT c.category, c.check_id, c.name, COUNT(*), MAX(o.run_id), '
+            '       (SELECT status FROM results WHERE check_key = o.check_key ORDER BY run_id DESC LIMIT 1) '
+            'FROM ordered o JOIN checks c ON c.id = o.check_key '
+            'WHERE o.previous IS NOT NULL AND o.previous != o.status '
+            'GROUP BY o.check_key ORDER BY COUNT(*) DESC, MAX(o.run_id) DESC LIMIT ?',
+            (self._first_run(runs), limit))
+        flips = []
+        for category, check_id, name, count, last_run, current in rows:
+            started_at = self.conn.execute('SELECT started_at FROM runs WHERE id = ?', (last_run,)).fetchone()
+            flips.append({'category': category, 'id': check_id, 'name': name, 'flips': count,
+                          'lastFlipRun': last_run, 'lastFlipAt': started_at[0] if started_at else None,
+                          'status': current})
+        return flips
+
+    def failure_rate(self, runs: int = 50, limit: int = 50) -> List[Dict]:
+        """Share of failed results per check over the last `runs` runs"""
+        rows = self.conn.execute(
+            'SELECT c.category, c.check_id, c.name, COUNT(*), SUM(r.status = \'FAIL\') AS failures '
+            'FROM results r JOIN checks c ON c.id = r.check_key '
+            'WHERE r.run_id >= ? AND r.status != \'SKIP\' '
+            'GROUP BY r.check_key HAVING failures > 0 '
+            'ORDER BY failures * 1.0 / COUNT(*) DESC, failures DESC LIMIT ?',
+            (self._first_run(runs), limit))
+        return [{'category': category, 'id': check_id, 'name': name, 'runs': count,
+                 'failures': failures, 'rate': round(failures / count, 4)}
+                for category, check_id, name, count, failures in rows]
+
+    def durations(self, runs: int = 20) -> Dict[Tuple[str, str], float]:
+        """Mean wall time per (category, check id) over the last `runs` runs"""
+        rows = self.conn.execute(
+            'SELECT c.category, c.check_id, AVG(r.wall_ms) '
+            'FROM results r JOIN checks c ON c.id = r.check_key '
+            'WHERE r.run_id >= ? AND r.wall_ms IS NOT NULL AND r.status != \'SKIP\' '
+            'GROUP BY r.check_key',
+            (self._first_run(runs),))
+        return {(category, check_id): mean for category, check_id, mean in rows}
+
+
+def _print_table(rows: List[Dict], columns: List[Tuple[str, str]]):
+    if not rows:
+        print('No matching checks in the recorded runs')
+        return
+    widths = [max(len(title), *(len(str(row[key])) for row in rows)) for key, title in columns]
+    print('  '.join(title.ljust(width) for (_, title), width in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(str(row[key]).ljust(width) for (key, _), width in zip(columns, widths)))
+
+
+def parse_args(argv: List[str] = None) -> 'argparse.Namespace':
+    """Parse command line options"""
+    import argparse
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='Query the QA run history')
+    parser.add_argument('query', choices=['slowest', 'flipped', 'failure-rate', 'compact'])
+    parser.add_argument('--runs', type=int, help='Window of most recent runs (default: 20, failure-rate: 50)')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum rows to print (default: 20)')
+    parser.add_argument('--db', default=os.path.join(repo_root, DEFAULT_DB), help='History database')
+    parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"No QA history at {args.db} - run qa/run_qa.py first")
+        return 1
+    with RunHistory(args.db) as history:
+        if args.query == 'compact':
+            before = os.path.getsize(args.db)
+            history.compact()
+            print(f"Compacted {args.db}: {before / 1024:.1f} KB -> {os.path.getsize(args.db) / 1024:.1f} KB")
+            return 0
+        if args.query == 'slowest':
+            rows = history.slowest(args.runs or 20, args.limit)
+            columns = [('id', 'Check'), ('meanMs', 'Mean ms'), ('maxMs', 'Max ms'), ('runs', 'Runs'), ('name', 'Name')]
+        elif args.query == 'flipped':
+            rows = history.flipped(args.runs or 20, args.limit)
+            columns = [('id', 'Check'), ('flips', 'Flips'), ('status', 'Now'), ('lastFlipAt', 'Last flip'),
+                       ('name', 'Name')]
+        else:
+            rows = history.failure_rate(args.runs or 50, args.limit)
+            columns = [('id', 'Check'), ('rate', 'Failure rate'), ('failures', 'Failures'), ('runs', 'Runs'),
+                       ('name', 'Name')]
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            _print_table(rows, columns)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
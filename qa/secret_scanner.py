@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Streaming secret scanner for the QA runner (secret_scan checks)
+Skips binary and .gitignore'd files, maps large files and scans large trees on multiple cores
+"""
+
+import fnmatch
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bytes sniffed to decide whether a file is binary
+SNIFF_SIZE = 8192
+
+# Files at least this large are scanned through mmap
+MMAP_THRESHOLD = 1024 * 1024
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 200
+
+# Matches containing these are treated as documentation placeholders
+FALSE_POSITIVE_MARKERS = (b'example', b'your_')
+
+MAX_FINDING_TEXT = 50
+
+
+@lru_cache(maxsize=32)
+def compile_patterns(patterns: Tuple[str, ...]) -> 're.Pattern[bytes]':
+    """Combine the secret name patterns into one regex (name followed by a value)"""
+    names = '|'.join(f'(?:{pattern})' for pattern in patterns)
+    regex = f'(?:{names})\\s*[=:\\"]\\s*["\']?[a-zA-Z0-9_\\-]{{10,}}'
+    return re.compile(regex.encode('utf-8'), re.IGNORECASE)
+
+
+def is_binary(header: bytes) -> bool:
+    """Heuristic used by git and grep: a NUL byte in the header means binary"""
+    return b'\0' in header
+
+
+class GitIgnore:
+    """Minimal .gitignore matcher (globs, anchors, dir-only rules, negation)"""
+
+    def __init__(self):
+        # (base_dir, pattern, negated, dir_only, anchored)
+        self.rules: List[Tuple[str, str, bool, bool, bool]] = []
+
+    def add_file(self, gitignore_path: str, base_dir: str):
+        try:
+            with open(gitignore_path, 'r', encoding='utf-8', errors='ignore') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            self.rules.append((base_dir, line.lstrip('/'), negated, dir_only, anchored))
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Return True if a repo-relative path (with '/' separators) is ignored"""
+        result = False
+        for base_dir, pattern, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base_dir:
+                if not rel_path.startswith(base_dir + '/'):
+                    continue
+                path = rel_path[len(base_dir) + 1:]
+            else:
+                path = rel_path
+            if anchored:
+                matched = fnmatch.fnmatchcase(path, pattern) or (
+                    '**/' in pattern and fnmatch.fnmatchcase(path, pattern.replace('**/', '')))
+            else:
+                matched = fnmatch.fnmatchcase(path.rsplit('/', 1)[-1], pattern)
+            if matched:
+                result = not negated
+        return result
+
+
+def collect_files(repo_root: str, target_dir: str, gitignore: Optional[GitIgnore] = None,
+                  walk: Callable = os.walk) -> List[str]:
+    """Walk target_dir, skipping dot-directories and .gitignore'd paths"""
+    if gitignore is None:
+        gitignore = GitIgnore()
+        gitignore.add_file(os.path.join(repo_root, '.gitignore'), '')
+    files = []
+    for dir_path, dir_names, file_names in walk(target_dir):
+        rel_dir = os.path.relpath(dir_path, repo_root).replace(os.sep, '/')
+        rel_dir = '' if rel_dir == '.' else rel_dir
+        if '.gitignore' in file_names and rel_dir:
+            gitignore.add_file(os.path.join(dir_path, '.gitignore'), rel_dir)
+        dir_names[:] = sorted(
+            name for name in dir_names
+            if not name.startswith('.')
+            and not gitignore.ignored(f'{rel_dir}/{name}' if rel_dir else name, True)
+        )
+        for name in sorted(file_names):
+            rel_path = f'{rel_dir}/{name}' if rel_dir else name
+            if not name.startswith('.') and not gitignore.ignored(rel_path, False):
+                files.append(rel_path)
+    return files
+
+
+def scan_file(path: str, regex: 're.Pattern[bytes]') -> List[Tuple[int, str]]:
+    """Return (line, matched text) for every finding in one file"""
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return []
+        with open(path, 'rb') as f:
+            if is_binary(f.read(SNIFF_SIZE)):
+                return []
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return _find(data, regex)
+            f.seek(0)
+            return _find(f.read(), regex)
+    except (OSError, ValueError):
+        return []
+
+
+def _find(data, regex: 're.Pattern[bytes]') -> List[Tuple[int, str]]:
+    findings = []
+    line = 1
+    last_pos = 0
+    for match in regex.finditer(data):
+        matched = match.group(0)
+        if any(marker in matched.lower() for marker in FALSE_POSITIVE_MARKERS):
+            continue
+        line += data[last_pos:match.start()].count(b'\n')
+        last_pos = match.start()
+        findings.append((line, matched[:MAX_FINDING_TEXT].decode('utf-8', errors='replace')))
+    return findings
+
+
+def _scan_batch(repo_root: str, rel_paths: List[str], patterns: Tuple[str, ...]) -> List[Tuple[str, int, str]]:
+    regex = compile_patterns(patterns)
+    results = []
+    for rel_path in rel_paths:
+        for line, text in scan_file(os.path.join(repo_root, rel_path), regex):
+            results.append((rel_path, line, text))
+    return results
+
+
+def scan(repo_root: str, target: str, patterns: List[str], workers: int = None,
+         walk: Callable = os.walk) -> Dict:
+    """Scan a directory tree and return {'files': n, 'findings': [(path, line, text)]}"""
+    repo_root = os.path.abspath(repo_root)
+    target_dir = os.path.join(repo_root, target)
+    rel_paths = collect_files(repo_root, target_dir, walk=walk)
+    patterns = tuple(patterns)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(rel_paths) >= PARALLEL_MIN_FILES:
+        batch_size = max(1, len(rel_paths) // (workers * 4))
+        batches = [rel_paths[i:i + batch_size] for i in range(0, len(rel_paths), batch_size)]
+        findings = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for batch_findings in pool.map(_scan_batch, [repo_root] * len(batches),
+                                               batches, [patterns] * len(batches)):
+                    findings.extend(batch_findings)
+        except (OSError, RuntimeError):
+            # No process support (restricted sandboxes): fall back to in-process
+            findings = _scan_batch(repo_root, rel_paths, patterns)
+    else:
+        findings = _scan_batch(repo_root, rel_paths, patterns)
+
+    return {'files': len(rel_paths), 'findings': findings}
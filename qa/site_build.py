@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Build of the GitHub Pages artifact (src/frontend -> _site)
+Bundles and minifies scripts and stylesheets into content-hashed files
+build-manifest.json records each built asset; verify_site() checks an artifact against it
+
+Usage: python qa/site_build.py [source_dir] [output_dir]
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+
+MANIFEST_FILE = 'build-manifest.json'
+
+DEFAULT_SOURCE = os.path.join('src', 'frontend')
+DEFAULT_OUTPUT = '_site'
+
+PAGE = 'index.html'
+
+# Hex digits of the content hash in fingerprinted names
+HASH_LENGTH = 10
+
+FINGERPRINTED = re.compile(r'\.([0-9a-f]{%d})\.(js|css)$' % HASH_LENGTH)
+
+# Files that get precompressed siblings
+COMPRESSIBLE = ('.html', '.js', '.css', '.json', '.svg', '.txt')
+
+# Script types run as classic scripts (the only ones extracted or bundled)
+CLASSIC_TYPES = ('', 'text/javascript', 'application/javascript')
+
+_TAG = re.compile(
+    r"<!--.*?-->"
+    r"|<script\b(?P<script>(?:[^>\"']|\"[^\"]*\"|'[^']*')*)>(?P<code>.*?)</script\s*>"
+    r"|<link\b(?P<link>(?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.DOTALL | re.IGNORECASE)
+
+_ATTR = re.compile(r"""([^\s=/>]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?""")
+
+
+class BuildError(Exception):
+    """The source cannot be built safely (unterminated literal, changed tokens)"""
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    """'bundle.js' -> 'bundle.<hash>.js'"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{content_hash(data)[:HASH_LENGTH]}{ext}"
+
+
+def is_local(url: str) -> bool:
+    return bool(url) and not url.startswith(('http:', 'https:', '//', 'data:', '#'))
+
+
+def _attrs(text: str) -> Dict[str, str]:
+    attrs = {}
+    for name, value in _ATTR.findall(text.rstrip('/')):
+        attrs[name.lower()] = value[1:-1] if value[:1] in ('"', "'") else value
+    return attrs
+
+
+def asset_references(html: str) -> List[str]:
+    """Local script src and stylesheet href URLs of a page, in document order"""
+    refs = []
+    for match in _TAG.finditer(html):
+        if match.group('script') is not None:
+            url = _attrs(match.group('script')).get('src', '')
+        elif match.group('link') is not None:
+            attrs = _attrs(match.group('link'))
+            url = attrs.get('href', '') if 'stylesheet' in attrs.get('rel', '').lower().split() else ''
+        else:
+            continue
+        if is_local(url):
+            refs.append(url)
+    return refs
+
+
+# -- minification ---------------------------------------------------------
+
+_JS_SPACE = ' \t\n\r\v\f\u00a0\ufeff\u2028\u2029'
+_JS_NEWLINE = '\n\r\u2028\u2029'
+
+# Words after which a slash starts a regular expression, not a division
+_EXPRESSION_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await',
+}
+
+# Adjacent characters that would form a different token without a space
+_JOINING_PAIRS = {'++', '--', '//', '/*', '<!', '->'}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in '_$\\' or ord(ch) > 127
+
+
+def _regex_allowed(prev: Optional[Tuple[str, str]]) -> bool:
+    if prev is None:
+        return True
+    kind, text = prev
+    if kind == 'word':
+        return text in _EXPRESSION_KEYWORDS
+    if kind == 'template':
+        return text.endswith('${')
+    if kind == 'punct':
+        return text not in (')', ']')
+    return False
+
+
+def _skip_string(code: str, start: int) -> int:
+    quote = code[start]
+    i = start + 1
+    while i < len(code):
+        ch = code[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1
+        if ch in '\n\r':
+            break
+        i += 1
+    raise BuildError(f"unterminated string at offset {start}")
+
+
+def _skip_regex(code: str, start: int) -> Optional[int]:
+    """End of the regular expression literal at start, or None if it is a division"""
+    i = start + 1
+    in_class = False
+    while i < len(code):
+        ch = code[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if ch in _JS_NEWLINE:
+            return None
+        if ch == '[':
+            in_class = True
+        elif ch == ']':
+            in_class = False
+        elif ch == '/' and not in_class:
+            i += 1
+            while i < len(code) and _is_word_char(code[i]):
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def js_tokens(code: str) -> List[Tuple[str, str]]:
+    """Split JavaScript into (kind, text) tokens"""
+    tokens = []
+    # brace depth inside each open template substitution
+    substitutions: List[int] = []
+    prev = None
+    i = 0
+    n = len(code)
+    while i < n:
+        ch = code[i]
+        kind = 'punct'
+        j = i + 1
+        if ch in _JS_SPACE:
+            kind = 'space'
+            while j < n and code[j] in _JS_SPACE:
+                j += 1
+        elif code.startswith('//', i):
+            kind = 'comment'
+            while j < n and code[j] not in _JS_NEWLINE:
+                j += 1
+        elif code.startswith('/*', i):
+            kind = 'comment'
+            end = code.find('*/', i + 2)
+            if end < 0:
+                raise BuildError(f"unterminated comment at offset {i}")
+            j = end + 2
+        elif ch in '\'"':
+            kind = 'string'
+            j = _skip_string(code, i)
+        elif ch == '`' or (ch == '}' and substitutions and substitutions[-1] == 0):
+            if ch == '}':
+                substitutions.pop()
+            kind = 'template'
+            while True:
+                if j >= n:
+                    raise BuildError(f"unterminated template literal at offset {i}")
+                if code[j] == '\\':
+                    j += 2
+                elif code[j] == '`':
+                    j += 1
+                    break
+                elif code.startswith('${', j):
+                    j += 2
+                    substitutions.append(0)
+                    break
+                else:
+                    j += 1
+        elif ch == '/' and _regex_allowed(prev) and _skip_regex(code, i) is not None:
+            kind = 'regex'
+            j = _skip_regex(code, i)
+        elif _is_word_char(ch):
+            kind = 'word'
+            while j < n and _is_word_char(code[j]):
+                j += 1
+        elif substitutions and ch in '{}':
+            substitutions[-1] += 1 if ch == '{' else -1
+        token = (kind, code[i:j])
+        tokens.append(token)
+        if kind not in ('space', 'comment'):
+            prev = token
+        i = j
+    return tokens
+
+
+def _needs_space(before: str, after: str) -> bool:
+    a, b = before[-1], after[0]
+    if _is_word_char(a) and _is_word_char(b):
+        return True
+    if a + b in _JOINING_PAIRS:
+        return True
+    return b == '.' and before[0].isdigit()
+
+
+def minify_js(code: str) -> str:
+    """Drop comments and indentation, keeping one line break where there was one"""
+    tokens = js_tokens(code)
+    out: List[str] = []
+    gap = ''
+    for kind, text in tokens:
+        if kind in ('space', 'comment'):
+            if any(ch in text for ch in _JS_NEWLINE):
+                gap = '\n'
+            elif not gap:
+                gap = ' '
+            continue
+        if out and gap == '\n':
+            out.append('\n')
+        elif out and gap and _needs_space(out[-1], text):
+            out.append(' ')
+        out.append(text)
+        gap = ''
+    minified = ''.join(out)
+
+    significant = [token for token in tokens if token[0] not in ('space', 'comment')]
+    if [token for token in js_tokens(minified) if token[0] not in ('space', 'comment')] != significant:
+        raise BuildError("minified JavaScript does not tokenize like its source")
+    return minified + '\n'
+
+
+_CSS_TOKEN = re.compile(
+    r"/\*.*?\*/"
+    r"|\"(?:\\.|[^\"\\])*\""
+    r"|'(?:\\.|[^'\\])*'"
+    r"|\s+",
+    re.DOTALL)
+
+# No space is needed next to these, nor after ':' ('(' keeps its space for `and (...)`)
+_CSS_TIGHT = '{};,>'
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and the whitespace that does not separate tokens"""
+    out: List[str] = []
+    gap = False
+    pos = 0
+    for match in list(_CSS_TOKEN.finditer(css)) + [None]:
+        chunk = css[pos:match.start()] if match else css[pos:]
+        token = match.group() if match else ''
+        for piece in (chunk, token if token[:1] in '"\'' else ''):
+            if not piece:
+                continue
+            if gap and out and out[-1][-1] not in _CSS_TIGHT + ':' and piece[0] not in _CSS_TIGHT:
+                out.append(' ')
+            if piece[0] == '}' and out and out[-1].endswith(';'):
+                out[-1] = out[-1][:-1]
+            out.append(piece if piece[0] in '"\'' else piece.replace(';}', '}'))
+            gap = False
+        if token and token[:1] not in '"\'':
+            gap = True
+        if match:
+            pos = match.end()
+    return ''.join(out) + '\n'
+
+
+# -- build ------------------------------------------------------------------
+
+def _plain_script(attrs: Dict[str, str]) -> bool:
+    """A classic script without async/defer/module/integrity semantics"""
+    return (attrs.get('type', '').lower() in CLASSIC_TYPES
+            and not set(attrs) - {'src', 'type'})
+
+
+def _groups(html: str) -> List[Dict]:
+    """Tags to rewrite: runs of bundleable tags and inline scripts, with their spans"""
+    groups: List[Dict] = []
+    inline = 0
+    for match in _TAG.finditer(html):
+        if match.group('script') is not None:
+            attrs = _attrs(match.group('script'))
+            src = attrs.get('src')
+            if src is None:
+                if _plain_script(attrs) and match.group('code').strip():
+                    inline += 1
+                    groups.append({'kind': 'inline', 'index': inline, 'start': match.start(),
+                                   'end': match.end(), 'code': match.group('code')})
+                continue
+            if not (_plain_script(attrs) and is_local(src)) or match.group('code').strip():
+                continue
+            kind, url = 'js', src
+        elif match.group('link') is not None:
+            attrs = _attrs(match.group('link'))
+            url = attrs.get('href', '')
+            if (attrs.get('rel', '').lower() != 'stylesheet' or set(attrs) - {'rel', 'href'}
+                    or not is_local(url) or '/' in url):
+                continue
+            kind = 'css'
+        else:
+            continue
+        last = groups[-1] if groups else None
+        if last and last['kind'] == kind and not html[last['end']:match.start()].strip():
+            last['members'].append(url)
+            last['end'] = match.end()
+        else:
+            groups.append({'kind': kind, 'members': [url], 'start': match.start(), 'end': match.end()})
+    return groups
+
+
+def _compress(path: str, brotli) -> List[str]:
+    """Write the .gz (and .br) siblings of path when they are smaller; return their names"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = []
+    for ext, compressed in (('.gz', lambda: gzip.compress(data, compresslevel=9, mtime=0)),
+                            ('.br', lambda: brotli.compress(data, quality=11) if brotli else None)):
+        body = compressed()
+        if body is not None and len(body) < len(data):
+            with open(path + ext, 'wb') as f:
+                f.write(body)
+            written.append(ext)
+    return written
+
+
+def build_site(source: str, output: str) -> Dict:
+    """Build source into output (replaced entirely) and return the manifest"""
+    from perf_budget import measure, measure_page
+
+    brotli = _brotli()
+    with open(os.path.join(source, PAGE), 'r', encoding='utf-8', newline='') as f:
+        html = f.read()
+
+    assets: Dict[str, Dict] = {}
+    contents: Dict[str, bytes] = {}
+    consumed = set()
+    pieces = []
+    pos = 0
+    bundles = 0
+    for group in _groups(html):
+        if group['kind'] == 'inline':
+            sources = [f"{PAGE}#script-{group['index']}"]
+            code = minify_js(group['code'])
+            name = f"inline-{group['index']}.js"
+        else:
+            sources = group['members']
+            texts = []
+            for url in sources:
+                with open(os.path.join(source, url), 'r', encoding='utf-8') as f:
+                    texts.append(f.read())
+                consumed.add(os.path.normpath(url))
+            if group['kind'] == 'js':
+                # ';' keeps a file ending in an expression from running into the next one
+                code = ';\n'.join(minify_js(text) for text in texts)
+            else:
+                code = ''.join(minify_css(text) for text in texts)
+            if len(sources) == 1:
+                name = os.path.basename(sources[0])
+            else:
+                bundles += 1
+                name = f"bundle{'' if bundles == 1 else f'-{bundles}'}.{group['kind']}"
+        data = code.encode('utf-8')
+        built = fingerprint(name, data)
+        contents[built] = data
+        assets[built] = dict(sources=sources, sha256=content_hash(data), **measure(data))
+        pieces.append(html[pos:group['start']])
+        pieces.append(f'<link rel="stylesheet" href="{built}" />' if group['kind'] == 'css'
+                      else f'<script src="{built}"></script>')
+        pos = group['end']
+    pieces.append(html[pos:])
+
+    def skip_consumed(directory: str, names: List[str]) -> List[str]:
+        return [name for name in names
+                if os.path.normpath(os.path.relpath(os.path.join(directory, name), source)) in consumed]
+
+    if os.path.isdir(output):
+        shutil.rmtree(output)
+    shutil.copytree(source, output, ignore=skip_consumed)
+    for name, data in contents.items():
+        with open(os.path.join(output, name), 'wb') as f:
+            f.write(data)
+    with open(os.path.join(output, PAGE), 'w', encoding='utf-8', newline='') as f:
+        f.write(''.join(pieces))
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'page': PAGE,
+        'assets': assets,
+        'firstLoad': {'source': measure_page(os.path.join(source, PAGE))['total'],
+                      'built': measure_page(os.path.join(output, PAGE))['total']},
+    }
+    for directory, _, files in os.walk(output):
+        for name in files:
+            if name.endswith(COMPRESSIBLE):
+                _compress(os.path.join(directory, name), brotli)
+    with open(os.path.join(output, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+
+    problems = verify_site(output, source)
+    if problems:
+        raise BuildError("built site failed verification:\n" + "\n".join(problems))
+    return manifest
+
+
+def verify_site(output: str, source: str = None) -> List[str]:
+    """Describe everything wrong with a built site (an empty list when it is valid)"""
+    problems = []
+    try:
+        with open(os.path.join(output, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(os.path.join(output, PAGE), 'r', encoding='utf-8') as f:
+            html = f.read()
+    except (OSError, ValueError) as e:
+        return [f"Unreadable build output: {e}"]
+
+    for url in asset_references(html):
+        name = url.split('?', 1)[0]
+        try:
+            with open(os.path.join(output, name), 'rb') as f:
+                data = f.read()
+        except OSError:
+            problems.append(f"{url}: referenced by {PAGE} but missing")
+            continue
+        match = FINGERPRINTED.search(name)
+        if match and not content_hash(data).startswith(match.group(1)):
+            problems.append(f"{url}: content does not match its fingerprint")
+        if name in manifest['assets'] and manifest['assets'][name]['sha256'] != content_hash(data):
+            problems.append(f"{url}: content does not match {MANIFEST_FILE}")
+    for name in manifest['assets']:
+        if name not in html:
+            problems.append(f"{name}: built but not referenced by {PAGE}")
+
+    brotli = _brotli()
+    for directory, _, files in os.walk(output):
+        for name in files:
+            base, ext = os.path.splitext(name)
+            if ext not in ('.gz', '.br') or base not in files or (ext == '.br' and brotli is None):
+                continue
+            with open(os.path.join(directory, name), 'rb') as f:
+                compressed = f.read()
+            with open(os.path.join(directory, base), 'rb') as f:
+                original = f.read()
+            try:
+                decoded = gzip.decompress(compressed) if ext == '.gz' else brotli.decompress(compressed)
+            except Exception:
+                decoded = None
+            if decoded != original:
+                rel = os.path.relpath(os.path.join(directory, name), output).replace(os.sep, '/')
+                problems.append(f"{rel}: does not decompress to {base}")
+
+    if source is not None:
+        from html_index import build_html_index
+        before = build_html_index(os.path.join(source, PAGE))
+        after = build_html_index(os.path.join(output, PAGE))
+        lost = [test_id for test_id in before.by_testid if test_id not in after.by_testid]
+        if lost:
+            problems.append(f"{PAGE}: test IDs lost from the markup: {', '.join(lost[:10])}")
+        scripts = ''
+        for name in manifest['assets']:
+            if name.endswith('.js'):
+                with open(os.path.join(output, name), 'r', encoding='utf-8') as f:
+                    scripts += f.read()
+        lost = [test_id for test_id in before.script_testids if test_id not in scripts]
+        if lost:
+            problems.append(f"scripts: test IDs lost from the inline scripts: {', '.join(lost[:10])}")
+    return problems
+
+
+def _kb(value: Optional[int]) -> str:
+    return '-' if value is None else f"{value / 1024:.1f} KB"
+
+
+def main(argv: List[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    source = argv[0] if argv else os.path.join(repo_root, DEFAULT_SOURCE)
+    output = argv[1] if len(argv) > 1 else os.path.join(repo_root, DEFAULT_OUTPUT)
+    try:
+        manifest = build_site(source, output)
+    except (BuildError, OSError) as e:
+        print(f"Site build failed: {e}")
+        return 1
+    for name, asset in manifest['assets'].items():
+        print(f"  {name:32s} {_kb(asset['raw']):>10s} raw {_kb(asset['gzip']):>10s} gzip  "
+              f"<- {', '.join(asset['sources'])}")
+    before, after = manifest['firstLoad']['source'], manifest['firstLoad']['built']
+    print(f"Site built in {output}: first load {_kb(before['raw'])} -> {_kb(after['raw'])} raw, "
+          f"{_kb(before['gzip'])} -> {_kb(after['gzip'])} gzip")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
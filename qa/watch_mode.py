@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Watch mode of the QA runner (run_qa.py --watch)
+Re-runs only the checks whose inputs changed and rewrites the report
+"""
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from check_metrics import configure_limits
+from file_watcher import ALL_PATHS, create_watcher, path_matches
+from result_cache import check_inputs
+
+# Runner output that must not trigger a re-run
+IGNORED_PATHS = {'qa/.cache', 'qa/last-run-report.json', 'qa/dashboard'}
+
+
+def watch(runner, builtin_types: Dict, colors, polling: bool = False, iterations: int = None, ready=None):
+    """Run all checks, then re-run the affected checks on every change until Ctrl+C (or `iterations` changes)"""
+    runner.run_all_checks()
+    runner.export_report()
+    runner.export_dashboard()
+    requirements = runner.load_requirements()
+    results = [result for category_results in runner.results['checks'].values() for result in category_results]
+    latest = {key: result for (key, _), result in zip(watch_entries(requirements), results)}
+
+    watcher = create_watcher(str(runner.repo_root), IGNORED_PATHS, polling=polling)
+    print(f"Watching {runner.repo_root} ({'inotify' if type(watcher).__name__ == 'InotifyWatcher' else 'polling'})"
+          f" - press Ctrl+C to stop")
+    if ready is not None:
+        ready.set()
+
+    try:
+        while iterations is None or iterations > 0:
+            changed = watcher.changes()
+            if not changed:
+                continue
+            runner.fs_index.invalidate(changed)
+            runner._site_dir = None
+            if iterations is not None:
+                iterations -= 1
+            start = time.perf_counter()
+
+            redefined = {}
+            if ALL_PATHS in changed or _requirements_changed(runner, changed):
+                requirements, redefined = _reload_requirements(runner, colors, requirements, latest)
+            entries = watch_entries(requirements)
+            affected = [(key, check) for key, check in entries
+                        if key in redefined or _is_affected(runner, builtin_types, check, changed)]
+            _rerun(runner, colors, entries, affected, latest, changed, start)
+    except KeyboardInterrupt:
+        print("\nWatch mode stopped")
+    finally:
+        watcher.close()
+
+
+def watch_entries(requirements: Dict) -> List[Tuple[Tuple[str, str, int], Dict]]:
+    """(key, check) for every check in file order, keyed by category, ID and occurrence"""
+    entries = []
+    for category_name, data in requirements.get('requirements', {}).items():
+        seen = {}
+        for check in data.get('checks', []):
+            occurrence = seen[check['id']] = seen.get(check['id'], -1) + 1
+            entries.append(((category_name, check['id'], occurrence), check))
+    return entries
+
+
+def _requirements_changed(runner, changed) -> bool:
+    try:
+        rel_path = Path(runner.requirements_file).resolve().relative_to(runner.repo_root.resolve()).as_posix()
+    except ValueError:
+        return False
+    return rel_path in changed
+
+
+def _reload_requirements(runner, colors, requirements: Dict, latest: Dict) -> Tuple[Dict, Dict]:
+    """Re-read requirements.json; return it with the new or redefined checks by key"""
+    try:
+        with open(runner.requirements_file, 'r') as f:
+            new_requirements = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"{colors.RED}requirements.json not reloaded: {e}{colors.ENDC}")
+        return requirements, {}
+    for check_type, handler in new_requirements.get('checkTypes', {}).items():
+        runner.register_check_type(check_type, handler)
+    runner._configure_fs_index(new_requirements)
+    configure_limits(new_requirements.get('subprocessLimits', {}))
+
+    old = dict(watch_entries(requirements))
+    new = dict(watch_entries(new_requirements))
+    for key in old.keys() - new.keys():
+        latest.pop(key, None)
+    return new_requirements, {key: check for key, check in new.items() if old.get(key) != check}
+
+
+def _is_affected(runner, builtin_types: Dict, check: Dict, changed) -> bool:
+    """True if any changed path is an input of the check"""
+    inputs = check_inputs(check)
+    if inputs is None:
+        # Unknown inputs: re-run registered (plugin) types, skip unknown types
+        return check['type'] in runner.check_types and check['type'] not in builtin_types
+    return ALL_PATHS in changed or any(path_matches(spec, path) for spec in inputs for path in changed)
+
+
+def _rerun(runner, colors, entries: List[Tuple[Any, Dict]], affected: List[Tuple[Any, Dict]],
+           latest: Dict, changed, start: float):
+    """Re-run the affected checks, update the report and print what changed"""
+    checks = [check for _, check in affected]
+    if len(checks) > 1 and runner.jobs > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(runner.jobs, len(checks))) as executor:
+            outcomes = list(executor.map(runner._run_check_measured, checks))
+    else:
+        outcomes = [runner._run_check_measured(check) for check in checks]
+
+    transitions = []
+    for (key, check), outcome in zip(affected, outcomes):
+        result = runner._make_result(check, *outcome)
+        transitions.append((latest.get(key), result))
+        latest[key] = result
+
+    runner.results['timestamp'] = datetime.now().isoformat()
+    runner.results['checks'] = {}
+    summary = {'total': 0, 'passed': 0, 'failed': 0, 'skipped': 0}
+    for key, _ in entries:
+        if key in latest:
+            result = latest[key]
+            runner.results['checks'].setdefault(key[0], []).append(result)
+            summary['total'] += 1
+            summary['skipped' if result.get('skipped') else 'passed' if result['passed'] else 'failed'] += 1
+    runner.results['summary'] = summary
+    if runner.cache is not None:
+        runner.cache.save()
+    runner.export_report(quiet=True)
+    runner.export_dashboard(quiet=True)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    paths = sorted(changed)
+    shown = ', '.join(paths[:3]) + (f" (+{len(paths) - 3} more)" if len(paths) > 3 else '')
+    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] {shown}: "
+          f"{len(affected)} check(s) re-run in {elapsed_ms:.1f} ms")
+    if any(path.startswith('qa/') and path.endswith('.py') for path in paths):
+        print(f"  {colors.YELLOW}QA runner code changed - restart --watch to load it{colors.ENDC}")
+
+    fixed = broken = 0
+    for previous, result in transitions:
+        label = f"{result['id']}: {result['name']}"
+        if previous is None:
+            symbol = f"{colors.GREEN}✓{colors.ENDC}" if result['passed'] else f"{colors.RED}✗{colors.ENDC}"
+            print(f"  {symbol} (new) {label}")
+        elif previous['passed'] and not result['passed']:
+            broken += 1
+            print(f"  {colors.GREEN}✓{colors.ENDC} → {colors.RED}✗{colors.ENDC} {label}")
+        elif not previous['passed'] and result['passed']:
+            fixed += 1
+            print(f"  {colors.RED}✗{colors.ENDC} → {colors.GREEN}✓{colors.ENDC} {label}")
+        elif not result['passed'] and previous['message'] != result['message']:
+            print(f"  {colors.RED}✗{colors.ENDC} (still failing) {label}")
+        else:
+            continue
+        if not result['passed']:
+            print(f"    → {result['message']}")
+
+    status = runner.get_overall_status()
+    status_color = {'GREEN': colors.GREEN, 'AMBER': colors.YELLOW}.get(status, colors.RED)
+    print(f"  {fixed} fixed, {broken} broken | QA STATUS: {status_color}{status}{colors.ENDC} "
+          f"({summary['passed']}/{summary['total']} passed)")
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+QA Runner Benchmark Suite for PIT Project
+Generates synthetic repositories at configurable scale, times the QA runner
+(run_all_checks, every check handler) and the check-deployment.py functions
+against a local stand-in HTTP server, and compares the results with a stored
+baseline. Exits 1 when latency or throughput regresses past the threshold.
+
+Usage:
+    python3 scripts/qa/benchmark-qa.py                   # small scale, compare
+    python3 scripts/qa/benchmark-qa.py --scale large     # 10k checks, big HTML
+    python3 scripts/qa/benchmark-qa.py --update-baseline # record new baseline
+"""
+
+import argparse
+import contextlib
+import http.server
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'qa'))
+
+import html_index  # noqa: E402
+import run_qa  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, 'qa', 'benchmark-baseline.json')
+BASELINE_VERSION = 1
+
+# Synthetic repository sizes
+SCALES = {
+    'tiny': {'checks': 40, 'js_files': 5, 'testids': 200, 'binary_files': 2, 'binary_kb': 16, 'heavy_checks': False},
+    'small': {'checks': 500, 'js_files': 200, 'testids': 2000, 'binary_files': 20, 'binary_kb': 256, 'heavy_checks': True},
+    'large': {'checks': 10000, 'js_files': 3000, 'testids': 30000, 'binary_files': 200, 'binary_kb': 1024, 'heavy_checks': True},
+}
+
+# Latency regressions smaller than this are treated as noise
+NOISE_FLOOR_MS = 2.0
+
+SECRET_PATTERNS = ['api[_-]?key', 'secret', 'password', 'token']
+
+
+# ---------------------------------------------------------------------------
+# Synthetic repository
+# ---------------------------------------------------------------------------
+
+def _write(path: str, content, mode: str = 'w'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if 'b' in mode:
+        with open(path, mode) as f:
+            f.write(content)
+    else:
+        with open(path, mode, encoding='utf-8') as f:
+            f.write(content)
+
+
+def _index_html(testids: int) -> str:
+    """A large page: nested sections, tables and an inline script template"""
+    parts = ['<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="UTF-8">\n',
+             '<title>PIT - Project Implementation Tracker</title>\n',
+             '<link rel="stylesheet" href="styles.css">\n',
+             '<style>.inline-rule { color: red; }</style>\n</head>\n<body>\n',
+             '<div data-testid="TID-SHELL-ROOT" id="app" class="shell">\n']
+    for i in range(testids):
+        if i % 500 == 0:
+            parts.append(f'<section data-testid="TID-SECTION-{i // 500}" class="section">\n')
+            parts.append(f'<table data-testid="TID-TABLE-{i // 500}"><thead><tr>'
+                         '<th>Name</th><th>Status</th><th>Owner</th></tr></thead></table>\n')
+        parts.append(f'<div data-testid="TID-ITEM-{i}" id="item-{i}" class="card item-{i % 10}" '
+                     f'aria-label="Item {i}"><span class="title">Item {i}</span></div>\n')
+        if i % 500 == 499:
+            parts.append('</section>\n')
+    parts.append('</div>\n<script>\n')
+    parts.append('function render() { return `<div data-testid="TID-RUNTIME-PANEL">Panel</div>`; }\n')
+    parts.append('</script>\n</body>\n</html>\n')
+    return ''.join(parts)
+
+
+def _js_file(number: int) -> str:
+    lines = [f'// Synthetic module {number}', f'export function module{number}(items) {{']
+    for i in range(60):
+        lines.append(f'  const value{i} = items.map((item) => item.id * {i}).filter(Boolean);')
+    lines.append(f'  return value0.length + {number};')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def _check_templates(heavy: bool) -> List[Dict]:
+    """Check definitions cycled through to reach the requested count"""
+    templates = [
+        {'type': 'file_exists', 'target': 'README.md'},
+        {'type': 'directory_exists', 'target': 'src/frontend'},
+        {'type': 'directory_not_empty', 'target': 'docs'},
+        {'type': 'json_valid', 'target': 'data/config.json'},
+        {'type': 'documentation_check', 'target': 'README.md', 'searchPattern': 'environment|configuration'},
+        {'type': 'element_exists', 'target': 'TID-ITEM-{n}'},
+        {'type': 'element_exists', 'target': '#item-{n}'},
+        {'type': 'element_not_exists', 'targets': ['TID-OBSOLETE-{n}', '.legacy-nav']},
+        {'type': 'element_text_check', 'target': 'TID-ITEM-{n}', 'expectedText': 'Item {n}'},
+        {'type': 'element_attribute_check', 'target': 'TID-ITEM-{n}', 'expectedAttribute': 'aria-label'},
+        {'type': 'css_class_check', 'target': '.card', 'expectedStyles': {'display': 'flex'}},
+        {'type': 'table_structure_check', 'target': 'TID-TABLE-0', 'expectedColumns': 3},
+        {'type': 'testid_check', 'testIds': ['TID-SHELL-ROOT', 'TID-ITEM-{n}', 'TID-RUNTIME-PANEL']},
+        {'type': 'workflow_branch_check', 'target': '.github/workflows/deploy.yml', 'expectedBranch': 'main'},
+        {'type': 'workflow_environment_check', 'target': '.github/workflows/deploy.yml',
+         'expectedEnvironment': 'github-pages'},
+        {'type': 'route_smoke', 'target': '/'},
+    ]
+    if heavy:
+        templates += [
+            {'type': 'js_syntax_check', 'target': 'src/frontend/js/**/*.js',
+             'inlineScripts': ['src/frontend/index.html'], 'once': True},
+            {'type': 'secret_scan', 'target': 'src', 'patterns': SECRET_PATTERNS, 'once': True},
+            {'type': 'pytest_run', 'target': 'tests', 'once': True},
+        ]
+    return templates
+
+
+def _format(value, n: int):
+    if isinstance(value, str):
+        return value.replace('{n}', str(n))
+    if isinstance(value, list):
+        return [_format(v, n) for v in value]
+    if isinstance(value, dict):
+        return {k: _format(v, n) for k, v in value.items()}
+    return value
+
+
+def generate_requirements(scale: Dict) -> Dict:
+    """Build a requirements.json with scale['checks'] checks in categories of 100"""
+    templates = _check_templates(scale['heavy_checks'])
+    repeated = [t for t in templates if not t.get('once')]
+    checks = [dict(t) for t in templates if t.get('once')]
+    n = 0
+    while len(checks) < scale['checks']:
+        checks.append(_format(repeated[n % len(repeated)], n % scale['testids']))
+        n += 1
+
+    categories = {}
+    for number, check in enumerate(checks):
+        check.pop('once', None)
+        check.update({'id': f'BENCH-{number:05d}', 'name': f"Synthetic {check['type']} {number}",
+                      'severity': 'medium'})
+        category = f'category{number // 100:03d}'
+        categories.setdefault(category, {'description': f'Synthetic {category}', 'checks': []})
+        categories[category]['checks'].append(check)
+    return {'requirements': categories}
+
+
+def generate_repo(root: str, scale: Dict) -> str:
+    """Write a synthetic repository under root and return root"""
+    frontend = os.path.join(root, 'src', 'frontend')
+    _write(os.path.join(frontend, 'index.html'), _index_html(scale['testids']))
+    _write(os.path.join(frontend, 'styles.css'),
+           '.card { display: flex; padding: 4px; }\n.title { font-weight: 600; }\n')
+    for number in range(scale['js_files']):
+        _write(os.path.join(frontend, 'js', f'module_{number:05d}.js'), _js_file(number))
+    for number in range(scale['binary_files']):
+        # PNG header (contains a NUL byte) followed by incompressible data
+        _write(os.path.join(frontend, 'assets', f'image_{number:04d}.png'),
+               b'\x89PNG\r\n\x1a\n\0' + os.urandom(scale['binary_kb'] * 1024), 'wb')
+
+    _write(os.path.join(root, 'README.md'), 'Synthetic repo. Environment configuration: none.\n')
+    _write(os.path.join(root, 'docs', 'setup.md'), '# Setup\n')
+    _write(os.path.join(root, 'data', 'config.json'), json.dumps({'items': list(range(1000))}))
+    _write(os.path.join(root, '.github', 'workflows', 'deploy.yml'),
+           'name: Deploy\non:\n  push:\n    branches: [main]\njobs:\n  deploy:\n'
+           '    runs-on: ubuntu-latest\n    environment:\n      name: github-pages\n'
+           '    steps:\n      - run: echo deploy\n')
+    _write(os.path.join(root, 'tests', 'test_synthetic.py'),
+           ''.join(f'def test_case_{i}():\n    assert sum(range({i})) >= 0\n\n' for i in range(50)))
+    _write(os.path.join(root, 'pytest.ini'), '[pytest]\ntestpaths = tests\n')
+    _write(os.path.join(root, 'qa', 'requirements.json'), json.dumps(generate_requirements(scale)))
+    return root
+
+
+# ---------------------------------------------------------------------------
+# Stand-in deployment server
+# ---------------------------------------------------------------------------
+
+class _PagesHandler(http.server.BaseHTTPRequestHandler):
+    body = b''
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def pages_server(body: bytes):
+    """Serve body on a local port, standing in for the GitHub Pages site"""
+    handler = type('PagesHandler', (_PagesHandler,), {'body': body})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}/'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def time_call(fn: Callable, repeats: int, reset: Callable = None) -> Dict:
+    """Time fn; the first call is reported as cold, the median of the rest as warm"""
+    samples = []
+    for attempt in range(max(1, repeats)):
+        if reset is not None and attempt == 0:
+            reset()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    warm = samples[1:] or samples
+    return {'coldMs': round(samples[0], 3), 'medianMs': round(statistics.median(warm), 3)}
+
+
+def bench_run_all_checks(repo: str, jobs: int) -> Dict:
+    """Time one full QARunner.run_all_checks over the synthetic requirements"""
+    html_index.clear_cache()
+    runner = run_qa.QARunner(repo, jobs=jobs)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.run_all_checks()
+    wall_ms = (time.perf_counter() - start) * 1000
+    total = runner.results['summary']['total']
+    return {'wallMs': round(wall_ms, 3), 'checksPerSec': round(total / (wall_ms / 1000), 1), 'checks': total}
+
+
+def check_cases(scale: Dict) -> Dict[str, Dict]:
+    """One representative definition per check_* handler"""
+    last = scale['testids'] - 1
+    cases = {
+        'check_file_exists': {'type': 'file_exists', 'target': 'README.md'},
+        'check_directory_exists': {'type': 'directory_exists', 'target': 'src/frontend'},
+        'check_directory_not_empty': {'type': 'directory_not_empty', 'target': 'src/frontend/js'},
+        'check_json_valid': {'type': 'json_valid', 'target': 'data/config.json'},
+        'check_documentation': {'type': 'documentation_check', 'target': 'README.md',
+                                'searchPattern': 'environment'},
+        'check_element_exists': {'type': 'element_exists', 'target': f'TID-ITEM-{last}'},
+        'check_element_not_exists': {'type': 'element_not_exists', 'targets': ['TID-OBSOLETE', '.legacy']},
+        'check_element_text': {'type': 'element_text_check', 'target': f'TID-ITEM-{last}',
+                               'expectedText': f'Item {last}'},
+        'check_element_attribute': {'type': 'element_attribute_check', 'target': '.card',
+                                    'expectedAttribute': 'aria-label'},
+        'check_css_class': {'type': 'css_class_check', 'target': '.card', 'expectedStyles': {'display': 'flex'}},
+        'check_table_structure': {'type': 'table_structure_check', 'target': 'TID-TABLE-0', 'expectedColumns': 3},
+        'check_testid_check': {'type': 'testid_check',
+                               'testIds': [f'TID-ITEM-{i}' for i in range(0, scale['testids'], 97)]},
+        'check_workflow_branch': {'type': 'workflow_branch_check', 'target': '.github/workflows/deploy.yml'},
+        'check_workflow_environment': {'type': 'workflow_environment_check',
+                                       'target': '.github/workflows/deploy.yml'},
+        'check_playwright_test': {'type': 'playwright_test', 'target': 'tests/e2e/missing.spec.js'},
+    }
+    if scale['heavy_checks']:
+        cases.update({
+            'check_js_syntax': {'type': 'js_syntax_check', 'target': 'src/frontend/js/**/*.js',
+                                'inlineScripts': ['src/frontend/index.html']},
+            'check_secret_scan': {'type': 'secret_scan', 'target': 'src', 'patterns': SECRET_PATTERNS},
+            'check_pytest_run': {'type': 'pytest_run', 'target': 'tests'},
+        })
+    return cases
+
+
+def bench_check_methods(repo: str, scale: Dict, repeats: int) -> Dict[str, Dict]:
+    """Time each check handler; cold runs start from an empty HTML index cache"""
+    runner = run_qa.QARunner(repo)
+    results = {}
+    for method, check in check_cases(scale).items():
+        outcome = []
+        timing = time_call(lambda: outcome.append(runner.run_check(check)), repeats, html_index.clear_cache)
+        timing['passed'] = bool(outcome[0][0])
+        results[method] = timing
+    return results
+
+
+def load_check_deployment():
+    """Import scripts/qa/check-deployment.py (hyphenated, so not importable by name)"""
+    path = os.path.join(REPO_ROOT, 'scripts', 'qa', 'check-deployment.py')
+    spec = importlib.util.spec_from_file_location('check_deployment', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_deployment(repo: str, repeats: int) -> Dict[str, Dict]:
+    """Time the check-deployment.py functions against a local stand-in server"""
+    deployment = load_check_deployment()
+    with open(os.path.join(repo, 'src', 'frontend', 'index.html'), 'rb') as f:
+        body = f.read()
+    expected = ['TID-SHELL-ROOT', 'PIT - Project Implementation Tracker']
+    results = {}
+    with pages_server(body) as url:
+        cases = {
+            'check_url_accessibility': lambda: deployment.check_url_accessibility(url),
+            'check_url_content': lambda: deployment.check_url_content(url, expected),
+            'check_github_environment': lambda: deployment.check_github_environment(
+                'owner', 'repo', 'github-pages'),
+            'check_workflow_run_status': lambda: deployment.check_workflow_run_status(
+                'owner', 'repo', 'deploy-pages.yml'),
+            'check_github_deployment_status': lambda: deployment.check_github_deployment_status(
+                'owner', 'repo', 'github-pages'),
+        }
+        for name, fn in cases.items():
+            outcome = []
+            timing = time_call(lambda: outcome.append(fn()), repeats)
+            timing['status'] = outcome[0]['status']
+            results[name] = timing
+    return results
+
+
+def run_benchmarks(scale_name: str, scale: Dict, repeats: int, jobs: int, keep: bool = False) -> Dict:
+    """Generate a synthetic repo and run every benchmark against it"""
+    root = tempfile.mkdtemp(prefix=f'qa-bench-{scale_name}-')
+    try:
+        start = time.perf_counter()
+        generate_repo(root, scale)
+        html_size = os.path.getsize(os.path.join(root, 'src', 'frontend', 'index.html'))
+        print(f"Generated {scale_name} repo in {time.perf_counter() - start:.1f}s: {scale['checks']} checks, "
+              f"{scale['js_files']} JS files, {scale['testids']} test IDs ({html_size / 1e6:.1f} MB index.html), "
+              f"{scale['binary_files']} x {scale['binary_kb']} KB binaries")
+
+        results = {'runAllChecks': {}, 'checks': {}, 'deployment': {}}
+        for job_count in sorted({1, jobs}):
+            results['runAllChecks'][f'jobs={job_count}'] = bench_run_all_checks(root, job_count)
+        results['checks'] = bench_check_methods(root, scale, repeats)
+        results['deployment'] = bench_deployment(root, repeats)
+        return results
+    finally:
+        if keep:
+            print(f"Synthetic repo kept at: {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+def flatten(results: Dict) -> Dict[str, float]:
+    """Map benchmark results to comparable metrics: '<group>.<name>.<metric>' -> value"""
+    metrics = {}
+    for group, entries in results.items():
+        for name, values in entries.items():
+            for metric, value in values.items():
+                if metric in ('wallMs', 'coldMs', 'medianMs', 'checksPerSec'):
+                    metrics[f'{group}.{name}.{metric}'] = value
+    return metrics
+
+
+def compare(baseline: Dict[str, float], current: Dict[str, float], threshold: float) -> List[str]:
+    """Return a description of every metric that regressed by more than threshold
+
+    Latencies (…Ms) regress when they grow, throughputs (…PerSec) when they
+    shrink. Latency changes below NOISE_FLOOR_MS are ignored.
+    """
+    regressions = []
+    for key, old in sorted(baseline.items()):
+        new = current.get(key)
+        if new is None or not old:
+            continue
+        if key.endswith('PerSec'):
+            if new < old * (1 - threshold):
+                regressions.append(f"{key}: {old:.1f} -> {new:.1f} ({(new - old) / old:+.0%})")
+        elif new > old * (1 + threshold) and new - old > NOISE_FLOOR_MS:
+            regressions.append(f"{key}: {old:.1f} ms -> {new:.1f} ms ({(new - old) / old:+.0%})")
+    return regressions
+
+
+def load_baseline(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == BASELINE_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {'version': BASELINE_VERSION, 'scales': {}}
+
+
+def environment_info() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'node': shutil.which('node') is not None,
+    }
+
+
+def print_results(results: Dict):
+    for name, values in results['runAllChecks'].items():
+        print(f"  run_all_checks [{name}]: {values['wallMs']:10.1f} ms  {values['checksPerSec']:10.1f} checks/s")
+    for group in ('checks', 'deployment'):
+        for name, values in results[group].items():
+            print(f"  {name:34s} cold {values['coldMs']:9.2f} ms  warm {values['medianMs']:9.2f} ms")
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark the QA runner against synthetic repositories')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Synthetic repo size')
+    parser.add_argument('--checks', type=int, help='Override the number of checks')
+    parser.add_argument('--js-files', type=int, help='Override the number of JS files')
+    parser.add_argument('--testids', type=int, help='Override the number of data-testid elements')
+    parser.add_argument('--binary-files', type=int, help='Override the number of binary assets')
+    parser.add_argument('--repeats', type=int, default=5, help='Calls per check benchmark (default: 5)')
+    parser.add_argument('-j', '--jobs', type=int, default=4, help='Also time run_all_checks with N jobs')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed regression as a fraction of the baseline (default: 0.25)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--output', help='Also write this run\'s results to a JSON file')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated repository')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    scale = dict(SCALES[args.scale])
+    for key in ('checks', 'js_files', 'testids', 'binary_files'):
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    scale_name = args.scale if scale == SCALES[args.scale] else f"{args.scale}-custom"
+
+    results = run_benchmarks(scale_name, scale, args.repeats, args.jobs, args.keep)
+    print(f"\n=== QA Runner Benchmarks ({scale_name}) ===")
+    print_results(results)
+
+    record = {'scale': scale, 'environment': environment_info(),
+              'timestamp': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    previous: Optional[Dict] = baseline['scales'].get(scale_name)
+    if args.update_baseline or previous is None:
+        baseline['scales'][scale_name] = record
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nBaseline {'updated' if previous else 'recorded'}: {args.baseline}")
+        return 0
+
+    regressions = compare(flatten(previous['results']), flatten(results), args.threshold)
+    if regressions:
+        print(f"\n[X] {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"\n[OK] No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
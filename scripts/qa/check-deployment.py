@@ -3,39 +3,535 @@
 """
 Deployment Verification Script for PIT Project
 Checks GitHub Pages deployment status, workflow runs, and live URL accessibility
+GitHub state comes from one GraphQL request, cached on disk with a TTL
+Checks run concurrently; the live URL is fetched once through a keep-alive HTTP client
 """
 
+import argparse
+import codecs
 import json
 import os
+import shutil
 import sys
+import threading
 import time
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 import subprocess
 
 # Ensure UTF-8 encoding for output (fixes Windows CP1252 issues)
 if sys.platform == 'win32':
-    import codecs
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-def run_command(cmd: List[str], capture_output: bool = True) -> tuple:
+# Seconds allowed for each check (network calls included)
+CHECK_TIMEOUT = 20
+
+# Seconds allowed for fetching the live URL
+FETCH_TIMEOUT = 10
+
+def run_command(cmd: List[str], capture_output: bool = True, timeout: float = CHECK_TIMEOUT) -> tuple:
     """Run a command and return (success, output)"""
     try:
         result = subprocess.run(
             cmd,
             capture_output=capture_output,
             text=True,
-            check=False
+            check=False,
+            timeout=timeout
         )
         return result.returncode == 0, result.stdout.strip()
+    except subprocess.TimeoutExpired:
+        return False, f"{cmd[0]} timed out after {timeout}s"
     except Exception as e:
         return False, str(e)
 
+@lru_cache(maxsize=None)
+def find_tool(name: str) -> Optional[str]:
+    """Resolve a command-line tool once per process (works on Windows, unlike `which`)"""
+    return shutil.which(name)
+
+# ---------------------------------------------------------------------------
+# HTTP layer: pooled keep-alive connections, compression, streaming reads and
+# ETag/Last-Modified revalidation, using only the standard library.
+# ---------------------------------------------------------------------------
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HTTP_CACHE_DIR = os.path.join(REPO_ROOT, 'qa', '.cache', 'http')
+
+# Responses larger than this are not stored in the conditional-request cache
+HTTP_CACHE_MAX_BYTES = 2 * 1024 * 1024
+
+MAX_REDIRECTS = 5
+
+READ_CHUNK = 16 * 1024
+
+class HttpResponse:
+    """Result of HttpClient.get() and HttpClient.request()"""
+    
+    def __init__(self, url: str, status: Optional[int], headers: Dict[str, str], body: str,
+                 complete: bool = True, from_cache: bool = False, error: str = ""):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.complete = complete      # False when the read stopped early
+        self.from_cache = from_cache  # True after a 304 Not Modified
+        self.error = error
+
+class HttpClient:
+    """
+    Small HTTP/1.1 client on http.client: one pool of keep-alive connections
+    per host, gzip/deflate decoding, early-stopping body reads and a disk
+    cache of validators (ETag, Last-Modified) for conditional requests.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = HTTP_CACHE_DIR, timeout: float = 10,
+                 max_idle_per_host: int = 4):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str, int], List] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+    
+    # -- connection pool ----------------------------------------------------
+    
+    def _acquire(self, scheme: str, host: str, port: int, timeout: float):
+        import http.client
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+            if conn is None:
+                self.connections_opened += 1
+        if conn is not None:
+            # the connection belongs to this request until it is released
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return key, conn
+        if scheme == 'https':
+            import ssl
+            return key, http.client.HTTPSConnection(host, port, timeout=timeout,
+                                                     context=ssl.create_default_context())
+        return key, http.client.HTTPConnection(host, port, timeout=timeout)
+    
+    def _release(self, key, conn, reusable: bool):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if reusable and len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+    
+    def close(self):
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+    
+    # -- validator cache ----------------------------------------------------
+    
+    def _cache_path(self, url: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        import hashlib
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+    
+    def _cache_load(self, url: str) -> Optional[Dict]:
+        path = self._cache_path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (TypeError, OSError, ValueError):
+            return None
+    
+    def _cache_store(self, url: str, response: 'HttpResponse'):
+        path = self._cache_path(url)
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if not path or not (etag or last_modified) or len(response.body) > HTTP_CACHE_MAX_BYTES:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'etag': etag, 'last_modified': last_modified,
+                       'status': response.status, 'body': response.body}, f)
+        os.replace(tmp_path, path)
+    
+    # -- requests -----------------------------------------------------------
+    
+    def get(self, url: str, until: Optional[List[str]] = None, timeout: Optional[float] = None) -> HttpResponse:
+        """
+        GET url, following redirects. With `until`, stop reading the body as
+        soon as every marker string has been seen (the rest is not downloaded);
+        such partial reads bypass the validator cache.
+        Never raises for network errors: status is None and error is set.
+        """
+        return self.request('GET', url, until=until, timeout=timeout)
+    
+    def request(self, method: str, url: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None, until: Optional[List[str]] = None,
+                timeout: Optional[float] = None) -> HttpResponse:
+        """
+        Send one request, following redirects. Only GET responses use the
+        validator cache; other callers may send their own conditional headers.
+        timeout (seconds per socket operation) defaults to the client's.
+        """
+        from urllib.parse import urljoin
+        
+        for _ in range(MAX_REDIRECTS + 1):
+            try:
+                response = self._request_once(method, url, until, body, headers, timeout)
+            except (OSError, ValueError) as e:
+                return HttpResponse(url, None, {}, "", complete=False, error=f"{type(e).__name__}: {e}")
+            location = response.headers.get('location')
+            if response.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return response
+        return HttpResponse(url, None, {}, "", complete=False, error="Too many redirects")
+    
+    def _request_once(self, method: str, url: str, until: Optional[List[str]],
+                      body: Optional[bytes] = None, extra_headers: Optional[Dict[str, str]] = None,
+                      timeout: Optional[float] = None) -> HttpResponse:
+        import http.client
+        import zlib
+        
+        if timeout is None:
+            timeout = self.timeout
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        
+        headers = {'Accept-Encoding': 'gzip, deflate', 'User-Agent': 'pit-deployment-check'}
+        headers.update(extra_headers or {})
+        use_cache = method == 'GET' and not until
+        cached = self._cache_load(url) if use_cache else None
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        key, conn = self._acquire(parsed.scheme, parsed.hostname, port, timeout)
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # A pooled connection the server already closed: retry once on a new one
+                conn.close()
+                key, conn = self._acquire(parsed.scheme, parsed.hostname, port, timeout)
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            response_headers = {name.lower(): value for name, value in resp.getheaders()}
+            
+            if resp.status == 304 and cached:
+                resp.read()
+                self._release(key, conn, not resp.will_close)
+                return HttpResponse(url, cached.get('status', 200), response_headers, cached.get('body', ''),
+                                    from_cache=True)
+            
+            encoding = response_headers.get('content-encoding', '').lower()
+            decoder = None
+            if encoding == 'gzip':
+                decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            elif encoding == 'deflate':
+                decoder = zlib.decompressobj()
+            text_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            
+            parts = []
+            pending = set(until or [])
+            window = ''
+            complete = True
+            while True:
+                chunk = resp.read1(READ_CHUNK)
+                if not chunk:
+                    break
+                if decoder is not None:
+                    chunk = decoder.decompress(chunk)
+                text = text_decoder.decode(chunk)
+                parts.append(text)
+                if pending:
+                    # markers may straddle chunk boundaries: search with the tail of the previous text
+                    window = window[-max(len(m) for m in pending):] + text
+                    pending = {marker for marker in pending if marker not in window}
+                if until and not pending:
+                    complete = False
+                    break
+            if complete:
+                # read() returns the (empty) remainder and marks the response closed
+                resp.read()
+                if decoder is not None:
+                    parts.append(text_decoder.decode(decoder.flush()))
+                parts.append(text_decoder.decode(b'', final=True))
+            # An unread remainder makes the connection unusable for the next request
+            self._release(key, conn, complete and not resp.will_close)
+            conn = None
+        finally:
+            if conn is not None:
+                conn.close()
+        
+        response = HttpResponse(url, resp.status, response_headers, ''.join(parts), complete=complete)
+        if use_cache and complete and resp.status == 200:
+            self._cache_store(url, response)
+        return response
+
+_http_client: Optional[HttpClient] = None
+_http_client_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide pooled HTTP client"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient()
+        return _http_client
+
+def fetch_url(url: str, timeout: float = FETCH_TIMEOUT,
+              until: Optional[List[str]] = None) -> Tuple[Optional[str], str]:
+    """
+    Fetch a URL through the pooled HTTP client, following redirects. With
+    `until`, the body is only read up to the last of those markers.
+    Returns (HTTP status code, body); the status is None if the request failed.
+    """
+    response = get_http_client().get(url, until=until, timeout=timeout)
+    if response.status is None:
+        return None, response.error
+    return str(response.status), response.body
+
+_pages: Dict[str, Tuple[Optional[str], str]] = {}
+_page_locks: Dict[str, threading.Lock] = {}
+_page_locks_guard = threading.Lock()
+
+def get_page(url: str) -> Tuple[Optional[str], str]:
+    """Fetch a URL at most once per run; concurrent callers share the same fetch"""
+    with _page_locks_guard:
+        lock = _page_locks.setdefault(url, threading.Lock())
+    with lock:
+        if url not in _pages:
+            _pages[url] = fetch_url(url)
+        return _pages[url]
+
+def get_page_markers(url: str, markers: List[str]) -> Tuple[Optional[str], str]:
+    """
+    Fetch url just far enough to see every marker. The shared full fetch is
+    reused if it has already finished; otherwise this is its own request,
+    which stops reading early instead of waiting for (and caching) the rest.
+    """
+    if url in _pages:
+        return _pages[url]
+    return fetch_url(url, until=markers)
+
+# ---------------------------------------------------------------------------
+# GitHub status layer: environment, latest workflow run and deployment state in
+# one GraphQL request, cached on disk with a TTL.
+# ---------------------------------------------------------------------------
+
+GITHUB_CACHE_DIR = os.path.join(os.path.dirname(HTTP_CACHE_DIR), 'github')
+
+# Seconds a cached GitHub status is reused without any request
+GITHUB_CACHE_TTL = 60
+
+# Seconds an older cached status may stand in when GitHub cannot be asked
+GITHUB_STALE_MAX_AGE = 3600
+
+def format_age(seconds: float) -> str:
+    """Short human-readable age: 45s, 12 min, 3 h"""
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 2 * 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.0f} h"
+
+def with_status_age(result: Dict, note: str) -> Dict:
+    """Append the age of a stale GitHub status to a check result"""
+    if note:
+        result["message"] = f"{result['message']} ({note})"
+    return result
+
+# `name:` of .github/workflows/deploy-pages.yml, the workflow DEPLOY-008 follows
+DEPLOY_WORKFLOW_NAME = "Deploy to GitHub Pages"
+
+GITHUB_STATUS_QUERY = """
+query($owner: String!, $repo: String!, $environment: String!) {
+  repository(owner: $owner, name: $repo) {
+    environment(name: $environment) {
+      name
+      protectionRules(first: 20) { nodes { type } }
+    }
+    deployments(environments: [$environment], first: 1, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { databaseId state latestStatus { state } }
+    }
+    defaultBranchRef {
+      name
+      target {
+        ... on Commit {
+          history(first: 20) {
+            nodes {
+              messageHeadline
+              checkSuites(first: 20) {
+                nodes { status conclusion workflowRun { runNumber workflow { name resourcePath } } }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+def github_graphql_url() -> str:
+    """GraphQL endpoint, honouring the Actions/GHES environment variables"""
+    if os.environ.get('GITHUB_GRAPHQL_URL'):
+        return os.environ['GITHUB_GRAPHQL_URL']
+    api_url = os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+    if api_url.endswith('/api/v3'):
+        return api_url[:-len('/v3')] + '/graphql'
+    return api_url + '/graphql'
+
+class GitHubStatusClient:
+    """
+    Fetches the repository state the GitHub checks need with a single GraphQL
+    request. Results are kept in `cache_dir` for `ttl` seconds. When GitHub
+    cannot be asked (no token, network or API error), an answer up to
+    `max_stale` seconds old is used and its age reported.
+    """
+    
+    def __init__(self, graphql_url: Optional[str] = None, token: Optional[str] = None,
+                 cache_dir: Optional[str] = GITHUB_CACHE_DIR, ttl: float = GITHUB_CACHE_TTL,
+                 http: Optional[HttpClient] = None, max_stale: float = GITHUB_STALE_MAX_AGE):
+        self.graphql_url = graphql_url or github_graphql_url()
+        self._token = token
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.http = http
+        self.requests_sent = 0
+    
+    def token(self) -> Optional[str]:
+        """GITHUB_TOKEN/GH_TOKEN, else the gh CLI's token (looked up once)"""
+        if self._token is None:
+            token = os.environ.get('GITHUB_TOKEN') or os.environ.get('GH_TOKEN')
+            if not token and find_tool('gh'):
+                success, output = run_command(['gh', 'auth', 'token'])
+                token = output if success else None
+            self._token = token or ''
+        return self._token or None
+    
+    def _cache_path(self, variables: Dict) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        import hashlib
+        key = json.dumps([self.graphql_url, GITHUB_STATUS_QUERY, variables], sort_keys=True)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+    
+    def _cache_load(self, path: Optional[str]) -> Optional[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (TypeError, OSError, ValueError):
+            return None
+    
+    def _cache_store(self, path: Optional[str], entry: Dict):
+        if not path:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    
+    def fetch(self, owner: str, repo: str, environment: str) -> Tuple[Optional[Dict], str]:
+        """
+        Return (repository data, note). A fresh cache entry is returned without
+        any network access. Without data the note is the error. If the request
+        cannot be made or fails, a cached answer younger than `max_stale` is
+        returned, and the note gives its age and the reason.
+        """
+        variables = {'owner': owner, 'repo': repo, 'environment': environment}
+        path = self._cache_path(variables)
+        cached = self._cache_load(path)
+        if cached and time.time() - cached.get('fetchedAt', 0) < self.ttl:
+            return cached['data'], ""
+        
+        token = self.token()
+        if not token:
+            return self._stale(cached, "No GitHub token (set GITHUB_TOKEN or run `gh auth login`)")
+        
+        # No If-None-Match: GitHub's GraphQL endpoint does not answer POSTs with 304
+        headers = {'Authorization': f'bearer {token}', 'Content-Type': 'application/json'}
+        body = json.dumps({'query': GITHUB_STATUS_QUERY, 'variables': variables}).encode('utf-8')
+        self.requests_sent += 1
+        response = (self.http or get_http_client()).request('POST', self.graphql_url, body=body, headers=headers)
+        
+        error = self._response_error(response)
+        if not error:
+            try:
+                payload = json.loads(response.body)
+            except ValueError as e:
+                payload, error = {}, f"Invalid JSON from GitHub: {e}"
+            repository = (payload.get('data') or {}).get('repository')
+            if repository is not None:
+                self._cache_store(path, {'fetchedAt': time.time(), 'data': repository})
+                return repository, ""
+            if not error:
+                messages = [e.get('message', '') for e in payload.get('errors') or []]
+                error = '; '.join(messages) or "Repository not found"
+        return self._stale(cached, error)
+    
+    def _stale(self, cached: Optional[Dict], error: str) -> Tuple[Optional[Dict], str]:
+        """The cached answer with a note on its age, if it is recent enough"""
+        if not cached:
+            return None, error
+        age = time.time() - cached.get('fetchedAt', 0)
+        if age > self.max_stale:
+            return None, f"{error}; the cached status is {format_age(age)} old"
+        return cached['data'], f"GitHub status from {format_age(age)} ago: {error}"
+    
+    @staticmethod
+    def _response_error(response: HttpResponse) -> str:
+        if response.status is None:
+            return response.error
+        if response.status != 200:
+            return f"GitHub API returned HTTP {response.status}"
+        return ""
+
+_github_client: Optional[GitHubStatusClient] = None
+
+def get_github_client() -> GitHubStatusClient:
+    """Return the process-wide GitHub status client"""
+    global _github_client
+    with _http_client_lock:
+        if _github_client is None:
+            _github_client = GitHubStatusClient()
+        return _github_client
+
+_github_status: Dict[Tuple[str, str, str], Tuple[Optional[Dict], str]] = {}
+_github_status_lock = threading.Lock()
+
+def get_github_status(owner: str, repo: str, environment: str) -> Tuple[Optional[Dict], str]:
+    """Fetch the GitHub status once per run; concurrent checks share the request"""
+    key = (owner, repo, environment)
+    with _github_status_lock:
+        if key not in _github_status:
+            _github_status[key] = get_github_client().fetch(owner, repo, environment)
+        return _github_status[key]
+
 def check_url_accessibility(url: str, severity: str = "critical") -> Dict:
     """
     Check if a URL is accessible and returns expected content.
-    Uses curl since we can't rely on requests being installed.
+    Uses the standard-library HTTP client, so neither curl nor requests is needed.
     """
     result = {
         "id": "DEPLOY-009",
@@ -46,17 +542,15 @@ def check_url_accessibility(url: str, severity: str = "critical") -> Dict:
         "details": ""
     }
     
-    # Use curl to check URL accessibility
-    success, output = run_command([
-        "curl", "-s", "-o", "/dev/null", "-w", "%{http_code}", url, "-L", "--max-time", "10"
-    ])
+    # Status code comes from the shared fetch (the body is reused by check_url_content)
+    status_code, _ = get_page(url)
     
-    if success and output == "200":
+    if status_code == "200":
         result["status"] = "PASS"
-        result["message"] = f"URL {url} is accessible (HTTP {output})"
+        result["message"] = f"URL {url} is accessible (HTTP {status_code})"
     else:
         result["status"] = "FAIL"
-        result["message"] = f"URL {url} returned HTTP {output if success else 'connection failed'}"
+        result["message"] = f"URL {url} returned HTTP {status_code or 'connection failed'}"
         result["details"] = "The GitHub Pages deployment may not have completed successfully or CDN propagation is still in progress. Wait 2-5 minutes and try again."
     
     return result
@@ -72,10 +566,10 @@ def check_url_content(url: str, expected_content: List[str], severity: str = "cr
         "details": ""
     }
     
-    # Download page content
-    success, content = run_command(["curl", "-s", "-L", url, "--max-time", "10"])
+    # Only the head of the page up to the last marker is read
+    status_code, content = get_page_markers(url, expected_content)
     
-    if not success:
+    if status_code is None:
         result["message"] = "Failed to retrieve page content"
         result["details"] = content
         return result
@@ -98,8 +592,8 @@ def check_url_content(url: str, expected_content: List[str], severity: str = "cr
 
 def check_github_environment(owner: str, repo: str, environment: str, severity: str = "critical") -> Dict:
     """
-    Check GitHub environment protection rules using gh CLI.
-    Note: This requires gh CLI to be authenticated.
+    Check that the environment has a deployment branch policy.
+    Note: This requires a GitHub token (GITHUB_TOKEN or an authenticated gh CLI).
     """
     result = {
         "id": "DEPLOY-007",
@@ -110,45 +604,38 @@ def check_github_environment(owner: str, repo: str, environment: str, severity:
         "details": ""
     }
     
-    # Check if gh CLI is available
-    success, _ = run_command(["which", "gh"])
-    if not success:
-        result["message"] = "gh CLI not available - skipping environment check"
-        result["details"] = "Install gh CLI and authenticate to enable environment checks"
+    status, note = get_github_status(owner, repo, environment)
+    if status is None:
+        result["message"] = "GitHub status not available - skipping environment check"
+        result["details"] = note
         return result
     
-    # Try to get environment info
-    success, output = run_command([
-        "gh", "api", f"/repos/{owner}/{repo}/environments/{environment}",
-        "--jq", ".deployment_branch_policy"
-    ])
-    
-    if not success:
-        result["status"] = "FAIL"
-        result["message"] = f"Could not retrieve environment configuration: {output}"
-        result["details"] = "Environment may not exist yet or gh CLI is not authenticated. First deployment will create it."
+    env = status.get("environment")
+    if not env:
         # This is not necessarily a failure - environment is created on first deploy
-        result["status"] = "SKIP"
-        return result
+        result["message"] = f"Environment {environment} not found"
+        result["details"] = "First deployment will create it."
+        return with_status_age(result, note)
     
-    try:
-        # Parse deployment branch policy
-        if "protected_branches" in output or "custom_branch_policies" in output:
-            # Check if main is allowed
-            result["status"] = "PASS"
-            result["message"] = "Environment deployment policy configured"
-        else:
-            result["status"] = "FAIL"
-            result["message"] = "Environment deployment policy may block main branch"
-            result["details"] = "Go to Settings → Environments → github-pages and ensure main branch is in allowed branches"
-    except Exception as e:
-        result["status"] = "SKIP"
-        result["message"] = f"Could not parse environment policy: {str(e)}"
+    rules = [rule.get("type") for rule in (env.get("protectionRules") or {}).get("nodes") or []]
+    if "BRANCH_POLICY" in rules:
+        result["status"] = "PASS"
+        result["message"] = "Environment deployment policy configured"
+    else:
+        result["status"] = "FAIL"
+        result["message"] = "Environment deployment policy may block main branch"
+        result["details"] = "Go to Settings → Environments → github-pages and ensure main branch is in allowed branches"
     
-    return result
+    return with_status_age(result, note)
 
-def check_workflow_run_status(owner: str, repo: str, workflow_file: str, severity: str = "critical") -> Dict:
-    """Check the latest workflow run status using gh CLI."""
+def check_workflow_run_status(owner: str, repo: str, workflow_file: str, severity: str = "critical",
+                              environment: str = "github-pages", workflow_name: Optional[str] = None) -> Dict:
+    """
+    Check the latest run of the deployment workflow on the default branch.
+    Runs are matched by workflow name (or by file when no name is given) among
+    the check suites of the last commits, so other workflows passing on the
+    head commit do not count.
+    """
     result = {
         "id": "DEPLOY-008",
         "name": "Latest deployment workflow run succeeded",
@@ -158,59 +645,49 @@ def check_workflow_run_status(owner: str, repo: str, workflow_file: str, severit
         "details": ""
     }
     
-    # Check if gh CLI is available
-    success, _ = run_command(["which", "gh"])
-    if not success:
-        result["message"] = "gh CLI not available - skipping workflow check"
-        return result
-    
-    # Get latest workflow run
-    success, output = run_command([
-        "gh", "run", "list",
-        "--workflow", workflow_file,
-        "--limit", "1",
-        "--json", "conclusion,status,headBranch,displayTitle",
-        "--repo", f"{owner}/{repo}"
-    ])
-    
-    if not success:
-        result["status"] = "FAIL"
-        result["message"] = f"Could not retrieve workflow runs: {output}"
+    status, note = get_github_status(owner, repo, environment)
+    if status is None:
+        result["message"] = "GitHub status not available - skipping workflow check"
+        result["details"] = note
         return result
     
-    try:
-        runs = json.loads(output)
-        if not runs:
-            result["message"] = "No workflow runs found for deploy-pages.yml"
-            result["status"] = "SKIP"
-            return result
-        
-        latest_run = runs[0]
-        conclusion = latest_run.get("conclusion", "")
-        status = latest_run.get("status", "")
-        branch = latest_run.get("headBranch", "")
-        title = latest_run.get("displayTitle", "")
-        
-        if conclusion == "success":
-            result["status"] = "PASS"
-            result["message"] = f"Latest workflow run succeeded ({branch}: {title})"
-        elif status == "in_progress" or status == "queued":
-            result["status"] = "SKIP"
-            result["message"] = f"Workflow is currently {status}"
-            result["details"] = "Wait for the workflow to complete"
-        else:
-            result["status"] = "FAIL"
-            result["message"] = f"Latest workflow run {conclusion or status} ({branch}: {title})"
-            result["details"] = f"Check GitHub Actions logs for details. Run status: {status}, conclusion: {conclusion}"
-    
-    except json.JSONDecodeError as e:
+    def is_deploy_run(suite: Dict) -> bool:
+        workflow = (suite.get("workflowRun") or {}).get("workflow") or {}
+        if workflow_name:
+            return workflow.get("name") == workflow_name
+        return (workflow.get("resourcePath") or "").endswith(f"/{workflow_file}")
+    
+    branch_ref = status.get("defaultBranchRef") or {}
+    commits = (((branch_ref.get("target") or {}).get("history") or {}).get("nodes")) or []
+    runs = [(suite, commit) for commit in commits
+            for suite in (commit.get("checkSuites") or {}).get("nodes") or [] if is_deploy_run(suite)]
+    if not runs:
+        result["message"] = f"No workflow runs found for {workflow_file}"
+        return with_status_age(result, note)
+    
+    # Run numbers count up per workflow, so the highest one is the latest run
+    latest_run, commit = max(runs, key=lambda run: run[0]["workflowRun"].get("runNumber") or 0)
+    conclusion = (latest_run.get("conclusion") or "").lower()
+    run_status = (latest_run.get("status") or "").lower()
+    branch = branch_ref.get("name", "")
+    title = commit.get("messageHeadline", "")
+    
+    if conclusion == "success":
+        result["status"] = "PASS"
+        result["message"] = f"Latest workflow run succeeded ({branch}: {title})"
+    elif run_status in ("in_progress", "queued", "pending", "waiting", "requested"):
+        result["status"] = "SKIP"
+        result["message"] = f"Workflow is currently {run_status}"
+        result["details"] = "Wait for the workflow to complete"
+    else:
         result["status"] = "FAIL"
-        result["message"] = f"Could not parse workflow run data: {str(e)}"
+        result["message"] = f"Latest workflow run {conclusion or run_status} ({branch}: {title})"
+        result["details"] = f"Check GitHub Actions logs for details. Run status: {run_status}, conclusion: {conclusion}"
     
-    return result
+    return with_status_age(result, note)
 
 def check_github_deployment_status(owner: str, repo: str, environment: str, severity: str = "critical") -> Dict:
-    """Check GitHub deployment status using gh CLI."""
+    """Check the state of the latest deployment to the environment."""
     result = {
         "id": "DEPLOY-011",
         "name": "GitHub deployment status is Active",
@@ -220,42 +697,84 @@ def check_github_deployment_status(owner: str, repo: str, environment: str, seve
         "details": ""
     }
     
-    # Check if gh CLI is available
-    success, _ = run_command(["which", "gh"])
-    if not success:
-        result["message"] = "gh CLI not available - skipping deployment status check"
+    status, note = get_github_status(owner, repo, environment)
+    if status is None:
+        result["message"] = "GitHub status not available - skipping deployment status check"
+        result["details"] = note
         return result
     
-    # Get latest deployment
-    success, output = run_command([
-        "gh", "api", f"/repos/{owner}/{repo}/deployments",
-        "--jq", f'.[0] | select(.environment == "{environment}") | .id'
-    ])
-    
-    if not success or not output:
+    deployments = (status.get("deployments") or {}).get("nodes") or []
+    if not deployments:
         result["message"] = "No deployments found for github-pages environment"
         result["details"] = "First deployment will create the deployment record"
-        return result
+        return with_status_age(result, note)
     
-    deployment_id = output
-    
-    # Get deployment status
-    success, status_output = run_command([
-        "gh", "api", f"/repos/{owner}/{repo}/deployments/{deployment_id}/statuses",
-        "--jq", ".[0].state"
-    ])
+    latest_status = deployments[0].get("latestStatus")
+    if not latest_status:
+        result["message"] = "Could not retrieve deployment status"
+        return with_status_age(result, note)
     
-    if success and status_output == "success":
+    state = (latest_status.get("state") or "").lower()
+    if state == "success":
         result["status"] = "PASS"
         result["message"] = "GitHub deployment status is active/success"
-    elif success:
+    else:
         result["status"] = "FAIL"
-        result["message"] = f"GitHub deployment status is {status_output}"
+        result["message"] = f"GitHub deployment status is {state}"
         result["details"] = "Deployment may have failed or is still in progress"
-    else:
-        result["status"] = "SKIP"
-        result["message"] = "Could not retrieve deployment status"
     
+    return with_status_age(result, note)
+
+def check_deployed_assets(url: str, severity: str = "critical") -> Dict:
+    """
+    Check that the deployed page is the qa/site_build.py artifact: every script
+    and stylesheet it references is fingerprinted, reachable, and matches the
+    hash in its name.
+    """
+    import hashlib
+    from urllib.parse import urljoin
+    if os.path.join(REPO_ROOT, 'qa') not in sys.path:
+        sys.path.insert(0, os.path.join(REPO_ROOT, 'qa'))
+    from site_build import FINGERPRINTED, asset_references
+
+    result = {
+        "id": "DEPLOY-012",
+        "name": "Deployed assets are fingerprinted and intact",
+        "status": "FAIL",
+        "severity": severity,
+        "message": "",
+        "details": ""
+    }
+
+    # The whole page from the shared fetch
+    status, body = get_page(url)
+    if status is None:
+        result["message"] = "Failed to retrieve page content"
+        result["details"] = body
+        return result
+
+    client = get_http_client()
+    refs = asset_references(body)
+    plain = [ref for ref in refs if not FINGERPRINTED.search(ref.split('?', 1)[0])]
+    if not refs or plain:
+        result["message"] = f"Deployed page references unbuilt assets: {', '.join(plain) or 'none found'}"
+        result["details"] = "deploy-pages.yml should upload the output of qa/site_build.py, not src/frontend."
+        return result
+
+    problems = []
+    for ref in refs:
+        response = client.get(urljoin(url, ref))
+        if response.status != 200:
+            problems.append(f"{ref}: HTTP {response.status or response.error}")
+        elif not hashlib.sha256(response.body.encode('utf-8')).hexdigest().startswith(
+                FINGERPRINTED.search(ref.split('?', 1)[0]).group(1)):
+            problems.append(f"{ref}: content does not match its fingerprint")
+    if problems:
+        result["message"] = f"{len(problems)} of {len(refs)} deployed assets are broken: {'; '.join(problems)}"
+        result["details"] = "A stale CDN copy or a partial upload can serve mismatched assets. Redeploy if this persists."
+    else:
+        result["status"] = "PASS"
+        result["message"] = f"All {len(refs)} deployed assets are fingerprinted and match their hashes"
     return result
 
 def get_current_branch() -> Optional[str]:
@@ -263,9 +782,69 @@ def get_current_branch() -> Optional[str]:
     success, branch = run_command(["git", "branch", "--show-current"])
     return branch if success and branch else None
 
+def run_checks_concurrently(tasks: List[Tuple[str, str, Callable[[], Dict]]], timeout: float,
+                            severity: str) -> List[Dict]:
+    """
+    Run independent checks on daemon threads and return their results in task order.
+    A check that does not finish within `timeout` seconds is reported as FAIL;
+    its thread is abandoned and does not keep the interpreter from exiting.
+    """
+    outcomes: Dict[int, Tuple[bool, object]] = {}
+
+    def run(index: int, fn: Callable[[], Dict]):
+        try:
+            outcomes[index] = (True, fn())
+        except Exception as e:
+            outcomes[index] = (False, e)
+
+    threads = [threading.Thread(target=run, args=(i, fn), name=f"check-{check_id}", daemon=True)
+               for i, (check_id, _, fn) in enumerate(tasks)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    results = []
+    for i, (check_id, name, _) in enumerate(tasks):
+        if i not in outcomes:
+            results.append({
+                "id": check_id,
+                "name": name,
+                "status": "FAIL",
+                "severity": severity,
+                "message": f"Check timed out after {timeout}s",
+                "details": "The GitHub API or the deployed site did not respond in time"
+            })
+            continue
+        ok, value = outcomes[i]
+        if ok:
+            results.append(value)
+        else:
+            results.append({
+                "id": check_id,
+                "name": name,
+                "status": "FAIL",
+                "severity": severity,
+                "message": f"Check raised {type(value).__name__}: {value}",
+                "details": ""
+            })
+    return results
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Deployment verification for PIT Project')
+    parser.add_argument('--timeout', type=float, default=CHECK_TIMEOUT,
+                        help=f'Seconds allowed for each check (default: {CHECK_TIMEOUT})')
+    parser.add_argument('--github-ttl', type=float, default=GITHUB_CACHE_TTL,
+                        help=f'Seconds a cached GitHub status is reused (default: {GITHUB_CACHE_TTL}, 0 always asks GitHub)')
+    return parser.parse_args(argv)
+
 def main():
     """Run all deployment checks."""
-    checks = []
+    args = parse_args()
+    timeout = args.timeout
+    get_github_client().ttl = args.github_ttl
     
     # Configuration
     repo_owner = "Lovable-LDCS"
@@ -297,36 +876,34 @@ def main():
     else:
         print("\n=== Deployment Verification Checks ===\n")
     
-    # Check 1: GitHub environment configuration
-    print("Checking GitHub environment protection rules...")
-    env_check = check_github_environment(repo_owner, repo_name, environment, deployment_severity)
-    checks.append(env_check)
-    print(f"  [{env_check['status']}] {env_check['name']}: {env_check['message']}")
-    
-    # Check 2: Workflow run status
-    print("\nChecking latest workflow run...")
-    workflow_check = check_workflow_run_status(repo_owner, repo_name, "deploy-pages.yml", deployment_severity)
-    checks.append(workflow_check)
-    print(f"  [{workflow_check['status']}] {workflow_check['name']}: {workflow_check['message']}")
-    
-    # Check 3: URL accessibility
-    print("\nChecking live URL accessibility...")
-    url_check = check_url_accessibility(deploy_url, deployment_severity)
-    checks.append(url_check)
-    print(f"  [{url_check['status']}] {url_check['name']}: {url_check['message']}")
-    
-    # Check 4: URL content
-    if url_check['status'] == 'PASS':
-        print("\nChecking deployed content...")
-        content_check = check_url_content(deploy_url, expected_content, deployment_severity)
-        checks.append(content_check)
-        print(f"  [{content_check['status']}] {content_check['name']}: {content_check['message']}")
-    
-    # Check 5: Deployment status
-    print("\nChecking GitHub deployment status...")
-    deploy_status_check = check_github_deployment_status(repo_owner, repo_name, environment, deployment_severity)
-    checks.append(deploy_status_check)
-    print(f"  [{deploy_status_check['status']}] {deploy_status_check['name']}: {deploy_status_check['message']}")
+    # All checks are independent: run them together, then report in a fixed order
+    tasks = [
+        ("DEPLOY-007", "GitHub Pages environment allows main branch deployment",
+         lambda: check_github_environment(repo_owner, repo_name, environment, deployment_severity)),
+        ("DEPLOY-008", "Latest deployment workflow run succeeded",
+         lambda: check_workflow_run_status(repo_owner, repo_name, "deploy-pages.yml", deployment_severity,
+                                           environment, DEPLOY_WORKFLOW_NAME)),
+        ("DEPLOY-009", "Live deployment URL is accessible",
+         lambda: check_url_accessibility(deploy_url, deployment_severity)),
+        ("DEPLOY-010", "Deployed application contains expected content",
+         lambda: check_url_content(deploy_url, expected_content, deployment_severity)),
+        ("DEPLOY-011", "GitHub deployment status is Active",
+         lambda: check_github_deployment_status(repo_owner, repo_name, environment, deployment_severity)),
+        ("DEPLOY-012", "Deployed assets are fingerprinted and intact",
+         lambda: check_deployed_assets(deploy_url, deployment_severity)),
+    ]
+    print(f"Running {len(tasks)} deployment checks concurrently (timeout {timeout}s each)...")
+    start = time.perf_counter()
+    checks = run_checks_concurrently(tasks, timeout, deployment_severity)
+    
+    # Content and assets are only meaningful when the URL is reachable
+    url_check = next(c for c in checks if c['id'] == 'DEPLOY-009')
+    if url_check['status'] != 'PASS':
+        checks = [c for c in checks if c['id'] not in ('DEPLOY-010', 'DEPLOY-012')]
+    
+    for check in checks:
+        print(f"  [{check['status']}] {check['name']}: {check['message']}")
+    print(f"\nDeployment checks completed in {time.perf_counter() - start:.2f}s")
     
     # Save results to JSON
     results = {
@@ -130,6 +130,13 @@
     `;
     
     try {
+      // Precomputed payload from qa/run_qa.py: summary first, category details on demand
+      const summaryResponse = await fetch('qa/dashboard/summary.json');
+      if (summaryResponse.ok) {
+        displayHealthReport(await summaryResponse.json());
+        return;
+      }
+      
       // Load ACTUAL QA results from last-result.json (generated by run-qa.ps1)
       const response = await fetch('qa/last-result.json');
       
@@ -234,31 +241,77 @@
         const categoryPassed = checks.filter(c => c.status === 'PASS').length;
         const categorySkipped = checks.filter(c => c.status === 'SKIP').length;
         
-        html += `
-          <details class="filter-card" style="margin-bottom: 12px;" ${categoryFailed > 0 ? 'open' : ''}>
+        html += renderHealthCategory(category, categoryPassed, categoryFailed, categorySkipped, renderHealthChecks(checks));
+      }
+      
+      html += '</div>';
+    }
+    
+    // Precomputed payload: categories carry counts only, their checks load when opened
+    if (report.categories) {
+      html += '<div style="margin-top: 16px;">';
+      for (const [category, [passed, failed, skipped, shard]] of Object.entries(report.categories)) {
+        html += renderHealthCategory(category, passed, failed, skipped,
+          '<p style="color: #94a3b8; margin: 0;">Loading checks...</p>', shard);
+      }
+      html += '</div>';
+    }
+    
+    reportDisplay.innerHTML = html;
+    
+    reportDisplay.querySelectorAll('details[data-shard]').forEach(details => {
+      const load = () => {
+        if (details.dataset.loaded) return;
+        details.dataset.loaded = 'true';
+        loadHealthShard(details.dataset.shard)
+          .then(shard => {
+            details.querySelector('.health-category-checks').innerHTML = renderHealthChecks(shard.checks);
+          })
+          .catch(error => {
+            details.querySelector('.health-category-checks').innerHTML =
+              `<p style="color: #7f1d1d; margin: 0;">${error.message}</p>`;
+          });
+      };
+      if (details.open) {
+        load();
+      } else {
+        details.addEventListener('toggle', load, { once: true });
+      }
+    });
+  }
+  
+  // One collapsible category of the health report (failing categories start open)
+  function renderHealthCategory(category, passed, failed, skipped, body, shard) {
+    return `
+          <details class="filter-card" style="margin-bottom: 12px;" ${failed > 0 ? 'open' : ''} ${shard ? `data-shard="${shard}"` : ''}>
             <summary style="cursor: pointer; font-weight: bold; padding: 8px; background: #f1f5f9; border-radius: 4px;">
-              ${category.toUpperCase()} (✓ ${categoryPassed} | ✗ ${categoryFailed} | ⊝ ${categorySkipped})
+              ${category.toUpperCase()} (✓ ${passed} | ✗ ${failed} | ⊝ ${skipped})
             </summary>
-            <div style="padding: 12px 8px;">
+            <div class="health-category-checks" style="padding: 12px 8px;">
+              ${body}
+            </div>
+          </details>
         `;
-        
-        checks.forEach(check => {
-          let checkIcon, checkColor, checkBg;
-          if (check.status === 'PASS') {
-            checkIcon = '✓';
-            checkColor = '#10b981';
-            checkBg = '#f0fdf4';
-          } else if (check.status === 'SKIP') {
-            checkIcon = '⊝';
-            checkColor = '#94a3b8';
-            checkBg = '#f8fafc';
-          } else {
-            checkIcon = '✗';
-            checkColor = '#ef4444';
-            checkBg = '#fef2f2';
-          }
-          
-          html += `
+  }
+  
+  function renderHealthChecks(checks) {
+    return checks.map(check => {
+      let checkIcon, checkColor, checkBg;
+      if (check.status === 'PASS') {
+        checkIcon = '✓';
+        checkColor = '#10b981';
+        checkBg = '#f0fdf4';
+      } else if (check.status === 'SKIP') {
+        checkIcon = '⊝';
+        checkColor = '#94a3b8';
+        checkBg = '#f8fafc';
+      } else {
+        checkIcon = '✗';
+        checkColor = '#ef4444';
+        checkBg = '#fef2f2';
+      }
+      
+      return `
             <div style="margin-bottom: 8px; padding: 8px; background: ${checkBg}; border-radius: 4px;">
               <div style="display: flex; align-items: start; gap: 8px;">
                 <span style="color: ${checkColor}; font-weight: bold;">${checkIcon}</span>
@@ -271,18 +324,19 @@
               </div>
             </div>
           `;
-        });
-        
-        html += `
-            </div>
-          </details>
-        `;
-      }
-      
-      html += '</div>';
+    }).join('');
+  }
+  
+  // Per-category detail shards written by qa/run_qa.py, fetched once each
+  const healthShards = {};
+  function loadHealthShard(file) {
+    if (!healthShards[file]) {
+      healthShards[file] = fetch(`qa/dashboard/${file}`).then(response => {
+        if (!response.ok) throw new Error(`QA detail shard ${file} not found`);
+        return response.json();
+      });
     }
-    
-    reportDisplay.innerHTML = html;
+    return healthShards[file];
   }
 
   // Placeholder functions referenced in HTML
@@ -7,11 +7,41 @@
   // QA State
   const qaState = {
     lastRun: null,
+    summary: null,
+    payload: null,
+    categoryResults: {},
     results: [],
     categories: {},
     currentFilter: 'all'
   };
 
+  // Per-category detail shards written by qa/run_qa.py, fetched once each
+  const shardRequests = {};
+  function loadShard(file) {
+    if (!shardRequests[file]) {
+      shardRequests[file] = fetch(`qa/dashboard/${file}`).then(response => {
+        if (!response.ok) throw new Error(`QA detail shard ${file} not found`);
+        return response.json();
+      });
+    }
+    return shardRequests[file];
+  }
+
+  function emptyCategories() {
+    return {
+      code: { pass: 0, fail: 0 },
+      wiring: { pass: 0, fail: 0 },
+      security: { pass: 0, fail: 0 },
+      deployment: { pass: 0, fail: 0 },
+      ui: { pass: 0, fail: 0 },
+      performance: { pass: 0, fail: 0 },
+      runtime: { pass: 0, fail: 0 },
+      accessibility: { pass: 0, fail: 0 },
+      data: { pass: 0, fail: 0 },
+      legacy: { pass: 0, fail: 0 }
+    };
+  }
+
   // Category mapping from requirements.json to dashboard categories
   const categoryMapping = {
     'architecture': 'code',
@@ -81,6 +111,13 @@
     testList.innerHTML = '<div class="qa-loading"><div class="qa-loading-spinner"></div><p>Running comprehensive QA tests...</p></div>';
 
     try {
+      // Precomputed payload from qa/run_qa.py: a small summary, details per category
+      const summaryResponse = await fetch('qa/dashboard/summary.json');
+      if (summaryResponse.ok) {
+        loadDashboardPayload(await summaryResponse.json(), testList);
+        return;
+      }
+
       // Load ACTUAL QA results from last-result.json (generated by run-qa.ps1)
       const response = await fetch('qa/last-result.json');
       
@@ -92,18 +129,7 @@
       
       // Process real test results
       const results = [];
-      const categories = {
-        code: { pass: 0, fail: 0 },
-        wiring: { pass: 0, fail: 0 },
-        security: { pass: 0, fail: 0 },
-        deployment: { pass: 0, fail: 0 },
-        ui: { pass: 0, fail: 0 },
-        performance: { pass: 0, fail: 0 },
-        runtime: { pass: 0, fail: 0 },
-        accessibility: { pass: 0, fail: 0 },
-        data: { pass: 0, fail: 0 },
-        legacy: { pass: 0, fail: 0 }
-      };
+      const categories = emptyCategories();
 
       // Map categories from run-qa.ps1 to dashboard categories
       const catMap = {
@@ -144,6 +170,8 @@
 
       // Update state
       qaState.lastRun = new Date(qaResults.timestamp || Date.now());
+      qaState.summary = null;
+      qaState.payload = null;
       qaState.results = results;
       qaState.categories = categories;
 
@@ -161,6 +189,59 @@
     }
   };
 
+  // Paint the summary cards from summary.json; check details load per category on demand
+  function loadDashboardPayload(payload, testList) {
+    const categories = emptyCategories();
+    for (const [name, [passed, failed]] of Object.entries(payload.categories || {})) {
+      const category = categoryMapping[name] || 'code';
+      categories[category].pass += passed;
+      categories[category].fail += failed;
+    }
+
+    qaState.lastRun = new Date(payload.timestamp || Date.now());
+    qaState.summary = payload.summary;
+    qaState.payload = payload;
+    qaState.categoryResults = {};
+    qaState.results = [];
+    qaState.categories = categories;
+    updateDashboard();
+    testList.innerHTML = '<p class="text-muted">Choose a filter or a category\'s details to load its checks</p>';
+  }
+
+  // Fetch the shards of the summary.json categories that match, and add their checks to the results
+  async function loadPayloadCategories(matches) {
+    const entries = Object.entries(qaState.payload.categories || {})
+      .filter(([name, counts]) => matches(name, counts));
+    const shards = await Promise.all(entries.map(([, counts]) => loadShard(counts[3])));
+    shards.forEach(shard => {
+      qaState.categoryResults[shard.category] = shard.checks.map(check => ({
+        id: check.id,
+        name: check.name,
+        description: check.message || check.details || check.name,
+        category: categoryMapping[shard.category] || 'code',
+        severity: check.severity || 'medium',
+        passed: check.status === 'PASS',
+        skipped: check.status === 'SKIP',
+        type: shard.category
+      }));
+    });
+    qaState.results = Object.values(qaState.categoryResults).flat();
+    updateDashboard();
+    return qaState.results;
+  }
+
+  // Shards needed to show the tests of the current filter
+  function loadFilteredResults() {
+    switch (qaState.currentFilter) {
+      case 'failed':
+        return loadPayloadCategories((name, [, failed]) => failed > 0);
+      case 'passed':
+        return loadPayloadCategories((name, [passed]) => passed > 0);
+      default:
+        return loadPayloadCategories(() => true);
+    }
+  }
+
   // Note: executeCheck and checkForDuplicates functions removed
   // QA Dashboard now loads REAL results from qa/last-result.json
   // generated by scripts/run-qa.ps1 - NO MORE SIMULATED DATA
@@ -185,8 +266,10 @@
     const results = qaState.results;
     const categories = qaState.categories;
 
-    const total = results.length;
-    const passed = results.filter(r => r.passed).length;
+    // Before the detail shards arrive, the counts come from summary.json
+    const summary = qaState.summary;
+    const total = summary ? summary.total : results.length;
+    const passed = summary ? summary.passed : results.filter(r => r.passed).length;
     const failed = total - passed;
     const healthPct = total > 0 ? Math.round((passed / total) * 100) : 0;
 
@@ -212,7 +295,7 @@
     if (actionsSection) {
       if (failed > 0) {
         actionsSection.removeAttribute('hidden');
-        renderCorrectiveActions(results.filter(r => !r.passed));
+        renderCorrectiveActions(results.filter(r => !r.passed), categories);
       } else {
         actionsSection.setAttribute('hidden', '');
       }
@@ -276,10 +359,23 @@
   }
 
   // Render corrective actions
-  function renderCorrectiveActions(failedTests) {
+  function renderCorrectiveActions(failedTests, categories) {
     const actionsList = document.querySelector('[data-testid="TID-QA-ACTIONS-LIST"]');
     if (!actionsList) return;
 
+    // Failed checks not loaded yet: list the failure counts from summary.json
+    if (failedTests.length === 0) {
+      actionsList.innerHTML = Object.entries(categories)
+        .filter(([, stats]) => stats.fail > 0)
+        .map(([category, stats]) => `
+      <div class="qa-action-item">
+        <div class="qa-action-title">${getCategoryLabel(category)}: ${stats.fail} issue(s)</div>
+        <ul class="qa-action-steps"><li><em>Show failed tests for details</em></li></ul>
+      </div>
+    `).join('');
+      return;
+    }
+
     // Group by category
     const byCategory = {};
     failedTests.forEach(test => {
@@ -311,7 +407,9 @@
     event.target.setAttribute('data-active', 'true');
 
     // Re-render
-    if (qaState.results.length > 0) {
+    if (qaState.payload) {
+      loadFilteredResults().then(renderTestList).catch(showLoadError);
+    } else if (qaState.results.length > 0) {
       renderTestList(qaState.results);
     }
   };
@@ -337,7 +435,15 @@
     document.querySelector('[data-testid="TID-QA-DETAILS-SECTION"]').scrollIntoView({ behavior: 'smooth' });
   };
 
-  window.showCategoryDetails = function(category) {
+  window.showCategoryDetails = async function(category) {
+    if (qaState.payload) {
+      try {
+        await loadPayloadCategories(name => (categoryMapping[name] || 'code') === category);
+      } catch (error) {
+        showLoadError(error);
+        return;
+      }
+    }
     if (qaState.results.length === 0) {
       alert('Please run QA tests first');
       return;
@@ -352,6 +458,11 @@
     }
   };
 
+  function showLoadError(error) {
+    const testList = document.querySelector('[data-testid="TID-QA-TEST-LIST"]');
+    if (testList) testList.innerHTML = `<p class="text-danger">Error loading QA results: ${error.message}</p>`;
+  }
+
   // Utility function
   function setText(testId, value) {
     const el = document.querySelector(`[data-testid="${testId}"]`);
@@ -1,4 +1,8 @@
 // Playwright configuration for E2E tests
+// The QA runner serves src/frontend itself and passes its URL in
+// PIT_E2E_BASE_URL (see qa/e2e_batch.py); otherwise a web server is started.
+const runnerBaseURL = process.env.PIT_E2E_BASE_URL;
+
 module.exports = {
   testDir: '.',
   timeout: 30000,
@@ -8,7 +12,7 @@ module.exports = {
   workers: 1,
   reporter: [['list'], ['json', { outputFile: 'qa/reports/e2e-results.json' }]],
   use: {
-    baseURL: 'http://localhost:8000',
+    baseURL: runnerBaseURL || 'http://localhost:8000',
     trace: 'on-first-retry',
     screenshot: 'only-on-failure',
   },
@@ -21,7 +25,7 @@ module.exports = {
       },
     },
   ],
-  webServer: {
+  webServer: runnerBaseURL ? undefined : {
     command: 'python3 -m http.server 8000 --directory src/frontend',
     port: 8000,
     timeout: 120000,
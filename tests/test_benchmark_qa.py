@@ -0,0 +1,40 @@
+"""Pytest checks for the QA runner benchmark suite (scripts/qa/benchmark-qa.py)."""
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+_spec = importlib.util.spec_from_file_location(
+    'benchmark_qa', os.path.join(ROOT, 'scripts', 'qa', 'benchmark-qa.py'))
+benchmark_qa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(benchmark_qa)
+
+import run_qa  # noqa: E402
+
+
+def test_synthetic_repo_checks_all_pass(tmp_path):
+    scale = dict(benchmark_qa.SCALES['tiny'], checks=60)
+    repo = benchmark_qa.generate_repo(str(tmp_path), scale)
+    runner = run_qa.QARunner(repo)
+    with contextlib.redirect_stdout(io.StringIO()):
+        status = runner.run_all_checks()
+
+    assert runner.results['summary'] == {'total': 60, 'passed': 60, 'failed': 0, 'skipped': 0}
+    assert status == 'GREEN'
+    for method, timing in benchmark_qa.bench_check_methods(repo, scale, repeats=2).items():
+        assert timing['passed'], method
+
+
+def test_compare_flags_latency_and_throughput_regressions():
+    baseline = {'checks.a.medianMs': 100.0, 'checks.b.medianMs': 0.5,
+                'runAllChecks.jobs=1.checksPerSec': 1000.0, 'checks.c.coldMs': 10.0}
+    current = {'checks.a.medianMs': 140.0, 'checks.b.medianMs': 1.5,
+               'runAllChecks.jobs=1.checksPerSec': 700.0, 'checks.c.coldMs': 11.0}
+
+    regressions = benchmark_qa.compare(baseline, current, threshold=0.25)
+    assert [r.split(':')[0] for r in regressions] == ['checks.a.medianMs', 'runAllChecks.jobs=1.checksPerSec']
@@ -0,0 +1,382 @@
+"""Pytest checks for the deployment verification script (scripts/qa/check-deployment.py)."""
+import gzip
+import hashlib
+import http.server
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+
+_spec = importlib.util.spec_from_file_location(
+    'check_deployment', os.path.join(ROOT, 'scripts', 'qa', 'check-deployment.py'))
+check_deployment = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(check_deployment)
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import site_build  # noqa: E402
+
+PAGE = b'<html><title>PIT - Project Implementation Tracker</title><div data-testid="TID-SHELL-ROOT"></div></html>'
+
+
+class Site:
+    """Local stand-in for the GitHub Pages site (HTTP/1.1, ETag, gzip)"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+        self.connections = set()
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                site.connections.add(self.client_address)
+                body = site.pages[self.path]
+                etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+                site.requests.append((self.path, self.headers.get('If-None-Match')))
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    self.send_response(200)
+                    self.send_header('Content-Encoding', 'gzip')
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    for start in range(0, len(body), 64 * 1024):
+                        self.wfile.write(body[start:start + 64 * 1024])
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    big = b'<html><title>PIT - Project Implementation Tracker</title><div data-testid="TID-SHELL-ROOT">' + \
+        os.urandom(1024 * 1024).hex().encode() + b'</div></html>'
+    server = Site({'/': PAGE, '/big': big, '/old': PAGE})
+    monkeypatch.setattr(check_deployment, '_http_client', check_deployment.HttpClient(cache_dir=str(tmp_path)))
+    check_deployment._pages.clear()
+    yield server
+    check_deployment.get_http_client().close()
+    server.close()
+
+
+# Recorded answer of the GitHub GraphQL API to GITHUB_STATUS_QUERY
+GITHUB_STATUS = {'data': {'repository': {
+    'environment': {'name': 'github-pages',
+                    'protectionRules': {'nodes': [{'type': 'BRANCH_POLICY'}]}},
+    'deployments': {'nodes': [{'databaseId': 101, 'state': 'ACTIVE', 'latestStatus': {'state': 'SUCCESS'}}]},
+    'defaultBranchRef': {'name': 'main', 'target': {'history': {'nodes': [
+        # head commit: only QA ran (the deploy workflow's paths did not match)
+        {'messageHeadline': 'Update QA docs', 'checkSuites': {'nodes': [
+            {'status': 'COMPLETED', 'conclusion': 'SUCCESS', 'workflowRun': {
+                'runNumber': 8, 'workflow': {'name': 'QA', 'resourcePath': '/o/r/actions/workflows/qa.yml'}}},
+        ]}},
+        {'messageHeadline': 'Update dashboard', 'checkSuites': {'nodes': [
+            {'status': 'COMPLETED', 'conclusion': 'FAILURE', 'workflowRun': {
+                'runNumber': 7, 'workflow': {'name': 'QA', 'resourcePath': '/o/r/actions/workflows/qa.yml'}}},
+            {'status': 'COMPLETED', 'conclusion': 'SUCCESS', 'workflowRun': {
+                'runNumber': 12, 'workflow': {'name': 'Deploy to GitHub Pages',
+                                              'resourcePath': '/o/r/actions/workflows/deploy-pages.yml'}}},
+            {'status': 'COMPLETED', 'conclusion': 'SUCCESS', 'workflowRun': None},
+        ]}},
+        {'messageHeadline': 'Broken build', 'checkSuites': {'nodes': [
+            {'status': 'COMPLETED', 'conclusion': 'FAILURE', 'workflowRun': {
+                'runNumber': 11, 'workflow': {'name': 'Deploy to GitHub Pages',
+                                              'resourcePath': '/o/r/actions/workflows/deploy-pages.yml'}}},
+        ]}},
+    ]}}},
+}}}
+
+
+class GitHubApi:
+    """Local stand-in for the GitHub GraphQL endpoint replaying a recorded answer"""
+
+    def __init__(self, answer):
+        self.body = json.dumps(answer).encode()
+        self.requests = []
+        api = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                api.requests.append((self.path, self.headers.get('Authorization'),
+                                     self.headers.get('If-None-Match'), request['variables']))
+                etag = '"%s"' % hashlib.sha256(api.body).hexdigest()[:16]
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    body = b''
+                else:
+                    self.send_response(200)
+                    body = api.body
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/graphql'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def github(tmp_path, monkeypatch):
+    api = GitHubApi(GITHUB_STATUS)
+    client = check_deployment.GitHubStatusClient(graphql_url=api.url, token='test-token',
+                                                 cache_dir=str(tmp_path / 'github'),
+                                                 http=check_deployment.HttpClient(cache_dir=None))
+    monkeypatch.setattr(check_deployment, '_github_client', client)
+    check_deployment._github_status.clear()
+    yield api
+    client.http.close()
+    api.close()
+
+def test_url_checks_share_one_fetch(site):
+    url = site.url + '/'
+    markers = ['TID-SHELL-ROOT', 'PIT - Project Implementation Tracker']
+    tasks = [
+        ('DEPLOY-009', 'accessible', lambda: check_deployment.check_url_accessibility(url)),
+        ('DEPLOY-010', 'content', lambda: check_deployment.check_url_content(url, markers)),
+        ('DEPLOY-009', 'accessible', lambda: check_deployment.check_url_accessibility(url)),
+    ]
+    results = check_deployment.run_checks_concurrently(tasks, timeout=10, severity='medium')
+
+    assert [r['status'] for r in results] == ['PASS', 'PASS', 'PASS']
+    # one shared full fetch, plus at most DEPLOY-010's own marker read
+    assert [path for path, _ in site.requests] in (['/'], ['/', '/'])
+
+
+def test_http_client_keeps_alive_and_revalidates(site):
+    client = check_deployment.get_http_client()
+    first = client.get(site.url + '/')
+    second = client.get(site.url + '/')
+
+    assert first.status == 200 and first.body == PAGE.decode()
+    assert first.headers['content-encoding'] == 'gzip'
+    assert second.status == 200 and second.from_cache and second.body == first.body
+    assert site.requests[1][1] == first.headers['etag']
+    assert client.connections_opened == 1 and len(site.connections) == 1
+
+
+def test_fetch_timeout_applies_to_its_own_request_only(site):
+    client = check_deployment.get_http_client()
+    default = client.timeout
+    assert check_deployment.fetch_url(site.url + '/', timeout=3)[0] == '200'
+    assert client.timeout == default
+
+    # the pooled connection is reused with the next request's timeout
+    (conn,) = [conn for idle in client._idle.values() for conn in idle]
+    assert conn.sock.gettimeout() == 3
+    assert client.get(site.url + '/', timeout=7).status == 200
+    assert client.connections_opened == 1 and conn.timeout == 7
+
+
+def test_http_client_stops_reading_once_markers_are_found(site):
+    client = check_deployment.HttpClient(cache_dir=None)
+    response = client.get(site.url + '/big', until=['TID-SHELL-ROOT', 'Implementation Tracker'])
+
+    assert response.status == 200 and not response.complete
+    assert 'TID-SHELL-ROOT' in response.body
+    assert len(response.body) < len(site.pages['/big']) // 2
+    # the half-read connection is discarded, so the next request still works
+    assert client.get(site.url + '/old').body == PAGE.decode()
+    client.close()
+
+
+def test_content_check_stops_early_while_the_full_page_is_cached(site):
+    site.pages['/page'] = site.pages['/big'][:len(site.pages['/big']) // 2] + b'</div></html>'
+    url = site.url + '/page'
+    # the site sends an ETag, yet DEPLOY-010 still reads only up to its markers
+    status, head = check_deployment.get_page_markers(url, ['TID-SHELL-ROOT'])
+    assert status == '200' and len(head) < len(site.pages['/page']) // 2
+    assert check_deployment.check_url_content(url, ['TID-SHELL-ROOT'])['status'] == 'PASS'
+    assert site.requests[0] == ('/page', None)
+    assert check_deployment.get_http_client()._cache_load(url) is None
+
+    # the shared full fetch is stored, and DEPLOY-010 reuses it once it exists
+    status, body = check_deployment.get_page(url)
+    assert status == '200' and len(body) == len(site.pages['/page'])
+    assert check_deployment.get_http_client()._cache_load(url)['etag']
+    assert check_deployment.check_url_content(url, ['TID-SHELL-ROOT'])['status'] == 'PASS'
+    assert len(site.requests) == 3
+
+    # next run: the full fetch is a conditional request answered from the cache
+    check_deployment._pages.clear()
+    assert check_deployment.get_page(url) == (status, body)
+    assert site.requests[3][1] is not None
+
+
+def test_deployed_assets_must_be_the_built_artifact(site, tmp_path):
+    source = tmp_path / 'frontend'
+    source.mkdir()
+    (source / 'index.html').write_text('<html><link rel="stylesheet" href="styles.css">'
+                                       '<script src="app.js"></script></html>', encoding='utf-8')
+    (source / 'styles.css').write_text('body { margin: 0; }\n', encoding='utf-8')
+    (source / 'app.js').write_text('var app = 1;\n', encoding='utf-8')
+    site.pages['/src/'] = (source / 'index.html').read_bytes()
+    manifest = site_build.build_site(str(source), str(tmp_path / 'site'))
+    site.pages['/site/'] = (tmp_path / 'site' / 'index.html').read_bytes()
+    for name in manifest['assets']:
+        site.pages['/site/' + name] = (tmp_path / 'site' / name).read_bytes()
+
+    url = site.url + '/site/'
+    result = check_deployment.check_deployed_assets(url)
+    assert result['id'] == 'DEPLOY-012' and result['status'] == 'PASS', result['message']
+    # DEPLOY-010 reuses the page DEPLOY-012 fetched
+    assert check_deployment.check_url_content(url, ['<html>'])['status'] == 'PASS'
+    assert [path for path, _ in site.requests].count('/site/') == 1
+
+    result = check_deployment.check_deployed_assets(site.url + '/src/')
+    assert result['status'] == 'FAIL' and 'styles.css, app.js' in result['message']
+
+    app = [name for name in manifest['assets'] if name.startswith('app.')][0]
+    site.pages['/site/' + app] = b'var app = 2;\n'
+    result = check_deployment.check_deployed_assets(site.url + '/site/')
+    assert result['status'] == 'FAIL' and f'{app}: content does not match its fingerprint' in result['message']
+
+
+def test_github_checks_share_one_graphql_request(github):
+    tasks = [
+        ('DEPLOY-007', 'environment', lambda: check_deployment.check_github_environment('o', 'r', 'github-pages')),
+        ('DEPLOY-008', 'workflow', lambda: check_deployment.check_workflow_run_status(
+            'o', 'r', 'deploy-pages.yml', workflow_name=check_deployment.DEPLOY_WORKFLOW_NAME)),
+        ('DEPLOY-011', 'deployment', lambda: check_deployment.check_github_deployment_status('o', 'r', 'github-pages')),
+    ]
+    results = check_deployment.run_checks_concurrently(tasks, timeout=10, severity='medium')
+
+    assert [r['status'] for r in results] == ['PASS', 'PASS', 'PASS']
+    assert 'main: Update dashboard' in results[1]['message']
+    assert len(github.requests) == 1
+    path, auth, _, variables = github.requests[0]
+    assert path == '/graphql' and auth == 'bearer test-token'
+    assert variables == {'owner': 'o', 'repo': 'r', 'environment': 'github-pages'}
+
+    # a passing head commit does not hide a failed Pages deploy
+    history = GITHUB_STATUS['data']['repository']['defaultBranchRef']['target']['history']['nodes']
+    github.body = json.dumps({'data': {'repository': dict(
+        GITHUB_STATUS['data']['repository'],
+        defaultBranchRef={'name': 'main', 'target': {'history': {'nodes': [history[0], history[2]]}}})}}).encode()
+    check_deployment._github_status.clear()
+    check_deployment.get_github_client().ttl = 0
+    result = check_deployment.check_workflow_run_status('o', 'r', 'deploy-pages.yml',
+                                                        workflow_name=check_deployment.DEPLOY_WORKFLOW_NAME)
+    assert result['status'] == 'FAIL' and result['message'] == 'Latest workflow run failure (main: Broken build)'
+
+
+def test_github_status_cache_ttl_and_stale_fallback(github, tmp_path):
+    client = check_deployment.get_github_client()
+    first, error = client.fetch('o', 'r', 'github-pages')
+    assert error == '' and first == GITHUB_STATUS['data']['repository']
+
+    # within the TTL a new client (a new run) answers from disk without a request
+    rerun = check_deployment.GitHubStatusClient(graphql_url=github.url, token='test-token',
+                                                cache_dir=client.cache_dir, http=client.http)
+    assert rerun.fetch('o', 'r', 'github-pages') == (first, '')
+    assert rerun.requests_sent == 0 and len(github.requests) == 1
+
+    # after the TTL GitHub is asked again (no If-None-Match: GraphQL does not honour it)
+    rerun.ttl = 0
+    assert rerun.fetch('o', 'r', 'github-pages') == (first, '')
+    assert rerun.requests_sent == 1 and github.requests[1][2] is None
+
+    # without a token a recent answer stands in, and the checks say how old it is
+    offline = check_deployment.GitHubStatusClient(graphql_url=github.url, token='', ttl=0,
+                                                  cache_dir=client.cache_dir, http=client.http)
+    data, note = offline.fetch('o', 'r', 'github-pages')
+    assert data == first and note.startswith('GitHub status from 0s ago: No GitHub token')
+    check_deployment._github_status[('o', 'r', 'github-pages')] = (data, note)
+    result = check_deployment.check_github_deployment_status('o', 'r', 'github-pages')
+    assert result['status'] == 'PASS' and result['message'].endswith(f'({note})')
+
+    # past max_stale the old answer is not used and the checks skip
+    offline.max_stale = 0
+    check_deployment._github_status[('o', 'r', 'github-pages')] = offline.fetch('o', 'r', 'github-pages')
+    result = check_deployment.check_github_deployment_status('o', 'r', 'github-pages')
+    assert result['status'] == 'SKIP' and 'the cached status is 0s old' in result['details']
+
+
+
+def test_github_checks_skip_without_token(tmp_path, monkeypatch):
+    client = check_deployment.GitHubStatusClient(graphql_url='http://127.0.0.1:9/graphql', token='',
+                                                 cache_dir=str(tmp_path))
+    monkeypatch.setattr(check_deployment, '_github_client', client)
+    check_deployment._github_status.clear()
+
+    result = check_deployment.check_github_deployment_status('o', 'r', 'github-pages')
+
+    assert result['status'] == 'SKIP' and 'GITHUB_TOKEN' in result['details']
+    assert client.requests_sent == 0
+
+def test_checks_run_concurrently_with_timeouts():
+    def slow(seconds, check_id):
+        def run():
+            time.sleep(seconds)
+            return {'id': check_id, 'name': check_id, 'status': 'PASS', 'severity': 'medium',
+                    'message': 'ok', 'details': ''}
+        return run
+
+    tasks = [(f'C-{i}', f'check {i}', slow(0.3, f'C-{i}')) for i in range(3)]
+    tasks.append(('C-hung', 'hung check', slow(2, 'C-hung')))
+    start = time.perf_counter()
+    results = check_deployment.run_checks_concurrently(tasks, timeout=1, severity='medium')
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2
+    assert [r['status'] for r in results] == ['PASS', 'PASS', 'PASS', 'FAIL']
+    assert results[3]['id'] == 'C-hung' and 'timed out' in results[3]['message']
+
+
+def test_hung_check_does_not_block_exit():
+    import subprocess
+    code = (
+        "import importlib.util, sys, time\n"
+        "spec = importlib.util.spec_from_file_location('cd', sys.argv[1])\n"
+        "cd = importlib.util.module_from_spec(spec); spec.loader.exec_module(cd)\n"
+        "results = cd.run_checks_concurrently([('C-hung', 'hung', lambda: time.sleep(60))], 0.2, 'medium')\n"
+        "print(results[0]['status'])\n"
+    )
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code, os.path.join(ROOT, 'scripts', 'qa', 'check-deployment.py')],
+                            capture_output=True, text=True, timeout=30)
+
+    assert result.stdout.strip() == 'FAIL', result.stderr
+    assert time.perf_counter() - start < 10
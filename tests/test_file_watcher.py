@@ -0,0 +1,52 @@
+"""Pytest checks for the watch-mode file watchers (qa/file_watcher.py)."""
+import os
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import file_watcher  # noqa: E402
+
+
+def test_path_matches_check_input_specs():
+    assert file_watcher.path_matches('src/frontend/index.html', 'src/frontend/index.html')
+    assert not file_watcher.path_matches('src/frontend/index.html', 'src/frontend/index.html.bak')
+    assert file_watcher.path_matches('src/**/*.js', 'src/frontend/timelines-unified.js')
+    assert file_watcher.path_matches('src/**/*.js', 'src/app.js')
+    assert not file_watcher.path_matches('src/frontend/*.css', 'src/frontend/themes/dark.css')
+    assert file_watcher.path_matches('docs/', 'docs/new.md')
+    assert not file_watcher.path_matches('docs/', 'docs/deep/new.md')
+
+
+def make_watcher(kind, root):
+    if kind == 'polling':
+        return file_watcher.PollingWatcher(str(root), {'out'}, interval=0.01)
+    try:
+        return file_watcher.InotifyWatcher(str(root), {'out'})
+    except file_watcher.WatcherUnavailable as e:
+        pytest.skip(f'inotify unavailable: {e}')
+
+
+@pytest.mark.parametrize('kind', ['inotify', 'polling'])
+def test_watcher_reports_changed_paths(tmp_path, kind):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'out').mkdir()
+    (tmp_path / 'node_modules').mkdir()
+    (tmp_path / 'src' / 'a.js').write_text('1', encoding='utf-8')
+    watcher = make_watcher(kind, tmp_path)
+    try:
+        assert watcher.changes(timeout=0.05) == set()
+
+        (tmp_path / 'src' / 'a.js').write_text('22', encoding='utf-8')
+        (tmp_path / 'out' / 'report.json').write_text('{}', encoding='utf-8')
+        (tmp_path / 'node_modules' / 'x.js').write_text('', encoding='utf-8')
+        assert watcher.changes(timeout=2) == {'src/a.js'}
+
+        (tmp_path / 'src' / 'lib').mkdir()
+        (tmp_path / 'src' / 'lib' / 'b.js').write_text('3', encoding='utf-8')
+        assert 'src/lib/b.js' in watcher.changes(timeout=2)
+    finally:
+        watcher.close()
@@ -0,0 +1,73 @@
+"""Pytest checks for the repository snapshot index (qa/fs_index.py)."""
+import glob
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import fs_index  # noqa: E402
+import secret_scanner  # noqa: E402
+
+
+def make_tree(root):
+    for rel in ('src/app.js', 'src/lib/util.js', 'src/lib/deep/x.js', 'src/.hidden/h.js', 'src/.env.js',
+                'src/style.css', 'docs/a.md', 'node_modules/pkg/index.js', 'projects/_clipboard/big.js',
+                'projects/kept/notes.md', '.git/HEAD'):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x', encoding='utf-8')
+    (root / 'empty').mkdir()
+    return root
+
+
+def test_lookups_and_globs_match_the_file_system(tmp_path):
+    root = make_tree(tmp_path)
+    index = fs_index.FsIndex(str(root))
+
+    assert index.kind('src/app.js') == 'file' and index.kind('src/lib') == 'dir'
+    assert index.kind('src/missing.js') is None and index.kind('../outside') is None
+    assert index.listdir('empty') == [] and index.listdir('src/app.js') is None
+    assert index.listdir('docs') == ['a.md']
+    # ignored directories are listed, and lookups inside them go to the file system
+    assert index.kind('node_modules') == 'dir' and index.kind('node_modules/pkg/index.js') == 'file'
+    assert index.listdir('projects/_clipboard') == ['big.js']
+    assert index.scans == len(['', 'src', 'src/lib', 'src/lib/deep', 'src/.hidden', 'docs',
+                               'projects', 'projects/kept', 'empty'])
+
+    for pattern in ('src/**/*.js', 'src/*', '**/*.md', 'src/**', 'src/.*', 'docs/a.md', 'no/**/*.js'):
+        expected = sorted(glob.glob(os.path.join(str(root), pattern), recursive=True))
+        expected = [path.rstrip(os.sep) for path in expected
+                    if 'node_modules' not in path and '_clipboard' not in path]
+        assert index.glob(pattern) == expected, pattern
+
+    walked = sorted(index.walk(str(root / 'src')))
+    assert walked == sorted((d, sorted(n), sorted(f)) for d, n, f in os.walk(str(root / 'src')))
+    assert secret_scanner.collect_files(str(root), str(root), walk=index.walk) == [
+        'docs/a.md', 'projects/kept/notes.md', 'src/app.js', 'src/style.css', 'src/lib/util.js',
+        'src/lib/deep/x.js']
+
+
+def test_invalidate_rereads_only_changed_directories(tmp_path):
+    root = make_tree(tmp_path)
+    index = fs_index.FsIndex(str(root), ignores=['.git', 'node_modules'])
+    assert index.kind('projects/_clipboard/big.js') == 'file'
+    scans = index.scans
+
+    (root / 'src' / 'new.js').write_text('x', encoding='utf-8')
+    (root / 'src' / 'lib' / 'deep' / 'x.js').unlink()
+    (root / 'src' / 'lib' / 'deep').rmdir()
+    (root / 'added' / 'sub').mkdir(parents=True)
+    (root / 'added' / 'sub' / 'y.js').write_text('x', encoding='utf-8')
+    assert index.kind('src/new.js') is None  # not invalidated yet
+
+    index.invalidate(['src/new.js', 'src/lib/deep/x.js', 'added/sub/y.js'])
+    assert index.kind('src/new.js') == 'file'
+    assert index.kind('src/lib/deep') is None and index.kind('src/lib/deep/x.js') is None
+    assert index.kind('added') == 'dir' and index.glob('added/**/*.js') == [str(root / 'added' / 'sub' / 'y.js')]
+    assert index.scans - scans <= 5
+
+    index.invalidate()
+    index.kind('src')
+    assert index.scans > scans + 5
@@ -0,0 +1,68 @@
+"""Pytest checks for the parse-once HTML index (qa/html_index.py)."""
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import html_index  # noqa: E402
+
+
+SAMPLE = """<!doctype html>
+<html><head><link rel="stylesheet" href="s.css"><style>.x { color: red; }</style></head>
+<body data-testid="TID-ROOT">
+  <nav><a href="#/projects" data-testid="TID-NAV" class="nav hidden">Implementation</a>
+  <img src="a.png" data-testid="TID-IMG"></nav>
+  <p id="intro" style="color: blue">Hello <b>world</b></p>
+  <table id="T"><thead><tr><th>Name</th><th>Start</th></tr></thead></table>
+  <script>const html = `<div data-testid="TID-RENDERED" style="x"></div>`;</script>
+</body></html>
+"""
+
+
+def write(tmp_path, content):
+    path = tmp_path / 'index.html'
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_index_lookups(tmp_path):
+    index = html_index.build_html_index(write(tmp_path, SAMPLE))
+
+    assert index.has_testid('TID-NAV')
+    assert index.has_testid('TID-RENDERED')  # script template
+    assert not index.has_testid('TID-MISSING')
+    assert index.get_testid('TID-NAV')['text'] == 'Implementation'
+    assert index.get_testid('TID-NAV')['classes'] == ['nav', 'hidden']
+    assert index.get_testid('TID-IMG')['parent']['tag'] == 'nav'
+    assert [e['tag'] for e in index.inline_styles] == ['p']
+    assert index.by_id['intro']['text'] == 'Hello world'
+    assert len(index.scripts) == 1
+    assert index.stylesheets() == ['s.css']
+
+
+def test_select(tmp_path):
+    index = html_index.build_html_index(write(tmp_path, SAMPLE))
+
+    assert [e['testid'] for e in index.select("a[href='#/projects']")] == ['TID-NAV']
+    assert [e['testid'] for e in index.select('.nav.hidden')] == ['TID-NAV']
+    assert index.select('#TID-ROOT')[0]['tag'] == 'body'
+    assert index.select('a[href="#/missing"]') == []
+    table = index.select('table#T')[0]
+    assert [th['text'] for th in index.descendants(table, 'th')] == ['Name', 'Start']
+
+
+def test_cache_invalidated_on_change(tmp_path):
+    path = write(tmp_path, SAMPLE)
+    first = html_index.load_html_index(path)
+    assert html_index.load_html_index(path) is first
+
+    # Same content with a new mtime is reused via the content hash
+    os.utime(path, ns=(1, 1))
+    assert html_index.load_html_index(path) is first
+
+    write(tmp_path, SAMPLE.replace('TID-NAV', 'TID-NAV-2'))
+    second = html_index.load_html_index(path)
+    assert second is not first
+    assert second.has_testid('TID-NAV-2')
@@ -0,0 +1,129 @@
+"""Pytest checks for the JavaScript symbol index (qa/js_symbols.py)."""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import js_symbols  # noqa: E402
+import run_qa  # noqa: E402
+
+APP_JS = """// function commentedOut() {}
+function appNavTo(el) { return false; }
+const render = (rows) => rows.map(r => `<button onclick="openRow('${r.id}')">x</button>`);
+var state = { rows: [] };
+window.saveTask = async function () {};
+window['projectState'] = state;
+(function () {
+  function hidden() {}
+  window.exposed = () => hidden();
+  const label = "function fake() {}";
+})();
+"""
+
+INDEX_HTML = """<!doctype html><html><body>
+<a href="#/" onclick="return appNavTo(this)">Home</a>
+<button onclick="event.stopPropagation(); window.missingHandler('x')">Go</button>
+<button onclick="alert('hi')">Hi</button>
+<script>
+  function openRow(id) {}
+  let counter = 0;
+</script>
+<script type="module">function moduleOnly() {}</script>
+</body></html>
+"""
+
+
+def make_page(root):
+    page = root / 'src' / 'frontend'
+    page.mkdir(parents=True)
+    (page / 'app.js').write_text(APP_JS, encoding='utf-8')
+    (page / 'index.html').write_text(INDEX_HTML, encoding='utf-8')
+    return page
+
+
+def test_symbols_and_undefined_handlers(tmp_path):
+    index = js_symbols.build_symbol_index(str(make_page(tmp_path)))
+
+    assert index.functions['appNavTo'] == [{'source': 'app.js', 'line': 2, 'global': True, 'window': True}]
+    assert index.functions['hidden'][0]['global'] is False
+    assert 'commentedOut' not in index.functions and 'fake' not in index.functions
+    assert 'moduleOnly' not in index.functions
+    assert index.functions['openRow'][0] == {'source': 'index.html', 'line': 6, 'global': True, 'window': True}
+    assert [index.window_kind(name) for name in ('appNavTo', 'render', 'saveTask', 'projectState',
+                                                 'exposed', 'state', 'counter', 'hidden', 'nothing')] == [
+        'function', None, 'function', 'value', 'function', 'object', None, None, None]
+    assert {h['source'] for h in index.handlers['openRow']} == {'app.js'}
+    assert [(h['name'], h['source'], h['line']) for h in index.undefined_handlers()] == [
+        ('missingHandler', 'index.html', 3)]
+
+
+def test_index_is_cached_by_content_hash(tmp_path, monkeypatch):
+    page = make_page(tmp_path)
+    cache_file = str(tmp_path / 'symbols.json')
+    js_symbols.build_symbol_index(str(page), cache_file)
+    assert len(json.load(open(cache_file, encoding='utf-8'))['sources']) == 2
+
+    scanned = []
+    original = js_symbols.scan_source
+    monkeypatch.setattr(js_symbols, 'scan_source', lambda code, *a: scanned.append(code) or original(code, *a))
+    (page / 'index.html').touch()
+    assert js_symbols.build_symbol_index(str(page), cache_file).window_kind('appNavTo') == 'function'
+    assert scanned == []
+
+    (page / 'app.js').write_text(APP_JS + 'function added() {}\n', encoding='utf-8')
+    js_symbols.clear_cache()
+    index = js_symbols.load_symbol_index(str(page), cache_file)
+    assert len(scanned) == 1 and index.window_kind('added') == 'function'
+    assert js_symbols.load_symbol_index(str(page), cache_file) is index
+
+
+
+def test_page_directories_share_the_cache_file(tmp_path, monkeypatch):
+    first = make_page(tmp_path / 'one')
+    second = tmp_path / 'two'
+    second.mkdir()
+    (second / 'other.js').write_text('function other() {}\n', encoding='utf-8')
+    cache_file = str(tmp_path / 'symbols.json')
+
+    def cached():
+        return list(json.load(open(cache_file, encoding='utf-8'))['sources'])
+
+    js_symbols.build_symbol_index(str(first), cache_file)
+    js_symbols.build_symbol_index(str(second), cache_file)
+    assert len(cached()) == 3
+    # indexing the first directory again does not evict the second one's entries
+    js_symbols.build_symbol_index(str(first), cache_file)
+    assert len(cached()) == 3
+
+    monkeypatch.setattr(js_symbols, 'MAX_CACHED_SOURCES', 3)
+    (second / 'other.js').write_text('function changed() {}\n', encoding='utf-8')
+    js_symbols.build_symbol_index(str(second), cache_file)
+    entries = cached()
+    assert len(entries) == 3 and entries[-1] == js_symbols._digest(b'function changed() {}\n')
+
+
+def test_runner_check_types_query_the_index(tmp_path, capsys):
+    make_page(tmp_path)
+    (tmp_path / 'qa').mkdir()
+    (tmp_path / 'qa' / 'requirements.json').write_text(json.dumps({'requirements': {'js': {
+        'description': 'js', 'checks': [
+            {'id': 'JS-1', 'name': 'Saves', 'type': 'javascript_check', 'target': 'window.saveTask',
+             'expectedType': 'function'},
+            {'id': 'JS-2', 'name': 'State', 'type': 'javascript_check', 'target': 'window.state',
+             'expectedType': 'function'},
+            {'id': 'JS-3', 'name': 'Hidden', 'type': 'javascript_check', 'target': 'window.hidden'},
+            {'id': 'JS-4', 'name': 'Window', 'type': 'window_function_check', 'target': 'src/frontend/',
+             'requiredFunctions': ['appNavTo', 'openRow', 'render', 'absent']},
+        ]}}}), encoding='utf-8')
+    runner = run_qa.QARunner(str(tmp_path))
+    runner.run_all_checks()
+
+    results = {r['id']: (r['passed'], r['message']) for r in runner.results['checks']['js']}
+    assert results['JS-1'] == (True, 'window.saveTask is set (function)')
+    assert results['JS-2'] == (False, 'window.state is set (object), expected function')
+    assert results['JS-3'] == (False, 'window.hidden is not set: hidden is declared in app.js:8 '
+                                      'but not in window scope')
+    assert results['JS-4'][1].splitlines()[1:] == [
+        'render is declared in app.js:3 but not in window scope', 'absent is never defined']
@@ -0,0 +1,863 @@
+"""Pytest checks for the QA runner engine (qa/run_qa.py).
+
+These tests build a small synthetic repository in a temporary directory so
+they never recurse into the real requirements (pytest/Playwright checks).
+"""
+import json
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import result_cache  # noqa: E402
+import run_qa  # noqa: E402
+
+
+def make_repo(tmp_path, checks_by_category):
+    """Create a fake repo with qa/requirements.json and a few input files"""
+    (tmp_path / 'qa').mkdir()
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'a.md').write_text('setup instructions', encoding='utf-8')
+    (tmp_path / 'README.md').write_text('Environment configuration', encoding='utf-8')
+    (tmp_path / 'data.json').write_text('{"ok": true}', encoding='utf-8')
+    requirements = {
+        'requirements': {
+            name: {'description': f'{name} checks', 'checks': checks}
+            for name, checks in checks_by_category.items()
+        }
+    }
+    (tmp_path / 'qa' / 'requirements.json').write_text(json.dumps(requirements), encoding='utf-8')
+    return tmp_path
+
+
+SAMPLE_CHECKS = {
+    'files': [
+        {'id': 'F-001', 'name': 'README exists', 'type': 'file_exists', 'target': 'README.md', 'severity': 'critical'},
+        {'id': 'F-002', 'name': 'Missing file', 'type': 'file_exists', 'target': 'nope.txt', 'severity': 'high'},
+        {'id': 'F-003', 'name': 'Docs present', 'type': 'directory_not_empty', 'target': 'docs', 'severity': 'medium'},
+    ],
+    'content': [
+        {'id': 'C-001', 'name': 'JSON valid', 'type': 'json_valid', 'target': 'data.json', 'severity': 'critical'},
+        {'id': 'C-002', 'name': 'Docs mention setup', 'type': 'documentation_check', 'target': 'README.md',
+         'searchPattern': 'environment|configuration', 'severity': 'medium'},
+        {'id': 'C-003', 'name': 'Unknown type', 'type': 'no_such_check', 'severity': 'low'},
+    ],
+}
+
+
+def without_metrics(results):
+    """Drop the per-check timing metrics, which differ between runs"""
+    return dict(results, checks={
+        name: [{k: v for k, v in r.items() if k != 'metrics'} for r in category]
+        for name, category in results['checks'].items()
+    })
+
+
+def run(repo, capsys, jobs):
+    runner = run_qa.QARunner(str(repo), jobs=jobs)
+    runner.results['timestamp'] = 'fixed'
+    status = runner.run_all_checks()
+    return status, without_metrics(runner.results), capsys.readouterr().out
+
+
+@pytest.mark.parametrize('jobs', [2, 8])
+def test_parallel_run_matches_sequential(tmp_path, capsys, jobs):
+    repo = make_repo(tmp_path, SAMPLE_CHECKS)
+    seq_status, seq_results, seq_out = run(repo, capsys, 1)
+    par_status, par_results, par_out = run(repo, capsys, jobs)
+
+    assert par_status == seq_status == 'AMBER'
+    assert par_results == seq_results
+    assert [r['id'] for r in par_results['checks']['files']] == ['F-001', 'F-002', 'F-003']
+    assert par_out == seq_out
+
+
+def test_serial_groups_do_not_overlap(tmp_path, monkeypatch):
+    checks = {'e2e': [
+        {'id': f'E-{i}', 'name': f'spec {i}', 'type': 'playwright_test', 'target': f's{i}.js'}
+        for i in range(4)
+    ]}
+    repo = make_repo(tmp_path, checks)
+    runner = run_qa.QARunner(str(repo), jobs=4)
+    active = []
+    overlaps = []
+
+    def fake_playwright(target):
+        active.append(target)
+        if len(active) > 1:
+            overlaps.append(list(active))
+        time.sleep(0.01)
+        active.remove(target)
+        return True, 'ok'
+
+    monkeypatch.setattr(runner, 'check_playwright_test', fake_playwright)
+    runner.run_all_checks()
+    assert not overlaps
+    assert runner.results['summary']['passed'] == 4
+
+
+def test_incremental_cache_reuses_and_invalidates(tmp_path, capsys, monkeypatch):
+    repo = make_repo(tmp_path, SAMPLE_CHECKS)
+    status, first, _ = run(repo, capsys, 1)
+
+    def incremental_run():
+        runner = run_qa.QARunner(str(repo), incremental=True)
+        runner.results['timestamp'] = 'fixed'
+        runner.run_all_checks()
+        capsys.readouterr()
+        return runner
+
+    cold = incremental_run()
+    assert cold.cache.hits == 0
+    assert without_metrics(cold.results) == first
+
+    calls = []
+    original = run_qa.QARunner.run_check
+    monkeypatch.setattr(run_qa.QARunner, 'run_check',
+                        lambda self, check: calls.append(check['id']) or original(self, check))
+    warm = incremental_run()
+    assert without_metrics(warm.results) == first
+    # every cacheable check was answered from the cache; unknown types never are
+    assert calls == ['C-003']
+    assert warm.cache.hits == 5 and warm.cache.misses == 0
+
+    calls.clear()
+    (repo / 'data.json').write_text('{broken', encoding='utf-8')
+    changed = incremental_run()
+    assert calls == ['C-001', 'C-003']
+    assert changed.results['checks']['content'][0]['passed'] is False
+
+    result_cache.ResultCache(str(repo)).clear()
+    assert not (repo / 'qa' / '.cache').exists()
+
+
+def test_pytest_run_key_covers_scripts_and_qa_data_but_not_reports(tmp_path):
+    repo = make_repo(tmp_path, SAMPLE_CHECKS)
+    (repo / 'scripts' / 'qa').mkdir(parents=True)
+    (repo / 'scripts' / 'qa' / 'check-deployment.py').write_text('OK = 1\n', encoding='utf-8')
+    check = {'id': 'UNIT-002', 'type': 'pytest_run', 'target': 'tests/'}
+
+    def key():
+        return result_cache.ResultCache(str(repo)).key_for(check)
+
+    first = key()
+    (repo / 'qa' / 'last-run-report.json').write_text('{}', encoding='utf-8')
+    assert key() == first
+    (repo / 'scripts' / 'qa' / 'check-deployment.py').write_text('OK = (\n', encoding='utf-8')
+    second = key()
+    assert second != first
+    (repo / 'qa' / 'perf-baseline.json').write_text('{}', encoding='utf-8')
+    assert key() != second
+
+
+def test_playwright_key_covers_e2e_helpers_and_install_and_skips_fallbacks(tmp_path):
+    repo = make_repo(tmp_path, SAMPLE_CHECKS)
+    (repo / 'tests' / 'e2e').mkdir(parents=True)
+    (repo / 'tests' / 'e2e' / 'app.spec.js').write_text("test('a', () => {});\n", encoding='utf-8')
+    check = {'id': 'E2E-001', 'type': 'playwright_test', 'target': 'tests/e2e/app.spec.js'}
+    cache = result_cache.ResultCache(str(repo))
+
+    def key():
+        return result_cache.ResultCache(str(repo)).key_for(check)
+
+    keys = [key()]
+    (repo / 'tests' / 'e2e' / 'helpers.js').write_text('module.exports = {};\n', encoding='utf-8')
+    keys.append(key())
+    (repo / 'package-lock.json').write_text('{}', encoding='utf-8')
+    keys.append(key())
+    (repo / 'node_modules' / '@playwright' / 'test').mkdir(parents=True)
+    (repo / 'node_modules' / '@playwright' / 'test' / 'package.json').write_text(
+        '{"version": "1.48.0"}', encoding='utf-8')
+    keys.append(key())
+    assert len(set(keys)) == 4
+
+    cache.put(keys[-1], True, 'Playwright not available (manual browser testing required)')
+    assert cache.get(keys[-1]) is None
+    cache.put(keys[-1], True, 'Playwright tests passed: tests/e2e/app.spec.js')
+    assert cache.get(keys[-1])[1] == 'Playwright tests passed: tests/e2e/app.spec.js'
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='Node.js not available')
+def test_js_syntax_batch_reports_per_file(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'good.js').write_text('function ok() { return 1; }\n', encoding='utf-8')
+    (src / 'bad.js').write_text('const a = 1;\nlet x = ;\n', encoding='utf-8')
+    (src / 'index.html').write_text('<html><body>\n<script>\nvar = 1;\n</script></body></html>', encoding='utf-8')
+    runner = run_qa.QARunner(str(tmp_path))
+
+    passed, message = runner.check_js_syntax('src/**/*.js', ['src/index.html'])
+
+    assert not passed
+    assert f"{src / 'bad.js'}:2: SyntaxError" in message
+    assert 'good.js' not in message
+    assert 'index.html#script-1:3: SyntaxError' in message
+
+    (src / 'bad.js').write_text('let x = 2;\n', encoding='utf-8')
+    (src / 'index.html').write_text('<html><script>var y = 1;</script></html>', encoding='utf-8')
+    assert runner.check_js_syntax('src/**/*.js', ['src/index.html']) == (
+        True, 'All JS files valid: 2 files checked (+1 inline scripts)')
+
+
+def test_pytest_run_reports_structured_results(tmp_path):
+    tests_dir = tmp_path / 'tests'
+    tests_dir.mkdir()
+    (tests_dir / 'test_inner_sample.py').write_text(
+        'import pytest\n'
+        'def test_ok():\n    pass\n'
+        'def test_broken():\n    assert 1 == 2, "values differ"\n'
+        'def test_skipped():\n    pytest.skip("not here")\n',
+        encoding='utf-8')
+    runner = run_qa.QARunner(str(tmp_path))
+
+    passed, message, details = runner.check_pytest_run('tests/')
+
+    assert not passed
+    assert message.startswith('pytest failed: 1 failed, 0 errors, 1 passed')
+    assert 'tests/test_inner_sample.py:5 tests/test_inner_sample.py::test_broken: AssertionError: values differ' in message
+    outcomes = {t['nodeid'].split('::')[1]: t['outcome'] for t in details['pytest']['tests']}
+    assert outcomes == {'test_ok': 'passed', 'test_broken': 'failed', 'test_skipped': 'skipped'}
+    assert all(t['duration'] >= 0 for t in details['pytest']['tests'])
+
+    # a hanging test is stopped by the check's timeout, also in a sequential run
+    import time
+    import check_metrics
+    (tests_dir / 'test_inner_sample.py').write_text('import time\ndef test_hangs():\n    time.sleep(60)\n',
+                                                    encoding='utf-8')
+    start = time.perf_counter()
+    with check_metrics.check_limits(timeout=2):
+        assert runner.check_pytest_run('tests/') == (False, 'pytest timeout for: tests/')
+    assert time.perf_counter() - start < 15
+
+
+def test_pytest_worker_reloads_edited_repository_modules(tmp_path):
+    (tmp_path / 'qa').mkdir()
+    (tmp_path / 'qa' / 'limits.py').write_text('LIMIT = 1\n', encoding='utf-8')
+    tests_dir = tmp_path / 'tests'
+    tests_dir.mkdir()
+    (tests_dir / 'test_inner_limits.py').write_text(
+        'import os, sys\n'
+        'sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "qa"))\n'
+        'import limits\n'
+        'def test_limit():\n    assert limits.LIMIT == 1\n',
+        encoding='utf-8')
+    runner = run_qa.QARunner(str(tmp_path))
+    assert runner.check_pytest_run('tests/')[0]
+
+    # the worker stays up between runs, but must not keep the edited module
+    (tmp_path / 'qa' / 'limits.py').write_text('LIMIT = 22\n', encoding='utf-8')
+    passed, message, _ = runner.check_pytest_run('tests/')
+    assert not passed and 'assert 22 == 1' in message
+
+
+def test_import_does_not_load_check_dependencies():
+    import subprocess
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); import run_qa; "
+            "print(','.join(m for m in ('yaml', 'subprocess', 'glob', 'concurrent.futures', 'argparse', "
+            "'html_index', 'js_syntax', 'js_symbols', 'perf_budget', 'site_build', 'secret_scanner', 'pytest_runner', "
+            "'result_cache') "
+            "if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code, os.path.join(ROOT, 'qa')],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+
+
+def test_runner_modules_do_not_import_run_qa():
+    # `python qa/run_qa.py` runs as __main__, so importing run_qa would load a second copy
+    import subprocess
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); "
+            "import check_executor, report_merge, watch_mode; print('run_qa' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code, os.path.join(ROOT, 'qa')],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_registered_check_types_are_loaded_on_first_use(tmp_path, capsys):
+    checks = {'custom': [
+        {'id': 'X-001', 'name': 'Timing budget', 'type': 'timing_check', 'target': 'README.md', 'maxMs': 5},
+        {'id': 'X-002', 'name': 'Inline handler', 'type': 'always_green', 'severity': 'low'},
+    ]}
+    repo = make_repo(tmp_path, checks)
+    requirements = json.loads((repo / 'qa' / 'requirements.json').read_text(encoding='utf-8'))
+    requirements['checkTypes'] = {'timing_check': 'qa_timing_plugin:check'}
+    (repo / 'qa' / 'requirements.json').write_text(json.dumps(requirements), encoding='utf-8')
+    (repo / 'qa' / 'qa_timing_plugin.py').write_text(
+        'def check(runner, check):\n'
+        '    return True, f"{check[\'target\']} within {check[\'maxMs\']}ms", {"maxMs": check["maxMs"]}\n',
+        encoding='utf-8')
+
+    runner = run_qa.QARunner(str(repo))
+    runner.register_check_type('always_green', lambda qa, check: (True, 'green'))
+    assert 'qa_timing_plugin' not in sys.modules
+    assert runner.run_all_checks() == 'GREEN'
+    results = runner.results['checks']['custom']
+    assert results[0]['message'] == 'README.md within 5ms'
+    assert results[0]['details'] == {'maxMs': 5}
+    assert results[1]['message'] == 'green'
+    assert runner.first_result_ms is not None
+    assert 'timing_check' not in run_qa.CHECK_TYPES
+    sys.modules.pop('qa_timing_plugin', None)
+
+
+def test_results_carry_metrics_and_profile_output(tmp_path, capsys):
+    repo = make_repo(tmp_path, SAMPLE_CHECKS)
+    (repo / 'big.json').write_text(json.dumps({'items': list(range(20000))}), encoding='utf-8')
+    checks = dict(SAMPLE_CHECKS, extra=[
+        {'id': 'E-001', 'name': 'Big JSON', 'type': 'json_valid', 'target': 'big.json'},
+        {'id': 'E-002', 'name': 'Child process', 'type': 'child'},
+    ])
+    (repo / 'qa' / 'requirements.json').write_text(json.dumps({'requirements': {
+        name: {'description': name, 'checks': c} for name, c in checks.items()}}), encoding='utf-8')
+
+    def child(runner, check):
+        from check_metrics import run_subprocess
+        result = run_subprocess([sys.executable, '-c', 'x = bytearray(32 * 1024 * 1024)'])
+        return result.returncode == 0, 'spawned'
+
+    runner = run_qa.QARunner(str(repo), profile_dir=str(tmp_path / 'prof'))
+    runner.register_check_type('child', child)
+    runner.run_all_checks()
+    out = capsys.readouterr().out
+
+    big, spawned = runner.results['checks']['extra']
+    assert big['metrics']['wallMs'] > 0 and big['metrics']['cpuMs'] >= 0
+    if big['metrics']['bytesRead'] is not None:
+        assert big['metrics']['bytesRead'] >= (repo / 'big.json').stat().st_size
+    proc = spawned['metrics']['subprocesses'][0]
+    assert proc['exitCode'] == 0 and proc['wallMs'] > 0
+    if hasattr(os, 'wait4'):
+        assert proc['maxRssKb'] >= 32 * 1024
+    assert 'Slowest checks' in out and 'Slowest categories' in out
+    assert (tmp_path / 'prof' / 'E-001.pstats').exists()
+
+
+def test_watch_reruns_only_affected_checks(tmp_path, capsys):
+    import threading
+
+    repo = make_repo(tmp_path, SAMPLE_CHECKS)
+    runner = run_qa.QARunner(str(repo))
+    ran = []
+    original = runner._run_check_measured
+    runner._run_check_measured = lambda check: ran.append(check['id']) or original(check)
+    ready = threading.Event()
+    thread = threading.Thread(target=runner.watch, kwargs={'iterations': 1, 'ready': ready})
+    thread.start()
+    assert ready.wait(5)
+    ran.clear()
+
+    (repo / 'data.json').write_text('{broken', encoding='utf-8')
+    thread.join(10)
+    assert not thread.is_alive()
+
+    assert ran == ["C-001"]
+    assert runner.results['checks']['content'][0]['passed'] is False
+    assert runner.results['summary']['failed'] == 3
+    out = capsys.readouterr().out
+    assert 'data.json: 1 check(s) re-run' in out
+    assert '0 fixed, 1 broken' in out
+    report = json.loads((repo / 'qa' / 'last-run-report.json').read_text(encoding='utf-8'))
+    assert report['summary']['failed'] == 3
+
+
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_stream_writes_each_result_before_the_run_ends(tmp_path, capsys, jobs):
+    import gzip
+
+    # low severity and last in the file, so it is also scheduled last
+    checks = dict(SAMPLE_CHECKS, late=[{'id': 'L-001', 'name': 'Reads the stream', 'type': 'peek', 'severity': 'low'}])
+    repo = make_repo(tmp_path, checks)
+    stream_file = tmp_path / 'run.ndjson'
+    seen = []
+
+    def peek(runner, check):
+        # the earlier categories' results are already on disk while this check runs
+        deadline = time.monotonic() + 5
+        while len(seen) < 7 and time.monotonic() < deadline:
+            seen[:] = stream_file.read_text(encoding='utf-8').splitlines()
+            if jobs == 1:
+                break
+            time.sleep(0.01)
+        return True, 'peeked'
+
+    runner = run_qa.QARunner(str(repo), jobs=jobs, stream_file=str(stream_file))
+    runner.register_check_type('peek', peek)
+    status = runner.run_all_checks()
+    runner.export_report(str(tmp_path / 'report.json'), quiet=True, compact=True)
+
+    assert json.loads(seen[0]) == {'type': 'start', 'timestamp': runner.results['timestamp'],
+                                   'strictMode': False, 'total': 7}
+    assert len(seen) == 7
+    records = [json.loads(line) for line in stream_file.read_text(encoding='utf-8').splitlines()]
+    checks_streamed = [r for r in records if r['type'] == 'check']
+    assert [r['seq'] for r in checks_streamed] == list(range(1, 8))
+    assert sorted(r['id'] for r in checks_streamed) == sorted(
+        c['id'] for category in checks.values() for c in category)
+    assert records[-1] == {'type': 'summary', 'status': status, 'summary': runner.results['summary']}
+
+    full = json.loads((tmp_path / 'report.json').read_text(encoding='utf-8'))
+    compact = (tmp_path / 'report.json.gz').read_bytes()
+    assert json.loads(gzip.decompress(compact)) == full
+    assert len(compact) < (tmp_path / 'report.json').stat().st_size
+
+
+def test_dashboard_payload_summary_and_shards(tmp_path, capsys):
+    import gzip
+
+    repo = make_repo(tmp_path, SAMPLE_CHECKS)
+    runner = run_qa.QARunner(str(repo))
+    runner.run_all_checks()
+    out_dir = tmp_path / 'dashboard'
+    out_dir.mkdir()
+    (out_dir / 'removed.json').write_text('{}', encoding='utf-8')
+    runner.export_dashboard(str(out_dir), quiet=True)
+
+    summary = json.loads((out_dir / 'summary.json').read_text(encoding='utf-8'))
+    assert summary['overallStatus'] == 'AMBER' and summary['summary']['failed'] == 2
+    assert summary['categories']['files'] == [2, 1, 0, 'files.json']
+    assert summary['severity']['high'] == {'passed': 0, 'failed': 1, 'skipped': 0}
+    assert summary['failing'] == ['F-002', 'C-003']
+    assert (out_dir / 'summary.json').stat().st_size < 500
+
+    shard = json.loads((out_dir / 'files.json').read_text(encoding='utf-8'))
+    assert [(c['id'], c['status']) for c in shard['checks']] == [('F-001', 'PASS'), ('F-002', 'FAIL'), ('F-003', 'PASS')]
+    assert json.loads(gzip.decompress((out_dir / 'files.json.gz').read_bytes())) == shard
+    assert not (out_dir / 'removed.json').exists()
+
+    # the summary lists the most severe failures only, however many checks fail
+    import dashboard_payload
+    failures = [{'id': f'L-{i}', 'name': 'low', 'severity': 'low', 'passed': False} for i in range(50)]
+    failures.append({'id': 'CRIT', 'name': 'critical', 'severity': 'critical', 'passed': False})
+    big, _ = dashboard_payload.build_payload({'checks': {'many': failures}, 'summary': {}})
+    assert len(big['failing']) == dashboard_payload.FAILING_LIMIT and big['failing'][:2] == ['CRIT', 'L-0']
+
+    # an unchanged payload is not rewritten
+    before = {p.name: p.stat().st_mtime_ns for p in out_dir.iterdir()}
+    time.sleep(0.01)
+    runner.export_dashboard(str(out_dir), quiet=True)
+    assert {p.name: p.stat().st_mtime_ns for p in out_dir.iterdir()} == before
+
+
+def test_scheduler_runs_critical_and_cheap_checks_first_with_fail_fast(tmp_path, capsys):
+    checks = {'main': [
+        {'id': 'M-001', 'name': 'Low', 'type': 'record', 'severity': 'low'},
+        {'id': 'M-002', 'name': 'Slow high', 'type': 'record', 'severity': 'high'},
+        {'id': 'M-003', 'name': 'Fast high', 'type': 'record', 'severity': 'high'},
+        {'id': 'M-004', 'name': 'Critical', 'type': 'record', 'severity': 'critical'},
+    ]}
+    repo = make_repo(tmp_path, checks)
+    ran = []
+
+    def record(runner, check):
+        ran.append(check['id'])
+        return check['id'] != 'M-004', 'recorded'
+
+    runner = run_qa.QARunner(str(repo))
+    runner.register_check_type('record', record)
+    runner._history_durations = lambda: {('main', 'M-002'): 500.0, ('main', 'M-003'): 1.0}
+    assert runner.run_all_checks() == 'RED'
+    assert ran == ['M-004', 'M-003', 'M-002', 'M-001']
+    assert [r['id'] for r in runner.results['checks']['main']] == ['M-001', 'M-002', 'M-003', 'M-004']
+
+    ran.clear()
+    runner = run_qa.QARunner(str(repo), fail_fast=True)
+    runner.register_check_type('record', record)
+    assert runner.run_all_checks() == 'RED'
+    assert ran == ['M-004']
+    skipped = [r for r in runner.results['checks']['main'] if r.get('skipped')]
+    assert [r['id'] for r in skipped] == ['M-001', 'M-002', 'M-003']
+    assert skipped[0]['message'] == 'Skipped: outcome already RED after M-004 failed (--fail-fast)'
+    assert runner.results['summary'] == {'total': 4, 'passed': 0, 'failed': 1, 'skipped': 3}
+
+
+def test_budget_skips_checks_that_do_not_fit(tmp_path, capsys):
+    checks = {'main': [
+        {'id': 'B-001', 'name': 'Expensive', 'type': 'heavy', 'severity': 'critical', 'seconds': 0},
+        {'id': 'B-002', 'name': 'Overruns', 'type': 'nap', 'severity': 'high', 'seconds': 0.3},
+        {'id': 'B-003', 'name': 'Too late', 'type': 'nap', 'severity': 'low', 'seconds': 0},
+    ]}
+    repo = make_repo(tmp_path, checks)
+
+    def nap(runner, check):
+        time.sleep(check['seconds'])
+        return True, 'rested'
+
+    runner = run_qa.QARunner(str(repo), budget=0.2)
+    runner.register_check_type('nap', nap)
+    runner.register_check_type('heavy', nap)
+    runner._history_durations = lambda: {('main', 'B-001'): 60000.0}
+    assert runner.run_all_checks() == 'GREEN'
+    messages = {r['id']: r['message'] for r in runner.results['checks']['main']}
+    assert messages == {'B-001': 'Skipped: does not fit the 0.2s budget (estimated 60.0s)',
+                        'B-002': 'rested',
+                        'B-003': 'Skipped: time budget of 0.2s exhausted'}
+    assert 'Skipped: 2' in capsys.readouterr().out
+
+
+def test_shards_are_balanced_by_duration_and_merge_into_one_report(tmp_path, capsys):
+    import check_scheduler
+
+    checks = dict(SAMPLE_CHECKS, browser=[
+        {'id': f'E2E-{n}', 'name': f'Spec {n}', 'type': 'spec', 'shardGroup': 'browser', 'severity': 'high'}
+        for n in range(1, 4)])
+    repo = make_repo(tmp_path, checks)
+    durations = {('browser', 'E2E-1'): 900.0, ('files', 'F-001'): 800.0, ('content', 'C-002'): 700.0}
+    entries = [(name, c) for name, category in checks.items() for c in category]
+    assignment, loads = check_scheduler.shard(entries, 2, durations, lambda c: c.get('shardGroup'))
+    assert len({assignment[i] for i, (name, _) in enumerate(entries) if name == 'browser'}) == 1
+    assert max(loads) - min(loads) < 900.0
+    # the checks of one Playwright run are costed once, not once per check
+    batch = [i for i, (name, _) in enumerate(entries) if name == 'browser']
+    _, batched_loads = check_scheduler.shard(entries, 2, durations, lambda c: None, [batch])
+    assert sum(batched_loads) == sum(loads) - 2 * 900.0
+    _, over_budget, _ = check_scheduler.plan(entries, durations, budget_s=0.85, batches=[batch])
+    assert set(batch) <= over_budget
+
+    full = run_qa.QARunner(str(repo))
+    full.register_check_type('spec', lambda runner, check: (True, 'spec passed'))
+    full.run_all_checks()
+
+    reports = []
+    for index in (1, 2, 3):
+        runner = run_qa.QARunner(str(repo), shard=(index, 3))
+        runner.register_check_type('spec', lambda runner, check: (True, 'spec passed'))
+        runner._history_durations = lambda: durations
+        runner.run_all_checks()
+        path = tmp_path / f'shard-{index}.json'
+        runner.export_report(str(path), quiet=True)
+        reports.append(path)
+        assert json.loads(path.read_text(encoding='utf-8'))['shard']['count'] == 3
+    assert 'Shard: 3/3' in capsys.readouterr().out
+
+    merged_file = tmp_path / 'merged.json'
+    status = run_qa.merge(str(repo), [str(tmp_path / 'shard-*.json'), '-o', str(merged_file), '--no-history'])
+    merged = json.loads(merged_file.read_text(encoding='utf-8'))
+    assert status == full.get_overall_status() == 'AMBER'
+    assert len(merged['shards']) == 3 and sum(s['checks'] for s in merged['shards']) == 9
+    assert without_metrics(dict(merged, shards=None, timestamp=None)) == \
+        without_metrics(dict(full.results, shards=None, timestamp=None))
+
+    # a lost shard cannot make the run pass
+    assert run_qa.merge(str(repo), [str(reports[0]), '-o', str(merged_file), '--no-history']) != 'GREEN'
+    merged = json.loads(merged_file.read_text(encoding='utf-8'))
+    assert merged['summary']['total'] == 9
+    assert 'Not reported by any shard' in [r['message'] for c in merged['checks'].values() for r in c]
+
+
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_compiled_plan_dedupes_and_batches_checks(tmp_path, capsys, monkeypatch, jobs):
+    import check_plan
+
+    element = {'type': 'element_exists', 'severity': 'high'}
+    checks = {
+        'ui': [dict(element, id=f'UI-{n}', name=f'Element {n}', target=f'TID-{n}') for n in range(1, 5)]
+        + [dict(element, id='UI-SEL', name='Selector', target='#app')],
+        'files': [
+            {'id': 'F-001', 'name': 'README exists', 'type': 'file_exists', 'target': 'README.md'},
+            {'id': 'F-002', 'name': 'README again', 'type': 'file_exists', 'target': 'README.md', 'severity': 'low',
+             'note': 'same check, different label'},
+            dict(element, id='UI-3-AGAIN', name='Element 3 again', target='TID-3'),
+        ],
+    }
+    repo = make_repo(tmp_path, checks)
+    (repo / 'src' / 'frontend').mkdir(parents=True)
+    (repo / 'src' / 'frontend' / 'index.html').write_text(
+        '<div id="app"><p data-testid="TID-1"></p><p data-testid="TID-3"></p></div>', encoding='utf-8')
+
+    plan, cached = check_plan.load_plan(str(repo / 'qa' / 'requirements.json'),
+                                        str(repo / check_plan.DEFAULT_PLAN_FILE))
+    assert not cached
+    assert plan['duplicates'] == {'6': 5, '7': 2}
+    assert plan['batches'] == [{'kind': 'element', 'checks': [0, 1, 2, 3]}]
+    assert plan['inputs'] == {'src/frontend/index.html': [0, 1, 2, 3, 4]}
+
+    batches = []
+    file_checks = []
+    runner = run_qa.QARunner(str(repo), jobs=jobs)
+    original_batch, original_file = runner.check_element_batch, runner.check_file_exists
+    monkeypatch.setattr(runner, 'check_element_batch', lambda ids: batches.append(ids) or original_batch(ids))
+    monkeypatch.setattr(runner, 'check_file_exists', lambda t: file_checks.append(t) or original_file(t))
+    runner.run_all_checks()
+
+    assert batches == [['TID-1', 'TID-2', 'TID-3', 'TID-4']] and file_checks == ['README.md']
+    results = {r['id']: r for category in runner.results['checks'].values() for r in category}
+    assert [results[f'UI-{n}']['passed'] for n in range(1, 5)] == [True, False, True, False]
+    assert results['UI-2']['message'] == "Element with test ID 'TID-2' not found"
+    assert results['UI-3-AGAIN']['message'] == results['UI-3']['message']
+    assert results['F-002']['passed'] and results['F-002']['severity'] == 'low'
+    assert runner.results['summary'] == {'total': 8, 'passed': 6, 'failed': 2, 'skipped': 0}
+
+    explained = run_qa.QARunner(str(repo)).explain_plan()
+    assert explained.startswith('Execution plan for 8 checks (cached): 3 units of work')
+    assert 'F-002 (files) = F-001 (files)' in explained
+
+
+def test_e2e_checks_share_one_playwright_run(tmp_path, monkeypatch):
+    import subprocess
+    import urllib.request
+    import check_metrics
+    import e2e_batch
+
+    checks = {'e2e': [
+        {'id': 'E2E-A', 'name': 'Spec A', 'type': 'playwright_test', 'target': 'tests/e2e/a.spec.js'},
+        {'id': 'E2E-B', 'name': 'Spec B', 'type': 'playwright_test', 'target': 'tests/e2e/b.spec.js'},
+        {'id': 'E2E-C', 'name': 'Missing', 'type': 'playwright_test', 'target': 'tests/e2e/missing.spec.js'},
+        {'id': 'WIRE-1', 'name': 'Wired', 'type': 'wiring_runtime',
+         'e2e': [{'spec': 'tests/e2e/b.spec.js', 'test': 'works'}]},
+        {'id': 'ROUTE-1', 'name': 'Routes', 'type': 'route_smoke'},
+        {'id': 'WIRE-2', 'name': 'Renamed', 'type': 'wiring_runtime',
+         'e2e': [{'spec': 'tests/e2e/b.spec.js', 'test': 'old title'}]},
+    ]}
+    repo = make_repo(tmp_path, checks)
+    (repo / 'tests' / 'e2e').mkdir(parents=True)
+    for spec in ('a', 'b'):
+        (repo / 'tests' / 'e2e' / f'{spec}.spec.js').write_text('// spec', encoding='utf-8')
+    (repo / 'src' / 'frontend').mkdir(parents=True)
+    (repo / 'src' / 'frontend' / 'index.html').write_text('<main>app</main>', encoding='utf-8')
+
+    def test(title, status, error=None):
+        results = [{'status': 'passed' if status != 'unexpected' else 'failed', 'duration': 10,
+                    **({'error': {'message': error}} if error else {})}]
+        return {'title': title, 'file': 'b.spec.js', 'tests': [
+            {'projectName': 'chromium', 'status': status, 'results': results}]}
+
+    calls = []
+
+    def fake_run(args, cwd=None, env=None, timeout=None, **kwargs):
+        # the batch is bounded by one spec's timeout, not the sum over its specs
+        assert timeout == e2e_batch.SPEC_TIMEOUT + e2e_batch.STARTUP_TIMEOUT
+        assert args[-1] == f'--global-timeout={e2e_batch.SPEC_TIMEOUT * 1000}'
+        with urllib.request.urlopen(env['PIT_E2E_BASE_URL'] + '/index.html') as response:
+            calls.append((args, response.read()))
+        # the app is served from the site build, not from src/frontend
+        with urllib.request.urlopen(env['PIT_E2E_BASE_URL'] + '/build-manifest.json') as response:
+            assert json.load(response)['page'] == 'index.html'
+        report = {'config': {'rootDir': str(repo / 'tests' / 'e2e')}, 'errors': [], 'suites': [
+            {'title': 'a.spec.js', 'file': 'a.spec.js', 'specs': [dict(test('loads', 'expected'), file='a.spec.js')]},
+            {'title': 'b.spec.js', 'file': 'b.spec.js', 'specs': [], 'suites': [
+                {'title': 'B', 'file': 'b.spec.js', 'specs': [
+                    test('works', 'unexpected', '\x1b[31mError: boom\x1b[39m\n    at b.spec.js:3'),
+                    test('other', 'flaky')]}]}]}
+        with open(env['PLAYWRIGHT_JSON_OUTPUT_NAME'], 'w', encoding='utf-8') as f:
+            json.dump(report, f)
+        return subprocess.CompletedProcess(args, 1, '', '')
+
+    monkeypatch.setattr(check_metrics, 'run_subprocess', fake_run)
+    runner = run_qa.QARunner(str(repo), jobs=2)
+    runner.run_all_checks()
+
+    assert len(calls) == 1 and calls[0][1] == b'<main>app</main>'
+    assert calls[0][0][3:5] == ['tests/e2e/a.spec.js', 'tests/e2e/b.spec.js'] and '--reporter=json' in calls[0][0]
+    results = {r['id']: r for r in runner.results['checks']['e2e']}
+    assert results['E2E-A']['passed'] and results['E2E-A']['message'].endswith('(1 tests)')
+    # the one Playwright run is charged to the first check of the batch only
+    assert results['E2E-A']['metrics']['wallMs'] > 0 and results['WIRE-1']['metrics']['wallMs'] == 0
+    assert not results['E2E-B']['passed']
+    assert results['E2E-B']['message'].splitlines()[1] == '  B › works: Error: boom'
+    assert [t['status'] for t in results['E2E-B']['details']['playwright']['tests']] == ['unexpected', 'flaky']
+    assert not results['WIRE-1']['passed'] and len(results['WIRE-1']['details']['playwright']['tests']) == 1
+    assert results['E2E-C']['passed'] and 'not found' in results['E2E-C']['message']
+    assert results['ROUTE-1']['message'] == "Check type 'route_smoke' covered by E2E tests"
+    assert not results['WIRE-2']['passed']
+    assert results['WIRE-2']['message'] == "no test titled 'old title' in tests/e2e/b.spec.js"
+
+    # a run that fails without writing a report (here npm) fails every check
+    def broken_npx(args, **kwargs):
+        return subprocess.CompletedProcess(args, 1, '', 'npm ERR! code E404\nnpm ERR! 404 Not Found')
+
+    monkeypatch.setattr(check_metrics, 'run_subprocess', broken_npx)
+    runner = run_qa.QARunner(str(repo), jobs=2)
+    runner.run_all_checks()
+    results = {r['id']: r for r in runner.results['checks']['e2e']}
+    assert [r['passed'] for r in results.values()] == [False, False, True, False, True, False]
+    assert results['WIRE-1']['message'] == ('Playwright run did not complete (exit code 1):\n'
+                                            'npm ERR! code E404\nnpm ERR! 404 Not Found')
+
+    # only a missing Playwright package counts as "not available"
+    def no_playwright(args, **kwargs):
+        return subprocess.CompletedProcess(args, 1, '', 'npm error could not determine executable to run\n')
+
+    monkeypatch.setattr(check_metrics, 'run_subprocess', no_playwright)
+    runner = run_qa.QARunner(str(repo), jobs=2)
+    runner.run_all_checks()
+    results = {r['id']: r for r in runner.results['checks']['e2e']}
+    assert all(r['passed'] for r in results.values())
+    assert results['WIRE-1']['message'] == ('Playwright not available (manual browser testing required): '
+                                            'could not determine executable to run')
+
+
+
+def test_incomplete_playwright_run_is_never_cached(tmp_path, capsys, monkeypatch):
+    import e2e_batch
+
+    checks = {'e2e': [
+        {'id': 'E2E-A', 'name': 'Spec A', 'type': 'playwright_test', 'target': 'tests/e2e/a.spec.js'},
+        {'id': 'WIRE-1', 'name': 'Wired', 'type': 'wiring_runtime',
+         'e2e': [{'spec': 'tests/e2e/a.spec.js', 'test': 'works'}]},
+    ]}
+    repo = make_repo(tmp_path, checks)
+    (repo / 'tests' / 'e2e').mkdir(parents=True)
+    (repo / 'tests' / 'e2e' / 'a.spec.js').write_text('// spec', encoding='utf-8')
+    monkeypatch.setattr(e2e_batch, 'run_playwright', lambda *args: (1, None, 'npm error network'))
+
+    for _ in range(2):
+        runner = run_qa.QARunner(str(repo), incremental=True)
+        runner.run_all_checks()
+        results = runner.results['checks']['e2e']
+        assert [r['passed'] for r in results] == [False, False]
+        assert results[0]['message'] == 'Playwright run did not complete (exit code 1):\nnpm error network'
+        assert runner.cache.hits == 0
+    capsys.readouterr()
+    with open(repo / 'qa' / '.cache' / 'results.json', encoding='utf-8') as f:
+        assert json.load(f)['results'] == {}
+
+def test_subprocess_output_is_capped_and_resource_classes_are_limited(monkeypatch):
+    import threading
+    import check_metrics
+
+    script = "import sys; sys.stdout.write('x' * 1000000 + 'caf\\u00e9' * 300 + 'END'); sys.stderr.write('warn')"
+    result = check_metrics.run_subprocess([sys.executable, '-c', script], output_limit=1025)
+    assert result.returncode == 0 and result.stdout.endswith('café' * 200 + 'END')
+    assert '�' not in result.stdout and 1020 <= len(result.stdout.encode('utf-8')) <= 1025
+    assert result.stderr == 'warn'
+
+    monkeypatch.setattr(check_metrics, 'RESOURCE_LIMITS', dict(check_metrics.RESOURCE_LIMITS))
+    monkeypatch.setattr(check_metrics, '_slots', {})
+    check_metrics.configure_limits({'browser': 1})
+    spans = []
+    script = 'import time; s = time.time(); time.sleep(0.2); print(s, time.time())'
+
+    def run():
+        output = check_metrics.run_subprocess([sys.executable, '-c', script], resource='browser').stdout
+        spans.append(tuple(map(float, output.split())))
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    spans.sort()
+    assert len(spans) == 3 and all(spans[i][1] <= spans[i + 1][0] for i in range(2))
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='RLIMIT_DATA is enforced on Linux')
+def test_memory_limit_stops_a_child_allocating_past_it():
+    import check_metrics
+
+    allocate = 'x = bytearray(400 * 1024 * 1024); print(len(x))'
+    with check_metrics.CheckMetrics() as metrics:
+        with check_metrics.check_limits(memory_mb=200):
+            capped = check_metrics.run_subprocess([sys.executable, '-c', allocate])
+        uncapped = check_metrics.run_subprocess([sys.executable, '-c', allocate])
+    assert capped.returncode != 0 and 'MemoryError' in capped.stderr
+    assert uncapped.returncode == 0 and uncapped.stdout.strip() == str(400 * 1024 * 1024)
+    # exit codes and resource usage still come from the reaped children
+    assert [proc['exitCode'] for proc in metrics.subprocesses] == [capped.returncode, 0]
+    assert metrics.subprocesses[1]['maxRssKb'] >= 400 * 1024
+
+    # the cap is in place before the child's first instruction, not set after Popen returns
+    with check_metrics.check_limits(memory_mb=300):
+        result = check_metrics.run_subprocess(
+            [sys.executable, '-c', 'import resource; print(resource.getrlimit(resource.RLIMIT_DATA)[0])'])
+    assert int(result.stdout) == 300 * 1024 * 1024
+    with check_metrics.check_limits(memory_mb=300), pytest.raises(FileNotFoundError):
+        check_metrics.run_subprocess(['no-such-qa-tool', '--version'])
+
+
+def test_check_timeout_kills_the_whole_process_tree(tmp_path, capsys):
+    repo = make_repo(tmp_path, SAMPLE_CHECKS)
+    checks = dict(SAMPLE_CHECKS, extra=[{'id': 'T-001', 'name': 'Hangs', 'type': 'tree', 'timeout': 1}])
+    (repo / 'qa' / 'requirements.json').write_text(json.dumps({'requirements': {
+        name: {'description': name, 'checks': c} for name, c in checks.items()}}), encoding='utf-8')
+    # the grandchild inherits the output pipes and would keep them open for a minute
+    script = ("import subprocess, sys, time; "
+              "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+              "print(p.pid, flush=True); time.sleep(60)")
+
+    def tree(runner, check):
+        import subprocess
+        from check_metrics import run_subprocess
+        try:
+            run_subprocess([sys.executable, '-c', script], timeout=120)
+        except subprocess.TimeoutExpired as e:
+            return False, f'timeout {e.timeout} {e.output.strip()}'
+        return True, 'finished'
+
+    runner = run_qa.QARunner(str(repo))
+    runner.register_check_type('tree', tree)
+    started = time.perf_counter()
+    runner.run_all_checks()
+    assert time.perf_counter() - started < 20
+
+    result = runner.results['checks']['extra'][0]
+    assert not result['passed'] and result['message'].startswith('timeout 1 ')
+    assert result['metrics']['subprocesses'][0]['timedOut'] is True
+    grandchild = int(result['message'].split()[-1])
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        try:
+            with open(f'/proc/{grandchild}/stat') as f:
+                if f.read().split(')')[-1].split()[0] == 'Z':
+                    break
+        except OSError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail('grandchild still running')
+
+
+def test_perf_budget_measures_first_load_payload_against_budgets_and_baseline(tmp_path, capsys):
+    import perf_budget
+    page = {'id': 'P-001', 'name': 'Payload', 'type': 'perf_budget', 'target': 'site/index.html',
+            'budgets': {'app.js': {'raw': 4000}, 'total': {'gzip': 2000, 'brotli': 2000}}, 'maxGrowth': 0.1,
+            'severity': 'high'}
+    repo = make_repo(tmp_path, {'perf': [page]})
+    site = repo / 'site'
+    site.mkdir()
+    (site / 'index.html').write_text(
+        '<html><head><link rel="stylesheet" href="./style.css"><script src="app.js"></script>'
+        '<script src="https://cdn.example.com/lib.js"></script></head><body></body></html>', encoding='utf-8')
+    (site / 'app.js').write_text('function f() { return 1; }\n' * 100, encoding='utf-8')
+    (site / 'style.css').write_text('body { margin: 0; }\n', encoding='utf-8')
+    assert perf_budget.main(['--repo-root', str(repo), '--update-baseline']) == 0
+    assert 'Baseline updated' in capsys.readouterr().out
+    runner = run_qa.QARunner(str(repo))
+
+    passed, message, details = runner.check_perf_budget(page['target'], page['budgets'], 0.1)
+    assert passed, message
+    sizes = details['perfBudget']
+    assert list(sizes['files']) == ['index.html', 'app.js', 'style.css']
+    assert sizes['files']['app.js']['raw'] == 2700 and sizes['files']['app.js']['gzip'] < 100
+    assert sizes['total']['raw'] == sum(f['raw'] for f in sizes['files'].values())
+    assert sizes['baseline'] == sizes['total']
+    if sizes['total']['brotli'] is None:
+        assert 'not measured (brotli not installed): total brotli' in message
+
+    # incompressible growth: over the raw budget and more than 10% above the baseline
+    (site / 'app.js').write_text(os.urandom(2550).hex(), encoding='utf-8')
+    passed, message, _ = runner.check_perf_budget(page['target'], page['budgets'], 0.1)
+    assert not passed
+    assert 'app.js raw: 5100 bytes (budget 4000, +1100)' in message
+    assert 'app.js gzip: ' in message and '(growth above 10%)' in message
+
+    (site / 'style.css').unlink()
+    passed, message, _ = runner.check_perf_budget(page['target'])
+    assert not passed and message == 'First-load files not found: style.css'
+
+
+def test_committed_frontend_is_within_its_perf_budgets():
+    """A change to the first-load files must re-record qa/perf-baseline.json"""
+    with open(os.path.join(ROOT, 'qa', 'requirements.json'), encoding='utf-8') as f:
+        requirements = json.load(f)
+    checks = [check for data in requirements['requirements'].values() for check in data.get('checks', [])
+              if check['type'] == 'perf_budget']
+    assert checks
+    runner = run_qa.QARunner(ROOT)
+    for check in checks:
+        passed, message, _ = runner.run_check(check)
+        assert passed, f"{check['id']}: {message}"
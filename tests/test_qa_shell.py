@@ -3,22 +3,34 @@
 These tests validate the static evidence expected by the architecture:
 - presence of key data-testid attributes in src/frontend/index.html
 - no inline style attributes in the HTML
-- presence of expected global function names used by onclick wiring
+- presence of expected global function names used by onclick wiring, and
+  no inline event handler calling an undefined function
 - presence of favicon link
 
 This avoids PowerShell and uses pytest so it runs cross-platform.
+The HTML is parsed once into the shared index from qa/html_index.py, and the
+scripts into the symbol index from qa/js_symbols.py, the same ones the QA
+runner uses, so tests do lookups instead of rescanning the files.
 """
-import re
 import os
+import sys
 
 
 ROOT = os.path.dirname(os.path.dirname(__file__))
 INDEX = os.path.join(ROOT, 'src', 'frontend', 'index.html')
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
 
+from html_index import load_html_index  # noqa: E402
+from js_symbols import load_symbol_index  # noqa: E402
 
-def load_index():
-    with open(INDEX, 'r', encoding='utf-8') as f:
-        return f.read()
+
+def html_index():
+    return load_html_index(INDEX)
+
+
+def js_symbol_index():
+    # in-memory only: the tests must not write cache state into the working tree
+    return load_symbol_index(os.path.dirname(INDEX))
 
 
 REQUIRED_TIDS = [
@@ -43,44 +55,31 @@ def test_index_exists():
 
 
 def test_required_tids_present():
-    html = load_index()
-    missing = [tid for tid in REQUIRED_TIDS if tid not in html]
+    index = html_index()
+    missing = [tid for tid in REQUIRED_TIDS if not index.has_testid(tid)]
     assert not missing, f"Missing required data-testid values in index.html: {missing}"
 
 
 def test_no_inline_style_attributes():
-    html = load_index()
-    # detect style=" or style=' attribute usage in HTML
-    if re.search(r"style\s*=\s*\"", html) or re.search(r"style\s*=\s*\'", html):
-        # allow style occurrences inside <script> blocks (JS strings) but fail if attribute-like pattern outside scripts
-        # crude approach: remove script blocks then search again
-        stripped = re.sub(r"<script[\s\S]*?</script>", '', html, flags=re.IGNORECASE)
-        assert not re.search(r"style\s*=\s*\"|style\s*=\s*\'", stripped), "Found inline style attributes in index.html"
+    # style occurrences inside <script> blocks (JS strings) are not elements, so
+    # the index only flags real style attributes in the markup
+    offenders = [f"<{e['tag']}> line {e['line']}" for e in html_index().inline_styles]
+    assert not offenders, f"Found inline style attributes in index.html: {offenders}"
 
 
 def test_required_function_names_exist():
-    html = load_index()
-    # Also scan referenced JS files in same folder (app-main.js). If missing, rely on inline script presence.
-    js_files = []
-    js_files.append(os.path.join(ROOT, 'src', 'frontend', 'app-main.js'))
-    contents = html
-    for jf in js_files:
-        if os.path.exists(jf):
-            with open(jf, 'r', encoding='utf-8') as f:
-                contents += '\n' + f.read()
-
-    missing = []
-    for name in REQUIRED_FUNCTIONS:
-        pattern = re.compile(r"\bfunction\s+" + re.escape(name) + r"\b")
-        pattern2 = re.compile(r"window\." + re.escape(name) + r"\b")
-        pattern3 = re.compile(re.escape(name) + r"\s*=\s*function\b")
-        pattern4 = re.compile(re.escape(name) + r"\s*\(")
-        if not (pattern.search(contents) or pattern2.search(contents) or pattern3.search(contents) or pattern4.search(contents)):
-            missing.append(name)
-
+    # looked up in the cached symbol index of the page's scripts (qa/js_symbols.py)
+    symbols = js_symbol_index()
+    missing = [name for name in REQUIRED_FUNCTIONS if not symbols.defines(name)]
     assert not missing, f"Required function names not found (static scan): {missing}"
 
 
+def test_inline_handlers_call_defined_functions():
+    undefined = [f"{h['name']} ({h['source']}:{h['line']} {h['attribute']})"
+                 for h in js_symbol_index().undefined_handlers()]
+    assert not undefined, f"Inline event handlers call functions that are never defined: {undefined}"
+
+
 def test_favicon_present():
-    html = load_index()
-    assert '<link rel="icon"' in html or "rel='icon'" in html, "No favicon link found in index.html"
+    links = html_index().by_tag.get('link', [])
+    assert any('icon' in link['attrs'].get('rel', '').split() for link in links), "No favicon link found in index.html"
@@ -0,0 +1,88 @@
+"""Pytest checks for the SQLite QA run history (qa/run_history.py)."""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import run_history  # noqa: E402
+import run_qa  # noqa: E402
+
+
+def make_results(run, outcomes):
+    """QARunner.results for one run; outcomes maps check id -> (passed, wall ms)"""
+    checks = [{'id': check_id, 'name': f'Check {check_id}', 'severity': 'high', 'passed': passed,
+               'message': 'ok' if passed else 'broken', 'metrics': {'wallMs': wall_ms, 'cpuMs': wall_ms / 2}}
+              for check_id, (passed, wall_ms) in outcomes.items()]
+    failed = sum(1 for c in checks if not c['passed'])
+    return {'timestamp': f'2026-01-{run:02d}T00:00:00', 'strictMode': False, 'checks': {'main': checks},
+            'summary': {'total': len(checks), 'passed': len(checks) - failed, 'failed': failed, 'skipped': 0}}
+
+
+def test_trend_queries(tmp_path):
+    with run_history.RunHistory(str(tmp_path / 'history.sqlite')) as history:
+        for run in range(1, 11):
+            history.record_run(make_results(run, {
+                'FAST': (True, 1.0),
+                'SLOW': (True, 100.0 + run),
+                'FLAKY': (run % 2 == 0, 5.0),
+                'BROKE': (run < 8, 2.0),
+            }), 'AMBER')
+
+        slowest = history.slowest(runs=5, limit=2)
+        assert [row['id'] for row in slowest] == ['SLOW', 'FLAKY']
+        assert slowest[0]['runs'] == 5 and slowest[0]['meanMs'] == 108.0 and slowest[0]['maxMs'] == 110.0
+
+        flips = {row['id']: row for row in history.flipped(runs=10)}
+        assert set(flips) == {'FLAKY', 'BROKE'}
+        assert flips['FLAKY']['flips'] == 9
+        assert flips['BROKE'] == dict(flips['BROKE'], flips=1, lastFlipRun=8, lastFlipAt='2026-01-08T00:00:00',
+                                      status='FAIL')
+
+        rates = {row['id']: row['rate'] for row in history.failure_rate(runs=10)}
+        assert rates == {'FLAKY': 0.5, 'BROKE': 0.3}
+        assert history.durations(runs=1)[('main', 'SLOW')] == 110.0
+
+
+def test_retention_and_compaction(tmp_path):
+    db = str(tmp_path / 'history.sqlite')
+    with run_history.RunHistory(db, keep_runs=3) as history:
+        for run in range(1, 7):
+            history.record_run(make_results(run, {f'C-{run}': (True, 1.0), 'KEEP': (False, 1.0)}), 'AMBER')
+        assert history.run_count() == 3
+        history.compact()
+        check_ids = {row[0] for row in history.conn.execute('SELECT check_id FROM checks')}
+        assert check_ids == {'C-4', 'C-5', 'C-6', 'KEEP'}
+        assert history.failure_rate(runs=100) == [
+            {'category': 'main', 'id': 'KEEP', 'name': 'Check KEEP', 'runs': 3, 'failures': 3, 'rate': 1.0}]
+
+
+def test_runner_records_each_run_and_cli_reports(tmp_path, capsys):
+    (tmp_path / 'qa').mkdir()
+    (tmp_path / 'README.md').write_text('readme', encoding='utf-8')
+    (tmp_path / 'qa' / 'requirements.json').write_text(json.dumps({'requirements': {'files': {
+        'description': 'files', 'checks': [
+            {'id': 'F-001', 'name': 'README exists', 'type': 'file_exists', 'target': 'README.md'},
+            {'id': 'F-002', 'name': 'Missing', 'type': 'file_exists', 'target': 'missing.md', 'severity': 'critical'},
+        ]}}}), encoding='utf-8')
+
+    for _ in range(2):
+        runner = run_qa.QARunner(str(tmp_path))
+        runner.run_all_checks()
+        run_id = runner.record_history()
+    assert run_id == 2
+
+    db = str(tmp_path / run_history.DEFAULT_DB)
+    with run_history.RunHistory(db) as history:
+        row = history.conn.execute('SELECT status, total, failed, wall_ms FROM runs WHERE id = 2').fetchone()
+        assert row[:3] == ('RED', 2, 1) and row[3] > 0
+        message = history.conn.execute("SELECT message FROM results WHERE status = 'FAIL'").fetchone()[0]
+        assert message.startswith('File not found')
+
+    capsys.readouterr()
+    assert run_history.main(['failure-rate', '--db', db, '--json']) == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert rows == [{'category': 'files', 'id': 'F-002', 'name': 'Missing', 'runs': 2, 'failures': 2, 'rate': 1.0}]
+    assert run_history.main(['slowest', '--db', db]) == 0
+    assert 'F-001' in capsys.readouterr().out
@@ -0,0 +1,64 @@
+"""Pytest checks for the streaming secret scanner (qa/secret_scanner.py)."""
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import secret_scanner  # noqa: E402
+
+
+PATTERNS = ['api[_-]?key', 'secret', 'password', 'token']
+
+
+def make_tree(tmp_path):
+    src = tmp_path / 'src'
+    (src / 'nested').mkdir(parents=True)
+    (src / 'build').mkdir()
+    (src / '.hidden').mkdir()
+    (tmp_path / '.gitignore').write_text('build/\n*.log\n', encoding='utf-8')
+    (src / 'nested' / '.gitignore').write_text('local.cfg\n', encoding='utf-8')
+    (src / 'app.js').write_text('const a = 1;\nconst API_KEY = "abcdefghijklmnop";\n'
+                                'const secret = "0123456789abc";\n', encoding='utf-8')
+    (src / 'docs.md').write_text('password = "your_password_here"\ntoken: example_token_value\n', encoding='utf-8')
+    (src / 'nested' / 'local.cfg').write_text('password=supersecretvalue1\n', encoding='utf-8')
+    (src / 'nested' / 'kept.cfg').write_text('\n\n\ntoken=abcdefghijkl12\n', encoding='utf-8')
+    (src / 'build' / 'out.js').write_text('token="abcdefghijklmnop"\n', encoding='utf-8')
+    (src / 'debug.log').write_text('token="abcdefghijklmnop"\n', encoding='utf-8')
+    (src / '.hidden' / 'x.txt').write_text('token="abcdefghijklmnop"\n', encoding='utf-8')
+    (src / 'image.png').write_bytes(b'\x89PNG\r\n\x1a\n\0\0token="abcdefghijklmnop"')
+    return tmp_path
+
+
+def test_scan_reports_every_finding_with_lines(tmp_path):
+    repo = make_tree(tmp_path)
+    result = secret_scanner.scan(str(repo), 'src', PATTERNS, workers=1)
+
+    assert result['findings'] == [
+        ('src/app.js', 2, 'API_KEY = "abcdefghijklmnop'),
+        ('src/app.js', 3, 'secret = "0123456789abc'),
+        ('src/nested/kept.cfg', 4, 'token=abcdefghijkl12'),
+    ]
+
+
+def test_ignored_hidden_and_binary_files_are_skipped(tmp_path):
+    repo = make_tree(tmp_path)
+    files = secret_scanner.collect_files(str(repo), str(repo / 'src'))
+
+    assert 'src/build/out.js' not in files
+    assert 'src/debug.log' not in files
+    assert 'src/nested/local.cfg' not in files
+    assert 'src/.hidden/x.txt' not in files
+    assert 'src/image.png' in files  # walked, but rejected by the binary sniff
+    regex = secret_scanner.compile_patterns(tuple(PATTERNS))
+    assert secret_scanner.scan_file(str(repo / 'src' / 'image.png'), regex) == []
+
+
+def test_mmap_and_process_pool_paths_agree(tmp_path, monkeypatch):
+    repo = make_tree(tmp_path)
+    expected = secret_scanner.scan(str(repo), 'src', PATTERNS, workers=1)
+
+    monkeypatch.setattr(secret_scanner, 'MMAP_THRESHOLD', 1)
+    monkeypatch.setattr(secret_scanner, 'PARALLEL_MIN_FILES', 1)
+    assert secret_scanner.scan(str(repo), 'src', PATTERNS, workers=2) == expected
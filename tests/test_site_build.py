@@ -0,0 +1,142 @@
+"""Pytest checks for the GitHub Pages build step (qa/site_build.py)."""
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'qa'))
+
+import run_qa  # noqa: E402
+import site_build  # noqa: E402
+
+TRICKY_JS = r"""// leading comment
+var re = /[/]+\/\/x/g, half = 10 / 2 / 1;
+var a = 1, b = 2;
+var sum = a + +b, diff = a - -b;
+var n = 1 .toString() + 'x  //  not a comment' + "/* nor this */";
+var t = `outer ${ { k: `inner ${a}` }.k } /* kept */ ${half}`;
+function f() {
+  return /* the line break below ends the statement */
+    42;
+}
+var i = 0
+i
+++b
+var out = [re.source, half, sum, diff, n, t, f(), i, b, typeof /x/ === 'object'];
+"""
+
+
+def run_node(code):
+    result = subprocess.run(['node', '-e', code + '\nconsole.log(JSON.stringify(out));'],
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_minifiers_keep_tokens_and_line_breaks():
+    minified = site_build.minify_js(TRICKY_JS)
+
+    assert 'comment' not in minified.replace('not a comment', '') and '  ' not in minified.replace("x  //  n", '')
+    assert 'a+ +b' in minified and 'a- -b' in minified and '1 .toString()' in minified
+    assert 'return\n42' in minified and '`outer ${{k:`inner ${a}`}.k} /* kept */ ${half}`' in minified
+    if shutil.which('node'):
+        assert run_node(minified) == run_node(TRICKY_JS)
+
+    css = '/* c */ @media (max-width : 600px) {\n  .a > .b , .c :hover { color : red ; content: "a  ;  }" ; }\n}\n'
+    # a space before ':' can be a descendant combinator, so only the one after it goes
+    assert site_build.minify_css(css) == '@media (max-width :600px){.a>.b,.c :hover{color :red;content:"a  ;  }"}}\n'
+
+    with pytest.raises(site_build.BuildError):
+        site_build.minify_js('var s = "unterminated;\n')
+
+
+PAGE = """<!doctype html><html><head>
+<link rel="icon" href="data:image/svg+xml,<svg viewBox='0 0 1 1'></svg>">
+<link rel="stylesheet" href="styles.css" />
+<script src="boot.js"></script>
+</head><body>
+<div data-testid="TID-ROOT"></div>
+<!-- <script src="commented.js"></script> -->
+<script src="a.js"></script>
+<script src="b.js"></script>
+<script>
+  // inline
+  document.body.insertAdjacentHTML('beforeend', '<i data-testid="TID-DYNAMIC"></i>');
+</script>
+<script type="module">import './m.js';</script>
+<script async src="later.js"></script>
+</body></html>
+"""
+
+
+def make_source(root):
+    source = root / 'frontend'
+    (source / 'assets').mkdir(parents=True)
+    (source / 'index.html').write_text(PAGE, encoding='utf-8')
+    (source / 'styles.css').write_text('body {\n  margin: 0;\n}\n', encoding='utf-8')
+    (source / 'boot.js').write_text('window.booted = true; // boot\n', encoding='utf-8')
+    (source / 'a.js').write_text('var shared = 1\n', encoding='utf-8')
+    (source / 'b.js').write_text('(function () { shared += 1; })()\n', encoding='utf-8')
+    (source / 'later.js').write_text('window.later = 1;\n', encoding='utf-8')
+    (source / 'assets' / 'logo.svg').write_text('<svg>' + ' ' * 200 + '</svg>', encoding='utf-8')
+    (source / '.nojekyll').write_text('', encoding='utf-8')
+    return source
+
+
+def test_build_bundles_fingerprints_and_verifies(tmp_path):
+    source = make_source(tmp_path)
+    output = tmp_path / 'site'
+
+    manifest = site_build.build_site(str(source), str(output))
+
+    html = (output / 'index.html').read_text(encoding='utf-8')
+    refs = site_build.asset_references(html)
+    assert [ref.split('.')[0] for ref in refs] == ['styles', 'boot', 'bundle', 'inline-1', 'later']
+    assert refs == [name for name in manifest['assets']] + ['later.js']
+    assert manifest['assets'][refs[2]]['sources'] == ['a.js', 'b.js']
+    assert manifest['assets'][refs[3]]['sources'] == ['index.html#script-1']
+    assert '<!-- <script src="commented.js"></script> -->' in html and "import './m.js'" in html
+    assert (output / refs[2]).read_text(encoding='utf-8') == 'var shared=1\n;\n(function(){shared+=1;})()\n'
+    assert (output / refs[0]).read_text(encoding='utf-8') == 'body{margin:0}\n'
+    for ref in refs[:4]:
+        data = (output / ref).read_bytes()
+        assert site_build.fingerprint(ref.split('.')[0] + '.' + ref.split('.')[-1], data) == ref
+        # siblings are only written when they are smaller
+        assert not (output / (ref + '.gz')).exists()
+    assert not (output / 'a.js').exists() and (output / 'later.js').exists() and (output / '.nojekyll').exists()
+    assert gzip.decompress((output / 'index.html.gz').read_bytes()) == html.encode('utf-8')
+    assert (output / 'assets' / 'logo.svg.gz').exists()
+    assert manifest['firstLoad']['built']['raw'] < manifest['firstLoad']['source']['raw']
+    assert site_build.verify_site(str(output), str(source)) == []
+
+    (output / refs[2]).write_text('var shared = 2;\n', encoding='utf-8')
+    (output / 'index.html.gz').write_bytes(gzip.compress(b'stale'))
+    expected = [
+        f'{refs[2]}: content does not match its fingerprint',
+        f'{refs[2]}: content does not match build-manifest.json',
+        'index.html.gz: does not decompress to index.html',
+    ]
+    if (output / (refs[2] + '.br')).exists():
+        # written when the brotli package is installed
+        expected.append(f'{refs[2]}.br: does not decompress to {refs[2]}')
+    assert sorted(site_build.verify_site(str(output))) == sorted(expected)
+
+
+def test_site_build_check_validates_the_artifact(tmp_path):
+    source = make_source(tmp_path)
+    runner = run_qa.QARunner(str(tmp_path))
+
+    passed, message, details = runner.check_site_build('frontend', {'total': {'raw': 100000}})
+    assert passed, message
+    assert message.startswith('Site build valid: 4 fingerprinted assets, first load ')
+    assert json.loads(json.dumps(details))['siteBuild']['firstLoad']['built']['gzip'] > 0
+
+    assert not runner.check_site_build('frontend', {'total': {'raw': 10}})[0]
+    (source / 'b.js').write_text('var s = `open\n', encoding='utf-8')
+    passed, message, _ = runner.check_site_build('frontend')
+    assert not passed and message.startswith('Site build failed: unterminated template literal')